@@ -4,13 +4,16 @@ from dal import autocomplete
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.forms import AdminPasswordChangeForm
 from django.shortcuts import render, redirect
-from django.urls import path, reverse
+from django.urls import path, reverse, reverse_lazy
 from django.core.mail import send_mail
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
 from django.template.loader import render_to_string
 
+from django.db.models import BigIntegerField, Case, Count, F, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, NullIf
+
 from .models import CustomUser
 from master.models import State, District, Office
 from asm.models import ASM
@@ -18,6 +21,19 @@ from zonal_manager.models import ZonalManager
 
 
 # ---------------------- FORM ---------------------- #
+def _geo_attrs(level, placeholder, parent=None):
+    """Filter this select in the browser from the geography bundle (static/admin/js/geo_bundle_select2.js)."""
+    attrs = {
+        "data-placeholder": placeholder,
+        "data-autocomplete-light-function": "geo-select2",
+        "data-geo-level": level,
+        "data-geo-bundle-url": reverse_lazy("geography_bundle"),
+    }
+    if parent:
+        attrs["data-geo-parent"] = parent
+    return attrs
+
+
 class CustomUserForm(forms.ModelForm):
     class Meta:
         model = CustomUser
@@ -25,20 +41,98 @@ class CustomUserForm(forms.ModelForm):
         widgets = {
             "states": autocomplete.ModelSelect2Multiple(
                 url="state-autocomplete",
-                attrs={"data-placeholder": "Select State(s)"}
+                attrs=_geo_attrs("states", "Select State(s)"),
             ),
             "districts": autocomplete.ModelSelect2Multiple(
                 url="district-autocomplete",
                 forward=["states"],
-                attrs={"data-placeholder": "Select District(s)"}
+                attrs=_geo_attrs("districts", "Select District(s)", parent="id_states"),
             ),
             "offices": autocomplete.ModelSelect2Multiple(
                 url="office-autocomplete",
                 forward=["districts"],
-                attrs={"data-placeholder": "Select Office(s)"}
+                attrs=_geo_attrs("offices", "Select Office(s)", parent="id_districts"),
             ),
         }
 
+    class Media:
+        js = ("admin/js/geo_bundle_select2.js",)
+
+
+# ---------------------- CHANGELIST ANNOTATIONS ---------------------- #
+def _display_name(prefix=""):
+    """full_name, or username when it is blank (what the columns have always shown)."""
+    return Coalesce(NullIf(F(f"{prefix}full_name"), Value("")), F(f"{prefix}username"))
+
+
+def _m2m_count(through):
+    """Correlated COUNT over one of the user's M2M tables."""
+    counted = (
+        through.objects.filter(customuser_id=OuterRef("pk"))
+        .order_by().values("customuser_id").annotate(n=Count("*")).values("n")
+    )
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+def annotate_hierarchy(queryset):
+    """
+    ASM / ZM id and name of every user as correlated subqueries, the first
+    link by id as before: a partner's ASM (ASM.partners) and that ASM's ZM, an
+    ASM's own name and its ZM (ZonalManager.asms).
+    """
+    partner_asm = ASM.partners.through.objects.filter(
+        customuser_id=OuterRef("pk"), asm__user__isnull=False
+    ).order_by("asm_id")
+    asm_zm = ZonalManager.asms.through.objects.filter(
+        customuser_id=OuterRef("asm_user_id"), zonalmanager__user__isnull=False
+    ).order_by("zonalmanager_id")
+    return queryset.annotate(
+        asm_user_id=Case(
+            When(role="Area Sales Manager", then=F("pk")),
+            When(role="Partner", then=Subquery(partner_asm.values("asm__user_id")[:1])),
+            output_field=BigIntegerField(),
+        ),
+        asm_name=Case(
+            When(role="Area Sales Manager", then=_display_name()),
+            When(role="Partner", then=Subquery(partner_asm.values(name=_display_name("asm__user__"))[:1])),
+        ),
+    ).annotate(
+        zm_id=Subquery(asm_zm.values("zonalmanager_id")[:1], output_field=BigIntegerField()),
+        zm_name=Subquery(asm_zm.values(name=_display_name("zonalmanager__user__"))[:1]),
+    )
+
+
+class AssignedASMFilter(admin.SimpleListFilter):
+    title = "ASM"
+    parameter_name = "asm"
+
+    def lookups(self, request, model_admin):
+        asms = CustomUser.objects.filter(role="Area Sales Manager").order_by("username")
+        return [("none", "Unassigned"), *((str(pk), name) for pk, name in asms.values_list("pk", "username"))]
+
+    def queryset(self, request, queryset):
+        if self.value() == "none":
+            return queryset.filter(role="Partner", asm_user_id__isnull=True)
+        if self.value():
+            return queryset.filter(asm_user_id=self.value())
+        return queryset
+
+
+class AssignedZMFilter(admin.SimpleListFilter):
+    title = "ZM"
+    parameter_name = "zm"
+
+    def lookups(self, request, model_admin):
+        zms = ZonalManager.objects.filter(user__isnull=False).order_by("user__username")
+        return [("none", "Unassigned"), *((str(pk), name) for pk, name in zms.values_list("pk", "user__username"))]
+
+    def queryset(self, request, queryset):
+        if self.value() == "none":
+            return queryset.filter(role__in=("Partner", "Area Sales Manager"), zm_id__isnull=True)
+        if self.value():
+            return queryset.filter(zm_id=self.value())
+        return queryset
+
 
 # ---------------------- ADMIN ---------------------- #
 @admin.register(CustomUser)
@@ -52,9 +146,12 @@ class CustomUserAdmin(UserAdmin):
         "role",
         "get_asm_name",
         "get_zm_name",
+        "states_count",
+        "districts_count",
+        "offices_count",
         "is_active",
     )
-    list_filter = ("role", "is_active")
+    list_filter = ("role", "is_active", AssignedASMFilter, AssignedZMFilter)
     search_fields = ("username", "full_name", "email", "phone")
 
     fieldsets = (
@@ -72,38 +169,36 @@ class CustomUserAdmin(UserAdmin):
         }),
     )
 
-    # 🧩 Partner List Display Helpers
+    def get_queryset(self, request):
+        # Names and area counts come with the page query instead of 1–3 queries per row
+        return annotate_hierarchy(super().get_queryset(request)).annotate(
+            states_count=_m2m_count(CustomUser.states.through),
+            districts_count=_m2m_count(CustomUser.districts.through),
+            offices_count=_m2m_count(CustomUser.offices.through),
+        )
+
     # 🧩 Partner/ASM/ZM Relationship Display
+    @admin.display(description="ASM", ordering="asm_name")
     def get_asm_name(self, obj):
         """Show ASM name for Partner or self if ASM."""
-        if obj.role == "Partner":
-            # Partner → Find its ASM
-            asm = ASM.objects.filter(partners=obj).select_related("user").first()
-            if asm and asm.user:
-                return asm.user.full_name or asm.user.username
-        elif obj.role == "ASM":
-            # ASM → Self name
-            return obj.full_name or obj.username
-        return "-"
-    get_asm_name.short_description = "ASM"
+        return obj.asm_name or "-"
 
+    @admin.display(description="ZM", ordering="zm_name")
     def get_zm_name(self, obj):
         """Show ZM name for Partner or ASM."""
-        if obj.role == "Partner":
-            # Partner → get ASM → get its ZM
-            asm = ASM.objects.filter(partners=obj).select_related("user").first()
-            if asm:
-                zm = ZonalManager.objects.filter(asms=asm.user).select_related("user").first()
-                if zm and zm.user:
-                    return zm.user.full_name or zm.user.username
-
-        elif obj.role == "Area Sales Manager":
-            # ASM → find which ZM this ASM is assigned under
-            zm = ZonalManager.objects.filter(asms__id=obj.id).select_related("user").first()
-            if zm and zm.user:
-                return zm.user.full_name or zm.user.username
-
-        return "-"
+        return obj.zm_name or "-"
+
+    @admin.display(description="States", ordering="states_count")
+    def states_count(self, obj):
+        return obj.states_count
+
+    @admin.display(description="Districts", ordering="districts_count")
+    def districts_count(self, obj):
+        return obj.districts_count
+
+    @admin.display(description="Offices", ordering="offices_count")
+    def offices_count(self, obj):
+        return obj.offices_count
 
     # ✅ Password and Reset Management
     def get_urls(self):
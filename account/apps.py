@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AccountConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'account'
+
+    def ready(self):
+        from . import dashboard_cache, signals  # dashboard cache invalidation
+        dashboard_cache.warn_if_process_local()
@@ -0,0 +1,168 @@
+# account/closure.py
+"""
+Closure table of the org tree (see HierarchyClosure).
+
+Nodes are users: a Zonal Manager's user, the ASM users under it
+(ZonalManager.asms) and the partners under those (ASM.partners). Every node
+has a depth-0 row to itself, so the scoped querysets below include the
+user's own rows.
+
+A change to either relation, or to the user of a ZM / ASM profile, refreshes
+the touched nodes and everything below them: their ancestor rows are deleted
+and recomputed by walking the relation tables, two queries per level.
+Refreshes hold the HierarchyLock("closure") row locked from the walk to the
+write: one touching an ASM and one touching its partner cover overlapping
+rows, and each would otherwise miss the other's link.
+rebuild() and check() load both relations once.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+
+from activity.models import Task
+from asm.models import ASM
+from partner.models import SDCollection
+from zonal_manager.models import ZonalManager, ZMDailyTarget
+
+from .models import HierarchyClosure, HierarchyLock
+
+LOCK_NAME = "closure"
+
+
+def _edges(child_ids=None, parent_ids=None):
+    """(parent user id, child user id) pairs of both relations, optionally limited by child or parent."""
+    asm_links = ASM.partners.through.objects.filter(asm__user__isnull=False)
+    zm_links = ZonalManager.asms.through.objects.filter(zonalmanager__user__isnull=False)
+    if child_ids is not None:
+        asm_links = asm_links.filter(customuser_id__in=child_ids)
+        zm_links = zm_links.filter(customuser_id__in=child_ids)
+    if parent_ids is not None:
+        asm_links = asm_links.filter(asm__user_id__in=parent_ids)
+        zm_links = zm_links.filter(zonalmanager__user_id__in=parent_ids)
+    return [
+        *asm_links.values_list("asm__user_id", "customuser_id"),
+        *zm_links.values_list("zonalmanager__user_id", "customuser_id"),
+    ]
+
+
+def _profile_users(user_ids=None):
+    """Users with a ZM or ASM profile: tree nodes even before anything is linked to them."""
+    zms = ZonalManager.objects.filter(user__isnull=False)
+    asms = ASM.objects.filter(user__isnull=False)
+    if user_ids is not None:
+        zms, asms = zms.filter(user_id__in=user_ids), asms.filter(user_id__in=user_ids)
+    return {*zms.values_list("user_id", flat=True), *asms.values_list("user_id", flat=True)}
+
+
+def _closure(nodes, parents):
+    """{(ancestor, descendant): depth} for `nodes`, walking `parents` (child → parent ids) upwards."""
+    rows = {}
+    for node in nodes:
+        depth, level, seen = 0, {node}, {node}
+        while level:
+            for ancestor in level:
+                rows.setdefault((ancestor, node), depth)
+            level = {parent for child in level for parent in parents.get(child, ())} - seen
+            seen |= level
+            depth += 1
+    return rows
+
+
+def _create(rows, batch_size=2000):
+    HierarchyClosure.objects.bulk_create(
+        [HierarchyClosure(ancestor_id=a, descendant_id=d, depth=depth) for (a, d), depth in rows.items()],
+        batch_size=batch_size,
+        ignore_conflicts=True,  # a concurrent refresh writes the same rows
+    )
+
+
+def _lock_tree():
+    """Serialize closure writers until the current transaction ends."""
+    HierarchyLock.objects.select_for_update().get_or_create(name=LOCK_NAME)
+
+
+def refresh(user_ids):
+    """Recompute the ancestor rows of these users and of everything below them."""
+    nodes = {pk for pk in user_ids if pk is not None}
+    if not nodes:
+        return
+    with transaction.atomic():
+        _lock_tree()
+        _refresh(nodes)
+
+
+def _refresh(nodes):
+    # Downwards: the subtrees of the touched nodes
+    with_children, level = set(), set(nodes)
+    while level:
+        edges = _edges(parent_ids=level)
+        with_children.update(parent for parent, _ in edges)
+        level = {child for _, child in edges} - nodes
+        nodes |= level
+
+    # Upwards: every path from those nodes to the top
+    parents, seen, level = defaultdict(set), set(), set(nodes)
+    while level:
+        edges = _edges(child_ids=level)
+        for parent, child in edges:
+            parents[child].add(parent)
+        seen |= level
+        level = {parent for parent, _ in edges} - seen
+
+    in_tree = {node for node in nodes if node in parents or node in with_children} | _profile_users(nodes)
+    rows = _closure(in_tree, parents)
+    HierarchyClosure.objects.filter(descendant_id__in=nodes).delete()
+    _create(rows)
+
+
+def _expected():
+    edges = _edges()
+    parents = defaultdict(set)
+    for parent, child in edges:
+        parents[child].add(parent)
+    return _closure(_profile_users() | {node for edge in edges for node in edge}, parents)
+
+
+def rebuild(batch_size=2000):
+    """Throw the closure away and recompute it. Returns the number of rows."""
+    with transaction.atomic():
+        _lock_tree()
+        rows = _expected()
+        HierarchyClosure.objects.all().delete()
+        _create(rows, batch_size)
+    return len(rows)
+
+
+def check():
+    """Pairs whose stored depth differs from the relations: list of ((ancestor, descendant), stored, expected)."""
+    expected = _expected()
+    stored = {(a, d): depth for a, d, depth in HierarchyClosure.objects.values_list("ancestor_id", "descendant_id", "depth")}
+    return [
+        (pair, stored.get(pair), expected.get(pair))
+        for pair in expected.keys() | stored.keys()
+        if stored.get(pair) != expected.get(pair)
+    ]
+
+
+# ---------- Scoped querysets ----------
+def descendants(user, min_depth=0):
+    """Subquery of the user ids under `user` (itself included unless min_depth > 0)."""
+    return HierarchyClosure.objects.filter(ancestor=user, depth__gte=min_depth).values("descendant_id")
+
+
+def sd_collections_under(user, queryset=None):
+    """SD collections whose ASM is `user` or sits under it."""
+    queryset = SDCollection.objects.all() if queryset is None else queryset
+    return queryset.filter(asm_id__in=descendants(user))
+
+
+def targets_under(user, queryset=None):
+    """Daily targets whose ASM is `user` or sits under it."""
+    queryset = ZMDailyTarget.objects.all() if queryset is None else queryset
+    return queryset.filter(asm_id__in=descendants(user))
+
+
+def tasks_under(user, queryset=None):
+    """Tasks assigned to `user` or to anyone under it."""
+    queryset = Task.objects.all() if queryset is None else queryset
+    return queryset.filter(assigned_to_id__in=descendants(user))
@@ -0,0 +1,114 @@
+# account/dashboard_cache.py
+"""
+Cache of the computed role dashboard contexts, per (dashboard, owner, date).
+
+Keys embed a per-owner generation number. Writes to ZMDailyTarget or
+SDCollection bump the generation of the ZM / ASM they belong to (see
+account/signals.py), so the next page load recomputes. Untouched owners
+keep their cached numbers. The bump waits for the write's transaction to
+commit: a dashboard computed in between would read the old rows and store
+them under the new generation.
+
+Stampede protection: an entry is fresh for DASHBOARD_CACHE_TTL seconds and
+then served stale for up to DASHBOARD_CACHE_STALE seconds while exactly one
+request (holding a cache.add() lock) recomputes it. On a cold miss, requests
+that lose the lock wait briefly for the winner before computing themselves.
+
+The generations and locks live in the default cache, so with several worker
+processes it must be shared (Redis, via REDIS_URL). With the per-process
+LocMemCache fallback a bump reaches only the worker that made it; the others
+serve their old numbers until the TTL runs out. AccountConfig.ready() logs a
+warning when DEBUG is off and the cache is process-local.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+LOCK_TIMEOUT = 30
+WAIT_STEP = 0.05
+
+
+def _ttl():
+    return getattr(settings, "DASHBOARD_CACHE_TTL", 300)
+
+
+def _stale():
+    return getattr(settings, "DASHBOARD_CACHE_STALE", 600)
+
+
+def warn_if_process_local():
+    """Log a warning (outside DEBUG) when invalidations can't reach other worker processes."""
+    if settings.DEBUG or not isinstance(caches["default"], LocMemCache):
+        return False
+    logger.warning(
+        "The default cache is LocMemCache: dashboard invalidations stay in the process that made them, "
+        "so other workers serve stale dashboards for up to %s seconds. Set REDIS_URL for a shared cache.",
+        _ttl() + _stale(),
+    )
+    return True
+
+
+def _generation_key(kind, owner_id):
+    return f"dashboard:gen:{kind}:{owner_id}"
+
+
+def generation(kind, owner_id):
+    return cache.get_or_set(_generation_key(kind, owner_id), 1, None)
+
+
+def invalidate(kind, owner_id):
+    """Make every cached dashboard of this owner (any date) obsolete once the current transaction commits."""
+    if owner_id is None:
+        return
+    transaction.on_commit(lambda: _bump(kind, owner_id))
+
+
+def _bump(kind, owner_id):
+    key = _generation_key(kind, owner_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Not cached yet (or evicted): start a generation no old entry can have
+        cache.set(key, int(time.time() * 1000), None)
+
+
+def _compute_and_store(key, lock_key, compute):
+    try:
+        context = compute()
+        cache.set(key, {"context": context, "fresh_until": time.time() + _ttl()}, _ttl() + _stale())
+        return context
+    finally:
+        cache.delete(lock_key)
+
+
+def get_or_compute(kind, owner_id, day, compute):
+    """The cached context for (kind, owner, day), computing it with compute() when needed."""
+    key = f"dashboard:{kind}:{owner_id}:{generation(kind, owner_id)}:{day.isoformat()}"
+    lock_key = f"{key}:lock"
+
+    entry = cache.get(key)
+    if entry is not None:
+        if entry["fresh_until"] > time.time():
+            return entry["context"]
+        # Stale: one request refreshes, the others keep serving the old numbers
+        if cache.add(lock_key, 1, LOCK_TIMEOUT):
+            return _compute_and_store(key, lock_key, compute)
+        return entry["context"]
+
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        return _compute_and_store(key, lock_key, compute)
+
+    # Someone else is computing it: wait for their result (bounded), then give up waiting
+    deadline = time.monotonic() + getattr(settings, "DASHBOARD_CACHE_WAIT", 2)
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_STEP)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry["context"]
+    return compute()
@@ -0,0 +1,153 @@
+# account/hierarchy.py
+"""
+In-memory Partner → ASM → Zonal Manager graph, and the reverse.
+
+Built with one query per relation (ASM.partners, ZonalManager.asms) with the
+names joined in, then kept in process memory. The m2m_changed / save signals
+in account/signals.py bump the MasterRevision("hierarchy") row in the
+transaction making the change, and every lookup compares the graph with that
+row (one indexed query), so each worker drops its copy once the change is
+committed — whatever the cache backend — and a rolled-back change never
+counts. SDCollectionAdmin writes the ASM / ZM it reads from here.
+
+A partner under several ASMs (or an ASM under several ZMs) resolves to the
+lowest id, the row the old `.first()` lookups returned.
+"""
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.db.models import F
+from django.utils import timezone
+
+from asm.models import ASM
+from master.models import MasterRevision
+from zonal_manager.models import ZonalManager
+
+REVISION_NAME = "hierarchy"
+
+_lock = threading.Lock()
+_graph = None
+
+
+@dataclass(frozen=True)
+class Person:
+    id: int
+    username: str
+    full_name: str
+
+    @property
+    def name(self):
+        return self.full_name or self.username
+
+
+@dataclass(frozen=True)
+class Owners:
+    """Who a partner or ASM sits under. `zm_id` is the ZonalManager pk, `zm` its user."""
+    asm: Person = None
+    zm_id: int = None
+    zm: Person = None
+
+
+NO_OWNERS = Owners()
+
+
+class Hierarchy:
+    def __init__(self, generation, partner_rows, asm_rows):
+        self.generation = generation
+        self.people = {}
+        self.asm_of_partner = {}
+        self.zm_of_asm = {}
+        self.zm_users = {}
+        self.partners_of_asm = defaultdict(list)
+        self.asms_of_zm = defaultdict(list)
+
+        for partner_id, asm_id, username, full_name in partner_rows:
+            if asm_id is None:
+                continue  # ASM profile without a user
+            self.people.setdefault(asm_id, Person(asm_id, username, full_name))
+            self.asm_of_partner.setdefault(partner_id, asm_id)
+            self.partners_of_asm[asm_id].append(partner_id)
+
+        for asm_id, asm_username, asm_full_name, zm_id, zm_user_id, username, full_name in asm_rows:
+            self.people.setdefault(asm_id, Person(asm_id, asm_username, asm_full_name))
+            self.zm_of_asm.setdefault(asm_id, zm_id)
+            self.asms_of_zm[zm_id].append(asm_id)
+            if zm_user_id is not None:
+                self.zm_users.setdefault(zm_id, Person(zm_user_id, username, full_name))
+
+    # ---------- Upwards ----------
+    def owners_of_asm(self, asm_id):
+        zm_id = self.zm_of_asm.get(asm_id)
+        return Owners(asm=self.people.get(asm_id), zm_id=zm_id, zm=self.zm_users.get(zm_id))
+
+    def owners_of_partner(self, partner_id):
+        asm_id = self.asm_of_partner.get(partner_id)
+        if asm_id is None:
+            return NO_OWNERS
+        return self.owners_of_asm(asm_id)
+
+    def owners(self, user):
+        """Owners of a partner or ASM user (an ASM is its own ASM)."""
+        if user.role == "Partner":
+            return self.owners_of_partner(user.pk)
+        if user.role == "Area Sales Manager":
+            zm_id = self.zm_of_asm.get(user.pk)
+            return Owners(asm=Person(user.pk, user.username, user.full_name), zm_id=zm_id, zm=self.zm_users.get(zm_id))
+        return NO_OWNERS
+
+    def resolve(self, users):
+        """Batch form of owners() for a list page: {user pk: Owners}."""
+        return {user.pk: self.owners(user) for user in users}
+
+    # ---------- Downwards ----------
+    def partners_under_asm(self, asm_id):
+        return list(self.partners_of_asm.get(asm_id, ()))
+
+    def asms_under_zm(self, zm_id):
+        return list(self.asms_of_zm.get(zm_id, ()))
+
+    def partners_under_zm(self, zm_id):
+        return [partner_id for asm_id in self.asms_of_zm.get(zm_id, ()) for partner_id in self.partners_of_asm.get(asm_id, ())]
+
+
+def build(generation):
+    """The graph from the two relation tables (two queries)."""
+    partner_rows = (
+        ASM.partners.through.objects.order_by("asm_id")
+        .values_list("customuser_id", "asm__user_id", "asm__user__username", "asm__user__full_name")
+    )
+    asm_rows = (
+        ZonalManager.asms.through.objects.order_by("zonalmanager_id")
+        .values_list(
+            "customuser_id", "customuser__username", "customuser__full_name",
+            "zonalmanager_id", "zonalmanager__user_id", "zonalmanager__user__username", "zonalmanager__user__full_name",
+        )
+    )
+    return Hierarchy(generation, list(partner_rows), list(asm_rows))
+
+
+def _generation():
+    # changed_at tells a rolled-back bump from a later one reaching the same number
+    return MasterRevision.objects.filter(name=REVISION_NAME).values_list("revision", "changed_at").first()
+
+
+def current():
+    """The graph of the current revision, built only if this process hasn't yet."""
+    global _graph
+    generation = _generation()
+    graph = _graph
+    if graph is not None and graph.generation == generation:
+        return graph
+    with _lock:
+        if _graph is None or _graph.generation != generation:
+            _graph = build(generation)
+        return _graph
+
+
+def invalidate():
+    """Bump the revision in the current transaction: every process rebuilds once it commits."""
+    global _graph
+    _graph = None
+    MasterRevision.objects.get_or_create(name=REVISION_NAME)
+    MasterRevision.objects.filter(name=REVISION_NAME).update(revision=F("revision") + 1, changed_at=timezone.now())
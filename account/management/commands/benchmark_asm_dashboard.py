@@ -0,0 +1,98 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+from django.test.utils import CaptureQueriesContext
+
+from account.models import CustomUser
+from account.views import area_sales_context
+from partner.models import SDCollection
+from zonal_manager.models import ZMDailyTarget
+
+
+class _Rollback(Exception):
+    pass
+
+
+def seed_asm(years, collections_per_day, seed=5):
+    """One ASM with a daily target row and a few SD collections per day for `years` years."""
+    rnd = random.Random(seed)
+    asm = CustomUser.objects.create(username="bench-asm", email="bench-asm@example.com", role="Area Sales Manager")
+    partner = CustomUser.objects.create(username="bench-partner", email="bench-partner@example.com", role="Partner")
+    start = date.today() - timedelta(days=365 * years)
+    days = [start + timedelta(days=i) for i in range(365 * years)]
+    ZMDailyTarget.objects.bulk_create(
+        [
+            ZMDailyTarget(
+                asm=asm, date=day,
+                application_target=rnd.randint(5, 20), application_achieve=rnd.randint(0, 20),
+                pop_target=rnd.randint(1, 5), pop_achieve=rnd.randint(0, 5),
+                calls_target=30, calls_achieve=rnd.randint(10, 40),
+                sd_collection_target=50000, sd_collection_achieve=rnd.randint(0, 60000),
+            )
+            for day in days
+        ],
+        batch_size=2000,
+    )
+    SDCollection.objects.bulk_create(
+        [
+            SDCollection(asm=asm, partner=partner, date=day, amount=Decimal(rnd.randint(1000, 50000)))
+            for day in days
+            for _ in range(collections_per_day)
+        ],
+        batch_size=5000,
+    )
+    return asm
+
+
+def legacy_context(asm_user):
+    """area_sales_dashboard before the grouped queries (per-row SDCollection aggregates)."""
+    last_6 = ZMDailyTarget.objects.filter(asm=asm_user).order_by("-date")[:6][::-1]
+    total_revenue = SDCollection.objects.filter(
+        asm=asm_user, is_deleted=False
+    ).aggregate(total=models.Sum("amount"))["total"] or 0
+    chart_revenue = []
+    for t in last_6:
+        month_rev = SDCollection.objects.filter(
+            asm=asm_user, date__month=t.date.month, date__year=t.date.year, is_deleted=False
+        ).aggregate(total=models.Sum("amount"))["total"] or 0
+        chart_revenue.append(float(month_rev / 100000))
+    return {"total_revenue": round(total_revenue / 100000, 2), "chart_revenue": chart_revenue}
+
+
+class Command(BaseCommand):
+    help = "Compare the ASM dashboard queries before/after grouping on a seeded ASM (rolled back)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--years", type=int, default=3)
+        parser.add_argument("--collections-per-day", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=10)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                asm = seed_asm(options["years"], options["collections_per_day"])
+                self.stdout.write(
+                    f"Seeded {ZMDailyTarget.objects.filter(asm=asm).count()} targets, "
+                    f"{SDCollection.objects.filter(asm=asm).count()} collections"
+                )
+                legacy = self._time("legacy (per-row aggregates)", legacy_context, asm, options["repeat"])
+                current = self._time("grouped queries", area_sales_context, asm, options["repeat"])
+                if legacy["chart_revenue"] != current["chart_revenue"] or legacy["total_revenue"] != current["total_revenue"]:
+                    self.stderr.write("Revenue series differ!")
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _time(self, label, func, asm, repeat):
+        with CaptureQueriesContext(connection) as queries:
+            result = func(asm)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func(asm)
+        elapsed = (time.perf_counter() - start) / repeat * 1000
+        self.stdout.write(f"{label:<32} {elapsed:8.2f} ms  {len(queries):3d} queries")
+        return result
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from account import closure
+
+
+class Command(BaseCommand):
+    help = "Rebuild the ZM → ASM → Partner closure table, or --check it against the relations."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true", help="Only report pairs that differ (exit 1 if any)")
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            problems = closure.check()
+            for (ancestor, descendant), stored, expected in problems[:50]:
+                self.stdout.write(f"{ancestor} → {descendant}: stored depth {stored}, expected depth {expected}")
+            if problems:
+                raise CommandError(f"{len(problems)} closure pair(s) out of date — run without --check to rebuild.")
+            self.stdout.write(self.style.SUCCESS("✅ Closure table matches the hierarchy."))
+            return
+
+        count = closure.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt {count} closure rows."))
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.19 on 2026-10-18 17:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('master', '0001_initial'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('account', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='districts',
+            field=models.ManyToManyField(blank=True, related_name='users', to='master.district'),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='groups',
+            field=models.ManyToManyField(blank=True, help_text='The groups this user belongs to. A user will get all permissions granted to each of their groups.', related_name='user_set', related_query_name='user', to='auth.group', verbose_name='groups'),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='offices',
+            field=models.ManyToManyField(blank=True, related_name='users', to='master.office'),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='states',
+            field=models.ManyToManyField(blank=True, related_name='users', to='master.state'),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='user_permissions',
+            field=models.ManyToManyField(blank=True, help_text='Specific permissions for this user.', related_name='user_set', related_query_name='user', to='auth.permission', verbose_name='user permissions'),
+        ),
+    ]
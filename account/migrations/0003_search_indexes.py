@@ -0,0 +1,45 @@
+# Trigram indexes for the free-text name search (zonal_manager/search.py).
+# PostgreSQL only: other backends keep the plain scans.
+
+from django.db import migrations
+
+SEARCH_INDEX_SQL = {
+    "postgresql": [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX IF NOT EXISTS account_customuser_username_trgm "
+        "ON account_customuser USING gin (UPPER(username) gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS account_customuser_first_name_trgm "
+        "ON account_customuser USING gin (UPPER(first_name) gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS account_customuser_last_name_trgm "
+        "ON account_customuser USING gin (UPPER(last_name) gin_trgm_ops)",
+    ],
+}
+
+INDEX_NAMES = {
+    "postgresql": [
+        "account_customuser_username_trgm",
+        "account_customuser_first_name_trgm",
+        "account_customuser_last_name_trgm",
+    ],
+}
+
+
+def create_search_indexes(apps, schema_editor):
+    for sql in SEARCH_INDEX_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_search_indexes(apps, schema_editor):
+    for name in INDEX_NAMES.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.19 on 2026-10-18 17:55
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_closure(apps, schema_editor):
+    # Same walk as account.closure.rebuild(), over the historical models
+    ASM = apps.get_model('asm', 'ASM')
+    ZonalManager = apps.get_model('zonal_manager', 'ZonalManager')
+    HierarchyClosure = apps.get_model('account', 'HierarchyClosure')
+    edges = [
+        *ASM.partners.through.objects.filter(asm__user__isnull=False).values_list('asm__user_id', 'customuser_id'),
+        *ZonalManager.asms.through.objects.filter(zonalmanager__user__isnull=False)
+        .values_list('zonalmanager__user_id', 'customuser_id'),
+    ]
+    parents = {}
+    for parent, child in edges:
+        parents.setdefault(child, set()).add(parent)
+    nodes = {node for edge in edges for node in edge}
+    nodes |= set(ZonalManager.objects.filter(user__isnull=False).values_list('user_id', flat=True))
+    nodes |= set(ASM.objects.filter(user__isnull=False).values_list('user_id', flat=True))
+
+    rows = {}
+    for node in nodes:
+        depth, level, seen = 0, {node}, {node}
+        while level:
+            for ancestor in level:
+                rows.setdefault((ancestor, node), depth)
+            level = {parent for child in level for parent in parents.get(child, ())} - seen
+            seen |= level
+            depth += 1
+    HierarchyClosure.objects.bulk_create(
+        [HierarchyClosure(ancestor_id=a, descendant_id=d, depth=depth) for (a, d), depth in rows.items()],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0003_search_indexes'),
+        ('asm', '0001_initial'),
+        ('zonal_manager', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HierarchyClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveSmallIntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to=settings.AUTH_USER_MODEL)),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='hierarchyclosure',
+            constraint=models.UniqueConstraint(fields=('ancestor', 'descendant'), name='unique_hierarchy_closure_pair'),
+        ),
+        migrations.RunPython(fill_closure, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.19 on 2026-10-18 19:03
+
+from django.db import migrations, models
+
+
+def create_closure_lock(apps, schema_editor):
+    # account.closure.LOCK_NAME, so the first refreshes don't race to create it
+    apps.get_model('account', 'HierarchyLock').objects.get_or_create(name='closure')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0004_hierarchyclosure'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HierarchyLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+            ],
+        ),
+        migrations.RunPython(create_closure_lock, migrations.RunPython.noop),
+    ]
@@ -40,3 +40,36 @@ class CustomUser(AbstractUser):
         verbose_name = "User"
         verbose_name_plural = "Users"
         ordering = ['-date_joined']
+
+
+class HierarchyClosure(models.Model):
+    """
+    Ancestor → descendant pairs of the ZM user → ASM user → Partner tree, with
+    a depth-0 row for every node, so "everything under X (or X itself)" is one
+    indexed lookup at any depth.
+
+    Kept in step from ZonalManager.asms / ASM.partners by account/signals.py;
+    rebuilt or checked with `manage.py rebuild_hierarchy_closure`.
+    """
+    ancestor = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="descendant_links")
+    descendant = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="ancestor_links")
+    depth = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["ancestor", "descendant"], name="unique_hierarchy_closure_pair"),
+        ]
+
+    def __str__(self):
+        return f"{self.ancestor_id} → {self.descendant_id} ({self.depth})"
+
+
+class HierarchyLock(models.Model):
+    """
+    Named rows that account/closure.py locks (select_for_update) to serialize
+    closure writers, apart from the MasterRevision("hierarchy") version row.
+    """
+    name = models.CharField(max_length=50, unique=True)
+
+    def __str__(self):
+        return self.name
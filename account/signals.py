@@ -0,0 +1,130 @@
+# account/signals.py
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from asm.models import ASM
+from partner.models import SDCollection
+from zonal_manager.models import ZonalManager, ZMDailyTarget
+
+from . import closure, dashboard_cache, hierarchy
+from .models import CustomUser
+
+
+# 📌 Remember who a row belonged to when loaded, so moving it invalidates both owners
+@receiver(post_init, sender=ZMDailyTarget)
+@receiver(post_init, sender=SDCollection)
+def remember_dashboard_owners(sender, instance, **kwargs):
+    instance._dashboard_owners = (getattr(instance, "zonal_manager_id", None), instance.asm_id)
+
+
+@receiver(post_save, sender=ZMDailyTarget)
+@receiver(post_delete, sender=ZMDailyTarget)
+def invalidate_target_dashboards(sender, instance, **kwargs):
+    old_zm, old_asm = instance._dashboard_owners
+    for zm_id in {old_zm, instance.zonal_manager_id}:
+        dashboard_cache.invalidate("zm", zm_id)
+    for asm_id in {old_asm, instance.asm_id}:
+        dashboard_cache.invalidate("asm", asm_id)
+    remember_dashboard_owners(sender, instance)
+
+
+@receiver(post_save, sender=SDCollection)
+@receiver(post_delete, sender=SDCollection)
+def invalidate_collection_dashboards(sender, instance, **kwargs):
+    # Only the ASM dashboard shows SD collections
+    _, old_asm = instance._dashboard_owners
+    for asm_id in {old_asm, instance.asm_id}:
+        dashboard_cache.invalidate("asm", asm_id)
+    remember_dashboard_owners(sender, instance)
+
+
+@receiver(m2m_changed, sender=ZonalManager.asms.through)
+def invalidate_zm_asm_count(sender, instance, action, reverse, pk_set, **kwargs):
+    # The ZM dashboard shows how many ASMs the ZM has
+    if not reverse:
+        zm_ids = (instance.pk,) if action.startswith("post_") else ()
+    elif action == "pre_clear":
+        zm_ids = list(instance.assigned_zms.values_list("pk", flat=True))
+    else:
+        zm_ids = (pk_set or ()) if action in ("post_add", "post_remove") else ()
+    for zm_id in zm_ids:
+        dashboard_cache.invalidate("zm", zm_id)
+
+
+# 🧭 Partner → ASM → ZM graph (account/hierarchy.py)
+HIERARCHY_NAME_FIELDS = {"username", "full_name"}
+
+
+@receiver(m2m_changed, sender=ASM.partners.through)
+@receiver(m2m_changed, sender=ZonalManager.asms.through)
+def invalidate_hierarchy_links(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        hierarchy.invalidate()
+
+
+@receiver(post_save, sender=ASM)
+@receiver(post_save, sender=ZonalManager)
+@receiver(post_delete, sender=ASM)
+@receiver(post_delete, sender=ZonalManager)
+def invalidate_hierarchy_profiles(sender, **kwargs):
+    # The profile's user may have changed (or it took its links with it)
+    hierarchy.invalidate()
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_hierarchy_names(sender, instance, update_fields=None, **kwargs):
+    # The graph carries names; last_login saves and the like leave it alone
+    if update_fields is not None and not HIERARCHY_NAME_FIELDS & set(update_fields):
+        return
+    if instance.role in ("Partner", "Area Sales Manager", "Zone Manager"):
+        hierarchy.invalidate()
+
+
+# 🌳 Closure table of the same tree (account/closure.py)
+@receiver(m2m_changed, sender=ASM.partners.through)
+@receiver(m2m_changed, sender=ZonalManager.asms.through)
+def refresh_closure_links(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # A user added to / removed from profiles: refresh that user's subtree
+        if action.startswith("post_"):
+            closure.refresh({instance.pk})
+        return
+    members = instance.partners if sender is ASM.partners.through else instance.asms
+    if action == "pre_clear":
+        instance._closure_cleared = set(members.values_list("pk", flat=True))
+    elif action == "post_clear":
+        closure.refresh(getattr(instance, "_closure_cleared", ()))
+    elif action in ("post_add", "post_remove"):
+        closure.refresh(pk_set)
+
+
+def _profile_members(instance):
+    members = instance.partners if isinstance(instance, ASM) else instance.asms
+    return {instance.user_id, *members.values_list("pk", flat=True)}
+
+
+@receiver(post_init, sender=ASM)
+@receiver(post_init, sender=ZonalManager)
+def remember_closure_user(sender, instance, **kwargs):
+    instance._closure_user_id = instance.user_id
+
+
+@receiver(post_save, sender=ASM)
+@receiver(post_save, sender=ZonalManager)
+def refresh_closure_profile(sender, instance, **kwargs):
+    # The profile's user may have changed: its members now hang under the new one
+    closure.refresh(_profile_members(instance) | {instance._closure_user_id})
+    instance._closure_user_id = instance.user_id
+
+
+@receiver(pre_delete, sender=ASM)
+@receiver(pre_delete, sender=ZonalManager)
+def remember_closure_members(sender, instance, **kwargs):
+    instance._closure_members = _profile_members(instance)
+
+
+@receiver(post_delete, sender=ASM)
+@receiver(post_delete, sender=ZonalManager)
+def refresh_closure_deleted_profile(sender, instance, **kwargs):
+    closure.refresh(getattr(instance, "_closure_members", {instance.user_id}))
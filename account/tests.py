@@ -1,3 +1,507 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from io import StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from activity.models import Task
+from asm.models import ASM
+from master.models import MasterRevision, State
+from partner.models import SDCollection
+from zonal_manager import rollups
+from zonal_manager.models import ZonalManager, ZMDailyTarget
+
+from . import closure, dashboard_cache, hierarchy
+from .models import HierarchyClosure
+from .views import month_starts
+
+User = get_user_model()
+
+
+class FixedDate(date):
+    @classmethod
+    def today(cls):
+        return cls(2025, 3, 15)
+
+
+class ZoneManagerDashboardTests(TestCase):
+    def setUp(self):
+        self.zm_user = User.objects.create_user(username="zm", password="pass", role="Zone Manager", email="zm@example.com")
+        self.asm = User.objects.create_user(username="asm", password="pass", role="Area Sales Manager", email="asm@example.com")
+        self.zm = ZonalManager.objects.create(user=self.zm_user)
+        self.zm.asms.add(self.asm)
+        self.client.login(username="zm", password="pass")
+        cache.clear()
+
+    def _target(self, day, **values):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ZMDailyTarget.objects.create(zonal_manager=self.zm, asm=self.asm, date=day, **values)
+
+    def _get(self):
+        with patch("account.views.date", FixedDate):
+            return self.client.get(reverse("zone_manager_dashboard"))
+
+    def test_month_starts_are_calendar_months(self):
+        self.assertEqual(
+            month_starts(date(2025, 3, 31), 4),
+            [date(2024, 12, 1), date(2025, 1, 1), date(2025, 2, 1), date(2025, 3, 1)],
+        )
+
+    def test_charts_group_by_calendar_month(self):
+        self._target(date(2025, 3, 15), application_target=10, application_achieve=5, pop_target=4,
+                     pop_achieve=2, sd_collection_achieve=1.5)
+        self._target(date(2025, 3, 1), application_target=10, application_achieve=10, sd_collection_achieve=2)
+        self._target(date(2025, 1, 31), application_target=3, application_achieve=1, sd_collection_achieve=7)
+        self._target(date(2024, 9, 30), application_target=1, application_achieve=1)  # outside the window
+
+        context = self._get().context
+        self.assertEqual(context["chart_months"], ["Oct", "Nov", "Dec", "Jan", "Feb", "Mar"])
+        self.assertEqual(context["chart_performance"], [0, 0, 0, 33.33, 0, 75.0])
+        self.assertEqual(context["chart_revenue"], [0, 0, 0, 7.0, 0, 3.5])
+        self.assertEqual(
+            (context["total_application_target"], context["total_application_achieve"], context["total_pop_target"],
+             context["total_revenue"], context["zone_performance"], context["total_asms"]),
+            (10, 5, 4, 1.5, 50, 1),
+        )
+
+    def test_deleting_an_asm_keeps_its_history_in_the_charts(self):
+        self._target(date(2025, 3, 1), application_target=10, application_achieve=5, sd_collection_achieve=2)
+        self._target(date(2025, 1, 31), application_target=3, application_achieve=1, sd_collection_achieve=7)
+        ZMDailyTarget.objects.create(zonal_manager=self.zm, date=date(2025, 3, 2), application_target=4,
+                                     application_achieve=4)  # an existing no-ASM bucket to merge into
+        before = self._get().context
+        with self.captureOnCommitCallbacks(execute=True):
+            self.asm.delete()
+        after = self._get().context
+        self.assertEqual(after["total_asms"], 0)
+        self.assertEqual((after["chart_performance"], after["chart_revenue"]),
+                         (before["chart_performance"], before["chart_revenue"]))
+        self.assertEqual(rollups.check(), [])
+
+    def test_query_count_does_not_grow_with_data(self):
+        # session, user, ZM profile, today's KPIs, ASM count, monthly series
+        with self.assertNumQueries(6):
+            self._get()
+        day = date(2024, 10, 1)
+        while day <= date(2025, 3, 31):
+            self._target(day, application_target=2, application_achieve=1)
+            day += timedelta(days=3)
+        with self.assertNumQueries(6):
+            self._get()
+
+    def test_todays_kpis_only_read_todays_rows(self):
+        with CaptureQueriesContext(connection) as queries:
+            self._get()
+        kpis = next(q["sql"] for q in queries if "total_application_target" in q["sql"])
+        self.assertIn('"zonal_manager_zmdailytarget"."date" =', kpis)
+        self.assertNotIn("CASE WHEN", kpis)
+
+
+class AreaSalesDashboardTests(TestCase):
+    def setUp(self):
+        self.asm = User.objects.create_user(username="asm", password="pass", role="Area Sales Manager", email="asm@example.com")
+        self.client.login(username="asm", password="pass")
+        cache.clear()
+
+    def test_revenue_series_and_kpis(self):
+        for day, app in [(date(2024, 11, 5), 4), (date(2024, 12, 1), 6), (date(2025, 1, 2), 8), (date(2025, 1, 20), 10)]:
+            ZMDailyTarget.objects.create(
+                asm=self.asm, date=day, application_target=10, application_achieve=app, calls_target=10, calls_achieve=5,
+            )
+        for day, amount in [(date(2024, 12, 9), 150000), (date(2025, 1, 3), 50000), (date(2025, 1, 30), 25000),
+                            (date(2023, 1, 3), 100000)]:
+            SDCollection.objects.create(asm=self.asm, date=day, amount=amount)
+        SDCollection.objects.create(asm=self.asm, date=date(2025, 1, 4), amount=999999, is_deleted=True)
+
+        with self.assertNumQueries(5):  # session, user, target rows, KPI aggregate, grouped revenue
+            context = self.client.get(reverse("area_sales_dashboard")).context
+
+        self.assertEqual(context["chart_months"], ["Nov", "Dec", "Jan", "Jan"])
+        self.assertEqual(context["chart_performance"], [45.0, 55.0, 65.0, 75.0])
+        self.assertEqual(context["chart_revenue"], [0.0, 1.5, 0.75, 0.75])
+        self.assertEqual(context["total_revenue"], 3.25)
+        self.assertEqual((context["total_application_target"], context["total_application_achieve"]), (40, 28))
+        self.assertEqual(context["asm_performance"], 60.0)
+
+
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.zm_user = User.objects.create_user(username="zm", password="pass", role="Zone Manager", email="zm@example.com")
+        self.asm = User.objects.create_user(username="asm", password="pass", role="Area Sales Manager", email="asm@example.com")
+        self.other_asm = User.objects.create_user(username="asm2", password="pass", role="Area Sales Manager", email="asm2@example.com")
+        self.zm = ZonalManager.objects.create(user=self.zm_user)
+        self.zm.asms.add(self.asm)
+        self.today = date.today()
+        self.client.force_login(self.zm_user)
+
+    def _zm_dashboard(self):
+        return self.client.get(reverse("zone_manager_dashboard")).context
+
+    def test_process_local_cache_is_warned_about(self):
+        with override_settings(DEBUG=False), self.assertLogs("account.dashboard_cache", "WARNING") as logs:
+            self.assertTrue(dashboard_cache.warn_if_process_local())
+        self.assertIn("REDIS_URL", logs.output[0])
+        with override_settings(DEBUG=True):
+            self.assertFalse(dashboard_cache.warn_if_process_local())
+
+    def test_cached_until_a_relevant_write(self):
+        self.assertEqual(self._zm_dashboard()["total_application_target"], 0)
+        with self.assertNumQueries(3):  # session, user, ZM profile — the numbers come from the cache
+            self._zm_dashboard()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            target = ZMDailyTarget.objects.create(zonal_manager=self.zm, asm=self.asm, date=self.today, application_target=5)
+        self.assertEqual(self._zm_dashboard()["total_application_target"], 5)
+
+        target.application_target = 7
+        with self.captureOnCommitCallbacks(execute=True):
+            target.save()
+        self.assertEqual(self._zm_dashboard()["total_application_target"], 7)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.zm.asms.add(self.other_asm)
+        self.assertEqual(self._zm_dashboard()["total_asms"], 2)
+
+    def test_nothing_is_invalidated_before_commit(self):
+        generations = lambda: (dashboard_cache.generation("zm", self.zm.pk), dashboard_cache.generation("asm", self.asm.pk))
+        before = generations()
+        with self.captureOnCommitCallbacks() as callbacks:
+            ZMDailyTarget.objects.create(zonal_manager=self.zm, asm=self.asm, date=self.today, application_target=5)
+            SDCollection.objects.create(asm=self.asm, date=self.today, amount=10)
+            # Other connections still read the old rows: the generations must not move yet
+            self.assertEqual(generations(), before)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(generations()[0], before[0])
+        self.assertNotEqual(generations()[1], before[1])
+
+    def test_writes_only_invalidate_their_owners(self):
+        other_zm = ZonalManager.objects.create()
+        zm_gen, asm_gen = dashboard_cache.generation("zm", self.zm.pk), dashboard_cache.generation("asm", self.asm.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            ZMDailyTarget.objects.create(zonal_manager=other_zm, asm=self.other_asm, date=self.today)
+            SDCollection.objects.create(asm=self.other_asm, date=self.today, amount=10)
+        self.assertEqual(dashboard_cache.generation("zm", self.zm.pk), zm_gen)
+        self.assertEqual(dashboard_cache.generation("asm", self.asm.pk), asm_gen)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            SDCollection.objects.create(asm=self.asm, date=self.today, amount=10)
+        self.assertNotEqual(dashboard_cache.generation("asm", self.asm.pk), asm_gen)
+
+    def test_moving_a_row_invalidates_the_previous_asm(self):
+        target = ZMDailyTarget.objects.create(zonal_manager=self.zm, asm=self.asm, date=self.today)
+        target = ZMDailyTarget.objects.get(pk=target.pk)
+        before = dashboard_cache.generation("asm", self.asm.pk)
+        target.asm = self.other_asm
+        with self.captureOnCommitCallbacks(execute=True):
+            target.save()
+        self.assertNotEqual(dashboard_cache.generation("asm", self.asm.pk), before)
+
+    @override_settings(DASHBOARD_CACHE_TTL=0, DASHBOARD_CACHE_WAIT=0.1)
+    def test_stale_entry_is_served_while_another_request_recomputes(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"n": len(calls)}
+
+        self.assertEqual(dashboard_cache.get_or_compute("zm", 1, self.today, compute), {"n": 1})
+        # TTL 0 → stale; with the recompute lock held elsewhere the stale copy is returned
+        key = f"dashboard:zm:1:{dashboard_cache.generation('zm', 1)}:{self.today.isoformat()}"
+        cache.add(f"{key}:lock", 1)
+        self.assertEqual(dashboard_cache.get_or_compute("zm", 1, self.today, compute), {"n": 1})
+        cache.delete(f"{key}:lock")
+        self.assertEqual(dashboard_cache.get_or_compute("zm", 1, self.today, compute), {"n": 2})
+
+
+class QueryPlanTests(TestCase):
+    """The list views' queries on the big tables must be served by an index (migrations / Meta.indexes)."""
+
+    TABLES = ("zonal_manager_zmdailytarget", "partner_sdcollection", "activity_task", "account_hierarchyclosure")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.zm_user = User.objects.create_user(username="zm", password="pass", role="Zone Manager", email="zm@example.com")
+        other_zm_user = User.objects.create_user(username="zm2", role="Zone Manager", email="zm2@example.com")
+        cls.zm = ZonalManager.objects.create(user=cls.zm_user)
+        other_zm = ZonalManager.objects.create(user=other_zm_user)
+        asms = [
+            User.objects.create_user(username=f"asm{i}", password="pass", role="Area Sales Manager",
+                                     email=f"asm{i}@example.com")
+            for i in range(4)
+        ]
+        cls.zm.asms.add(*asms[:2])
+        other_zm.asms.add(*asms[2:])
+
+        start = date(2025, 3, 1)
+        days = [start + timedelta(days=n) for n in range(30)]
+        ZMDailyTarget.objects.bulk_create([
+            ZMDailyTarget(zonal_manager=cls.zm if i < 2 else other_zm, asm=asm, date=day, application_target=5)
+            for i, asm in enumerate(asms) for day in days
+        ])
+        SDCollection.objects.bulk_create([
+            SDCollection(zone_manager=cls.zm if i < 2 else other_zm, asm=asm, date=day, amount=100,
+                         status="completed" if day.day % 2 else "pending", is_deleted=day.day % 7 == 0)
+            for i, asm in enumerate(asms) for day in days
+        ])
+        Task.objects.bulk_create([
+            Task(title="Visit", assigned_by=cls.zm_user if i < 2 else other_zm_user, assigned_to=asm,
+                 start_date=day, end_date=day, status="completed" if day.day % 2 else "pending",
+                 is_deleted=day.day % 7 == 0)
+            for i, asm in enumerate(asms) for day in days
+        ])
+
+    def _queries(self, username, url, params=None):
+        """(sql, params) of every SELECT the view runs on one of TABLES."""
+        self.client.login(username=username, password="pass")
+        captured = []
+
+        def capture(execute, sql, sql_params, many, context):
+            if sql.lstrip().upper().startswith("SELECT") and any(table in sql for table in self.TABLES):
+                captured.append((sql, sql_params))
+            return execute(sql, sql_params, many, context)
+
+        with connection.execute_wrapper(capture):
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(captured, f"{url} ran no query on {self.TABLES}")
+        return captured
+
+    def _full_scans(self, sql, params):
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                # Tiny tables are cheaper to scan; make the planner show whether an index is usable at all
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute(f"EXPLAIN {sql}", params)
+                plan = [row[0] for row in cursor.fetchall()]
+                return [line for line in plan if any(f"Seq Scan on {table}" in line for table in self.TABLES)]
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = [row[-1] for row in cursor.fetchall()]
+            # "SCAN t" and "SCAN t USING INDEX" both read the whole table; "SEARCH t USING INDEX" doesn't
+            return [line for line in plan if line.split()[:1] == ["SCAN"] and line.split()[1] in self.TABLES]
+
+    def assertIndexed(self, username, url_name, params=None):
+        for sql, sql_params in self._queries(username, reverse(url_name), params):
+            self.assertEqual(self._full_scans(sql, sql_params), [], sql)
+
+    def test_zm_daily_target_list(self):
+        self.assertIndexed("zm", "daily_target")
+        self.assertIndexed("zm", "daily_target", {"from_date": "2025-03-05", "to_date": "2025-03-20"})
+
+    def test_asm_daily_target_list(self):
+        self.assertIndexed("asm0", "asm_daily_target")
+
+    def test_zm_sd_collections(self):
+        self.assertIndexed("zm", "sd_collection_list_zm", {"status": "pending", "start_date": "2025-03-05"})
+
+    def test_asm_sd_collections(self):
+        self.assertIndexed("asm0", "asm_sd_list", {"start_date": "2025-03-05"})
+
+    def test_zm_task_list(self):
+        self.assertIndexed("zm", "zm_task_list", {"start_date": "2025-03-05", "end_date": "2025-03-20"})
+
+    def test_asm_task_list(self):
+        self.assertIndexed("asm0", "asm_task_list", {"status": "pending"})
+
+    def test_unindexed_filter_is_reported(self):
+        sql, params = SDCollection.objects.filter(amount=100).query.sql_with_params()
+        self.assertTrue(self._full_scans(sql, params))
+
+
+class HierarchyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.zm_user = User.objects.create_user(username="zm7", role="Zone Manager", email="zm7@example.com",
+                                                full_name="Zara Manager")
+        self.asm_user = User.objects.create_user(username="asm7", role="Area Sales Manager", email="asm7@example.com")
+        self.other_asm = User.objects.create_user(username="asm8", role="Area Sales Manager", email="asm8@example.com")
+        self.partners = [
+            User.objects.create_user(username=f"p7{i}", role="Partner", email=f"p7{i}@example.com") for i in range(3)
+        ]
+        self.zm = ZonalManager.objects.create(user=self.zm_user)
+        self.zm.asms.add(self.asm_user)
+        self.asm = ASM.objects.create(user=self.asm_user)
+        self.asm.partners.add(*self.partners[:2])
+
+    def test_resolves_up_and_down_from_one_build(self):
+        with self.assertNumQueries(3):  # revision, one query per relation
+            graph = hierarchy.current()
+        with self.assertNumQueries(1):  # revision
+            owners = hierarchy.current().owners_of_partner(self.partners[0].pk)
+            self.assertEqual((owners.asm.username, owners.zm_id, owners.zm.name), ("asm7", self.zm.pk, "Zara Manager"))
+            self.assertEqual(graph.owners_of_partner(self.partners[2].pk), hierarchy.NO_OWNERS)
+            self.assertEqual(graph.owners(self.asm_user).zm.username, "zm7")
+            resolved = graph.resolve(self.partners)
+            self.assertEqual([resolved[p.pk].asm and resolved[p.pk].asm.id for p in self.partners],
+                             [self.asm_user.pk, self.asm_user.pk, None])
+            self.assertEqual(sorted(graph.partners_under_zm(self.zm.pk)), sorted(p.pk for p in self.partners[:2]))
+
+    def test_relation_and_name_changes_rebuild_the_graph(self):
+        hierarchy.current()
+        self.asm.partners.add(self.partners[2])
+        self.assertEqual(hierarchy.current().owners_of_partner(self.partners[2].pk).asm.id, self.asm_user.pk)
+
+        self.zm.asms.remove(self.asm_user)
+        self.zm.asms.add(self.other_asm)
+        self.assertIsNone(hierarchy.current().owners_of_partner(self.partners[0].pk).zm)
+
+        self.asm.user = self.other_asm
+        self.asm.save()
+        self.assertEqual(hierarchy.current().owners_of_partner(self.partners[0].pk).zm.username, "zm7")
+
+        self.zm_user.full_name = "Zoe"
+        self.zm_user.save()
+        self.assertEqual(hierarchy.current().owners_of_partner(self.partners[0].pk).zm.name, "Zoe")
+
+        graph = hierarchy.current()
+        self.zm_user.save(update_fields=["last_login"])
+        self.assertIs(hierarchy.current(), graph)
+
+    def test_other_processes_rebuild_after_their_change_and_rollbacks_are_ignored(self):
+        graph = hierarchy.current()
+        # A change committed by another process: only the revision row moves here
+        MasterRevision.objects.filter(name=hierarchy.REVISION_NAME).update(revision=F("revision") + 1)
+        self.assertIsNot(hierarchy.current(), graph)
+
+        class Rollback(Exception):
+            pass
+
+        with self.assertRaises(Rollback):
+            with transaction.atomic():
+                self.asm.partners.add(self.partners[2])
+                self.assertEqual(hierarchy.current().owners_of_partner(self.partners[2].pk).asm.id, self.asm_user.pk)
+                raise Rollback
+        self.assertEqual(hierarchy.current().owners_of_partner(self.partners[2].pk), hierarchy.NO_OWNERS)
+
+    def test_partner_details_endpoint_uses_the_graph(self):
+        self.client.force_login(self.zm_user)
+        hierarchy.current()
+        data = self.client.get(reverse("get_partner_details", args=[self.partners[1].pk])).json()
+        self.assertEqual((data["asm"], data["asm_id"], data["zm"], data["zm_id"]),
+                         ("asm7", self.asm_user.pk, "zm7", self.zm.pk))
+
+        self.client.force_login(self.asm_user)
+        data = self.client.get(reverse("asm_get_partner_details", args=[self.partners[1].pk])).json()
+        self.assertEqual((data["asm_name"], data["zm_name"], data["zm_id"]), ("asm7", "Zara Manager", self.zm.pk))
+
+
+class ClosureTests(TestCase):
+    def setUp(self):
+        self.zm_user = User.objects.create_user(username="zm8", role="Zone Manager", email="zm8@example.com")
+        self.asm_user = User.objects.create_user(username="asm9", role="Area Sales Manager", email="asm9@example.com")
+        self.other_asm = User.objects.create_user(username="asm10", role="Area Sales Manager", email="asm10@example.com")
+        self.partner = User.objects.create_user(username="p8", role="Partner", email="p8@example.com")
+        self.zm = ZonalManager.objects.create(user=self.zm_user)
+        self.asm = ASM.objects.create(user=self.asm_user)
+        self.zm.asms.add(self.asm_user)
+        self.asm.partners.add(self.partner)
+
+    def _pairs(self):
+        return set(HierarchyClosure.objects.exclude(depth=0).values_list("ancestor_id", "descendant_id", "depth"))
+
+    def test_follows_link_changes(self):
+        self.assertEqual(self._pairs(), {
+            (self.zm_user.pk, self.asm_user.pk, 1),
+            (self.asm_user.pk, self.partner.pk, 1),
+            (self.zm_user.pk, self.partner.pk, 2),
+        })
+        self.zm.asms.remove(self.asm_user)
+        self.assertEqual(self._pairs(), {(self.asm_user.pk, self.partner.pk, 1)})
+
+        self.other_asm.assigned_zms.add(self.zm)  # reverse side
+        self.asm.user = self.other_asm
+        self.asm.save()
+        self.assertEqual(self._pairs(), {
+            (self.zm_user.pk, self.other_asm.pk, 1),
+            (self.other_asm.pk, self.partner.pk, 1),
+            (self.zm_user.pk, self.partner.pk, 2),
+        })
+
+        self.asm.partners.clear()
+        self.assertEqual(self._pairs(), {(self.zm_user.pk, self.other_asm.pk, 1)})
+        self.zm.delete()
+        self.assertEqual(self._pairs(), set())
+        self.assertEqual(closure.check(), [])
+
+    def test_refresh_takes_the_tree_lock_before_walking(self):
+        with CaptureQueriesContext(connection) as queries:
+            closure.refresh({self.partner.pk})
+        sql = [query["sql"] for query in queries.captured_queries if not query["sql"].startswith(("SAVEPOINT", "RELEASE"))]
+        self.assertIn('"account_hierarchylock"', sql[0])
+        self.assertEqual(closure.check(), [])
+
+    def test_scoped_querysets_are_one_subquery(self):
+        outsider = User.objects.create_user(username="asm11", role="Area Sales Manager", email="asm11@example.com")
+        today = date(2025, 3, 1)
+        for asm in (self.asm_user, outsider):
+            SDCollection.objects.create(asm=asm, partner=self.partner, amount=5, date=today)
+            ZMDailyTarget.objects.create(zonal_manager=self.zm, asm=asm, date=today)
+            Task.objects.create(title="Visit", assigned_to=asm)
+
+        with self.assertNumQueries(3):
+            self.assertEqual([c.asm_id for c in closure.sd_collections_under(self.zm_user)], [self.asm_user.pk])
+            self.assertEqual([t.asm_id for t in closure.targets_under(self.zm_user)], [self.asm_user.pk])
+            self.assertEqual([t.assigned_to_id for t in closure.tasks_under(self.asm_user)], [self.asm_user.pk])
+
+    def test_rebuild_and_check_command(self):
+        HierarchyClosure.objects.filter(depth=2).delete()
+        with self.assertRaises(CommandError):
+            call_command("rebuild_hierarchy_closure", "--check", stdout=StringIO())
+        call_command("rebuild_hierarchy_closure", stdout=StringIO())
+        call_command("rebuild_hierarchy_closure", "--check", stdout=StringIO())
+        self.assertIn((self.zm_user.pk, self.partner.pk, 2), self._pairs())
+
+
+class CustomUserChangelistTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="root", password="pass", email="root@example.com")
+        zm_user = User.objects.create_user(username="zm9", role="Zone Manager", email="zm9@example.com", full_name="Zed")
+        self.asm_user = User.objects.create_user(username="asm12", role="Area Sales Manager", email="asm12@example.com")
+        self.zm = ZonalManager.objects.create(user=zm_user)
+        self.zm.asms.add(self.asm_user)
+        asm = ASM.objects.create(user=self.asm_user)
+        self.partners = [
+            User.objects.create_user(username=f"p9{i:02}", role="Partner", email=f"p9{i:02}@example.com")
+            for i in range(30)
+        ]
+        asm.partners.add(*self.partners[:20])
+        self.partners[0].states.add(State.objects.create(name="Kerala"))
+        self.client.force_login(self.admin)
+
+    def _changelist(self, per_page, **params):
+        with patch("account.admin.CustomUserAdmin.list_per_page", per_page), CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("admin:account_customuser_changelist"), {"role__exact": "Partner", **params})
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        small, small_queries = self._changelist(5)
+        large, large_queries = self._changelist(30)
+        self.assertEqual(len(large.context["cl"].result_list), 30)
+        self.assertEqual(small_queries, large_queries)
+
+        row = {u.pk: u for u in large.context["cl"].result_list}[self.partners[0].pk]
+        self.assertEqual((row.asm_name, row.zm_name, row.states_count, row.offices_count), ("asm12", "Zed", 1, 0))
+
+    def test_sort_and_filter_on_the_annotations(self):
+        response, _ = self._changelist(50, asm=str(self.asm_user.pk))
+        self.assertEqual(len(response.context["cl"].result_list), 20)
+        response, _ = self._changelist(50, zm="none")
+        self.assertEqual(len(response.context["cl"].result_list), 10)
+
+        columns = list(response.context["cl"].list_display)
+        response, _ = self._changelist(50, o=f"-{columns.index('get_asm_name')}")
+        self.assertEqual({u.asm_name for u in response.context["cl"].result_list[:20]}, {"asm12"})
+
+    def test_change_page_still_opens(self):
+        response = self.client.get(reverse("admin:account_customuser_change", args=[self.partners[0].pk]))
+        self.assertEqual(response.status_code, 200)
@@ -2,6 +2,7 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import login, logout
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from . import dashboard_cache
 from .forms import LoginForm
 
 
@@ -66,8 +67,22 @@ def admin_dashboard(request):
 
 
 from datetime import date
+from django.db.models import Sum
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear
 from account.models import CustomUser 
-from zonal_manager.models import ZonalManager, ZMDailyTarget
+from zonal_manager.models import ZonalManager, ZMDailyTarget, ZMTargetRollup
+
+
+def month_starts(today, count):
+    """First days of the last `count` calendar months, oldest first (ending with today's month)."""
+    starts = []
+    year, month = today.year, today.month
+    for _ in range(count):
+        starts.append(date(year, month, 1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return starts[::-1]
+
+
 @login_required
 def zone_manager_dashboard(request):
     if request.user.role != 'Zone Manager':
@@ -80,60 +95,73 @@ def zone_manager_dashboard(request):
         messages.error(request, "Zonal Manager profile not found.")
         return redirect(get_dashboard_url(request.user))
 
-    # Get today's target data for all ASMs under this ZM
     today = date.today()
-    targets = ZMDailyTarget.objects.filter(
-        zonal_manager=zm_profile,
-        date=today
+    context = dashboard_cache.get_or_compute(
+        "zm", zm_profile.pk, today, lambda: zone_manager_context(zm_profile, today)
     )
+    return render(request, 'dashboards/zone_manager.html', context)
 
-    # Aggregate KPI values
-    total_application_target = sum(t.application_target for t in targets)
-    total_application_achieve = sum(t.application_achieve for t in targets)
 
-    total_pop_target = sum(t.pop_target for t in targets)
-    total_pop_achieve = sum(t.pop_achieve for t in targets)
+def zone_manager_context(zm_profile, today):
+    """ZM dashboard numbers: today's KPIs and the six-month charts (3 queries)."""
+    zone_targets = ZMDailyTarget.objects.filter(zonal_manager=zm_profile)
 
-    total_revenue = sum(t.sd_collection_achieve for t in targets)
+    # Today's KPIs for all ASMs under this ZM — one aggregate over today's rows
+    # (the WHERE on date lets the (zonal_manager, date) index limit the scan)
+    kpis = zone_targets.filter(date=today).aggregate(
+        total_application_target=Coalesce(Sum("application_target"), 0.0),
+        total_application_achieve=Coalesce(Sum("application_achieve"), 0.0),
+        total_pop_target=Coalesce(Sum("pop_target"), 0.0),
+        total_pop_achieve=Coalesce(Sum("pop_achieve"), 0.0),
+        total_revenue=Coalesce(Sum("sd_collection_achieve"), 0.0),
+    )
+    total_application_target = kpis["total_application_target"]
+    total_application_achieve = kpis["total_application_achieve"]
+    total_pop_target = kpis["total_pop_target"]
+    total_pop_achieve = kpis["total_pop_achieve"]
+    total_revenue = kpis["total_revenue"]
 
     total_asms = zm_profile.asms.count()
 
     district_coverage = "7/8"  # If you have a real calculation, replace this
 
-    # For charts: Monthly performance & revenue trends
-    # Example: past 6 months
-    import datetime
-    from django.db.models import Sum
+    # For charts: performance & revenue of the last 6 calendar months, from the monthly rollups
+    chart_start = month_starts(today, 6)
+    monthly = {
+        row["period_start"]: row
+        for row in ZMTargetRollup.objects.filter(
+            zonal_manager=zm_profile, period="month", period_start__gte=chart_start[0]
+        )
+        .values("period_start")
+        .annotate(
+            application_target=Sum("application_target"),
+            application_achieve=Sum("application_achieve"),
+            revenue=Sum("sd_collection_achieve"),
+        )
+        .order_by("period_start")
+    }
 
     months = []
     performance_data = []
     revenue_data = []
 
-    for i in range(5, -1, -1):
-        month_start = datetime.date(today.year, today.month, 1) - datetime.timedelta(days=i*30)
-        month_end = month_start.replace(day=28) + datetime.timedelta(days=4)
-        month_end = month_end - datetime.timedelta(days=month_end.day)
-
-        monthly_targets = ZMDailyTarget.objects.filter(
-            zonal_manager=zm_profile,
-            date__range=[month_start, month_end]
-        )
-
-        if monthly_targets.exists():
-            performance = sum(t.application_achieve for t in monthly_targets) / sum(t.application_target for t in monthly_targets) * 100 if sum(t.application_target for t in monthly_targets) > 0 else 0
-            revenue = sum(t.sd_collection_achieve for t in monthly_targets)
+    for month_start in chart_start:
+        row = monthly.get(month_start)
+        if row and row["application_target"] > 0:
+            performance = row["application_achieve"] / row["application_target"] * 100
         else:
             performance = 0
-            revenue = 0
+        revenue = row["revenue"] if row else 0
 
         months.append(month_start.strftime("%b"))
         performance_data.append(round(performance, 2))
         revenue_data.append(round(revenue, 2))
-        if total_application_target > 0:
-            zone_performance = round((total_application_achieve / total_application_target) * 100, 0)
-        else:
-            zone_performance = 0
-    context = {
+
+    if total_application_target > 0:
+        zone_performance = round((total_application_achieve / total_application_target) * 100, 0)
+    else:
+        zone_performance = 0
+    return {
         "total_application_target": total_application_target,
         "total_application_achieve": total_application_achieve,
         "total_pop_target": total_pop_target,
@@ -147,8 +175,6 @@ def zone_manager_dashboard(request):
         "zone_performance": zone_performance,
     }
 
-    return render(request, 'dashboards/zone_manager.html', context)
-
 
 
 @login_required
@@ -164,99 +190,74 @@ from django.contrib.auth import get_user_model
 User = get_user_model()
 from zonal_manager.models import ZMDailyTarget
 from partner.models import SDCollection
+from partner import ledger
 from django.contrib.auth import get_user_model
 from django.db import models  #
 User = get_user_model()
-@login_required
-def area_sales_dashboard(request):
-    if request.user.role != "Area Sales Manager":
-        messages.error(request, "Access Denied.")
-        return redirect('/')
-
-    asm_user = request.user
-
-    # Last 6 target entries
-    last_6 = ZMDailyTarget.objects.filter(
-        asm=asm_user
-    ).order_by("-date")[:6][::-1]
 
-    # ---- KPI CALCULATIONS ----
-    total_application_target = sum(t.application_target for t in last_6)
-    total_application_achieve = sum(t.application_achieve for t in last_6)
 
-    total_pop_target = sum(t.pop_target for t in last_6)
-    total_pop_achieve = sum(t.pop_achieve for t in last_6)
+def area_sales_context(asm_user):
+    """ASM dashboard numbers: last 6 target rows, their KPIs and monthly SD revenue (3 queries)."""
+    # Last 6 target entries (totals are stored columns)
+    last_6 = list(
+        ZMDailyTarget.objects.filter(asm=asm_user).order_by("-date")[:6]
+    )[::-1]
 
-    # Revenue (Lakhs)
-    total_revenue = SDCollection.objects.filter(
-        asm=asm_user,
-        is_deleted=False
-    ).aggregate(total=models.Sum("amount"))["total"] or 0
+    # ---- KPI CALCULATIONS (one aggregate over the same 6 rows) ----
+    kpis = ZMDailyTarget.objects.filter(pk__in=[t.pk for t in last_6]).totals(
+        total_application_target=Coalesce(Sum("application_target"), 0.0),
+        total_application_achieve=Coalesce(Sum("application_achieve"), 0.0),
+        total_pop_target=Coalesce(Sum("pop_target"), 0.0),
+        total_pop_achieve=Coalesce(Sum("pop_achieve"), 0.0),
+    )
 
     # ---- PERFORMANCE % ----
-    total_zm_target = 0
-    total_asm_achieve = 0
-
-    for t in last_6:
-        zm_t = (
-            t.application_target + t.pop_target + t.esign_target +
-            t.new_taluk_target + t.new_live_partners_target +
-            t.activations_target + t.calls_target + t.sd_collection_target
-        )
-        asm_a = (
-            t.application_achieve + t.pop_achieve + t.esign_achieve +
-            t.new_taluk_achieve + t.new_live_partners_achieve +
-            t.activations_achieve + t.calls_achieve + t.sd_collection_achieve
-        )
-
-        total_zm_target += zm_t
-        total_asm_achieve += asm_a
-
+    total_zm_target = kpis["total_target"]
+    total_asm_achieve = kpis["total_achieve"]
     asm_performance = round((total_asm_achieve / total_zm_target) * 100, 1) if total_zm_target > 0 else 0
 
+    # Revenue (Lakhs): SD collections grouped by year/month in one query
+    monthly_revenue = {
+        (row["year"], row["month"]): row["total"]
+        for row in SDCollection.objects.filter(asm=asm_user, is_deleted=False)
+        .annotate(year=ExtractYear("date"), month=ExtractMonth("date"))
+        .values("year", "month")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    }
+    total_revenue = sum(monthly_revenue.values()) or 0
+
     # ---- CHART DATA ----
     chart_months = [t.date.strftime("%b") for t in last_6]
-    chart_performance = []
-    chart_revenue = []
-
-    for t in last_6:
-        # Performance month-wise
-        zm_t = (
-            t.application_target + t.pop_target + t.esign_target +
-            t.new_taluk_target + t.new_live_partners_target +
-            t.activations_target + t.calls_target + t.sd_collection_target
-        )
-        asm_a = (
-            t.application_achieve + t.pop_achieve + t.esign_achieve +
-            t.new_taluk_achieve + t.new_live_partners_achieve +
-            t.activations_achieve + t.calls_achieve + t.sd_collection_achieve
-        )
-        perf = round((asm_a / zm_t) * 100, 1) if zm_t > 0 else 0
-        chart_performance.append(perf)
+    chart_performance = [round(t.achievement_percent, 1) for t in last_6]
+    chart_revenue = [
+        float(monthly_revenue.get((t.date.year, t.date.month), 0) / 100000) for t in last_6
+    ]
 
-        # Revenue month-wise
-        month_rev = SDCollection.objects.filter(
-            asm=asm_user,
-            date__month=t.date.month,
-            date__year=t.date.year,
-            is_deleted=False
-        ).aggregate(total=models.Sum("amount"))["total"] or 0
-
-        chart_revenue.append(float(month_rev / 100000))
-
-    context = {
-        "asm_profile": asm_user,
+    return {
         "asm_performance": asm_performance,
-        "total_application_target": total_application_target,
-        "total_application_achieve": total_application_achieve,
-        "total_pop_target": total_pop_target,
-        "total_pop_achieve": total_pop_achieve,
+        "total_application_target": kpis["total_application_target"],
+        "total_application_achieve": kpis["total_application_achieve"],
+        "total_pop_target": kpis["total_pop_target"],
+        "total_pop_achieve": kpis["total_pop_achieve"],
         "total_revenue": round(total_revenue / 100000, 2),
         "chart_months": chart_months,
         "chart_performance": chart_performance,
         "chart_revenue": chart_revenue,
     }
 
+
+@login_required
+def area_sales_dashboard(request):
+    if request.user.role != "Area Sales Manager":
+        messages.error(request, "Access Denied.")
+        return redirect('/')
+
+    asm_user = request.user
+    context = dashboard_cache.get_or_compute(
+        "asm", asm_user.pk, date.today(), lambda: area_sales_context(asm_user)
+    )
+    context = {**context, "asm_profile": asm_user}
     return render(request, "dashboards/area_sales.html", context)
 
 
@@ -289,4 +290,5 @@ def partner_dashboard(request):
     if request.user.role != 'Partner':
         messages.error(request, "Access Denied.")
         return redirect(get_dashboard_url(request.user))
-    return render(request, 'dashboards/partner.html')
+    # One row per partner, kept current by partner/signals.py
+    return render(request, 'dashboards/partner.html', {'ledger': ledger.for_partner(request.user)})
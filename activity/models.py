@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 from django.conf import settings
 from master.models import TaskCategory  # Assuming TaskCategory is in master app
@@ -59,6 +60,12 @@ class Task(models.Model):
         ordering = ['-created_at']
         verbose_name = "Task"
         verbose_name_plural = "Tasks"
+        indexes = [
+            # ZM task list: assigned_by=…, start_date >= …, end_date <= …
+            models.Index(fields=['assigned_by', 'start_date', 'end_date'], name='task_assigner_dates'),
+            # ASM task list: assigned_to=…, is_deleted=False, optional status
+            models.Index(fields=['assigned_to', 'status'], condition=Q(is_deleted=False), name='task_assignee_live_status'),
+        ]
 
 
 # 📝 Notes for a Task
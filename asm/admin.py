@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.db.models import Count
+
 from .models import ASM
 from .forms import ASMForm
 
@@ -9,10 +11,13 @@ class ASMAdmin(admin.ModelAdmin):
     search_fields = ('user__username', 'user__first_name', 'user__last_name')
     list_filter = ('created_at',)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("user").annotate(partners_total=Count("partners"))
+
     def asm_name(self, obj):
         return obj.user.get_full_name() if obj.user else "Unassigned"
     asm_name.short_description = "Area Sales Manager"
 
+    @admin.display(description="Partners Assigned", ordering="partners_total")
     def partner_count(self, obj):
-        return obj.partners.count()
-    partner_count.short_description = "Partners Assigned"
+        return obj.partners_total
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.19 on 2026-10-18 17:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ASM',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('partners', models.ManyToManyField(blank=True, help_text='Select Partners under this ASM', limit_choices_to={'role': 'Partner'}, related_name='assigned_asms', to=settings.AUTH_USER_MODEL)),
+                ('user', models.OneToOneField(blank=True, limit_choices_to={'role': 'Area Sales Manager'}, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='asm_profile', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
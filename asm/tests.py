@@ -1,3 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from asm.models import ASM
+
+User = get_user_model()
+
+
+class ASMAdminTests(TestCase):
+    def setUp(self):
+        self.client.force_login(
+            User.objects.create_superuser(username="root", password="pass", email="root@example.com")
+        )
+        for a in range(3):
+            asm = ASM.objects.create(
+                user=User.objects.create_user(username=f"asm3{a}", role="Area Sales Manager", email=f"asm3{a}@example.com")
+            )
+            asm.partners.add(*[
+                User.objects.create_user(username=f"p3{a}{p}", role="Partner", email=f"p3{a}{p}@example.com")
+                for p in range(a)
+            ])
+
+    def test_partner_counts_are_annotated_and_sortable(self):
+        url = reverse("admin:asm_asm_changelist")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"o": "-2"})
+        self.assertEqual([asm.partners_total for asm in response.context["cl"].result_list], [2, 1, 0])
+
+        ASM.objects.create(
+            user=User.objects.create_user(username="asm39", role="Area Sales Manager", email="asm39@example.com")
+        )
+        with CaptureQueriesContext(connection) as more:
+            self.client.get(url)
+        self.assertEqual(len(more), len(queries))
@@ -5,6 +5,7 @@ from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from zonal_manager.models import ZMDailyTarget, ZonalManager
+from zonal_manager.views import TARGET_SORT_LABELS, filter_by_achievement
 from account.models import CustomUser
 from django.shortcuts import render, get_object_or_404, redirect
 from decimal import Decimal, InvalidOperation
@@ -23,62 +24,29 @@ def asm_daily_target(request):
         messages.error(request, "Access Denied.")
         return redirect(get_dashboard_url(request.user))
 
-    targets = ZMDailyTarget.objects.filter(asm=request.user).order_by('-date')
+    targets = ZMDailyTarget.objects.filter(asm=request.user)
+    # Achievement filter + sort on the stored total/percent columns
+    targets, ordering, sort, min_percent, max_percent = filter_by_achievement(targets, request.GET)
+    targets = targets.order_by(*ordering)
 
     for t in targets:
+        # ZM total target (given by ZM) and ASM total achieve are stored on the row
+        t.zm_total_target = t.total_target
+        # ASM target = ZM target (unless ASM target fields are used)
+        t.asm_total_target = t.total_target
+        t.asm_total_achieve = t.total_achieve
 
-        # ---------------------------
-        # ZM total target (given by ZM)
-        # ---------------------------
-        t.zm_total_target = (
-            t.application_target +
-            t.pop_target +
-            t.esign_target +
-            t.new_taluk_target +
-            t.new_live_partners_target +
-            t.activations_target +
-            t.calls_target +
-            t.sd_collection_target
-        )
-
-        # ---------------------------
-        # ASM total target
-        # (if you have separate ASM_target fields, replace here)
-        # else ASM target = ZM target
-        # ---------------------------
-        t.asm_total_target = t.zm_total_target   # temporary (unless ASM target fields exist)
-
-        # ---------------------------
-        # ASM total achieve
-        # ---------------------------
-        t.asm_total_achieve = (
-            t.application_achieve +
-            t.pop_achieve +
-            t.esign_achieve +
-            t.new_taluk_achieve +
-            t.new_live_partners_achieve +
-            t.activations_achieve +
-            t.calls_achieve +
-            t.sd_collection_achieve
-        )
-
-        # ---------------------------
-        # 1️⃣ ZM Target vs ASM Achieve %
-        # ---------------------------
-        if t.zm_total_target > 0:
-            t.zm_vs_achieve_percent = round((t.asm_total_achieve / t.zm_total_target) * 100, 1)
-        else:
-            t.zm_vs_achieve_percent = 0
+        # 1️⃣ ZM Target vs ASM Achieve %  /  2️⃣ ASM Target vs ASM Achieve %
+        t.zm_vs_achieve_percent = round(t.achievement_percent, 1)
+        t.asm_vs_achieve_percent = t.zm_vs_achieve_percent
 
-        # ---------------------------
-        # 2️⃣ ASM Target vs ASM Achieve %
-        # ---------------------------
-        if t.asm_total_target > 0:
-            t.asm_vs_achieve_percent = round((t.asm_total_achieve / t.asm_total_target) * 100, 1)
-        else:
-            t.asm_vs_achieve_percent = 0
-
-    context = {"targets": targets}
+    context = {
+        "targets": targets,
+        "sort": sort,
+        "sort_choices": TARGET_SORT_LABELS,
+        "min_percent": min_percent,
+        "max_percent": max_percent,
+    }
     return render(request, "asm/asm_daily_target.html", context)
 
 
@@ -186,6 +154,8 @@ from django.utils import timezone
 from asm.models import ASM  
 from account.models import CustomUser
 from partner.models import SDCollection
+from partner import ledger
+from account import hierarchy
 from zonal_manager.models import ZonalManager
 from zonal_manager.models import ZonalManager  # you already have this
 # optionally import Decimal for amounts validation
@@ -331,25 +301,15 @@ def asm_sd_delete(request, pk):
 @login_required
 def asm_get_partner_details(request, partner_id):
     partner = get_object_or_404(CustomUser, pk=partner_id, role='Partner')
-    # try find assigned ASM/ZM info (depends on your relations)
-    asm_name = ''
-    asm_id = ''
-    zm_name = ''
-    zm_id = ''
-    if hasattr(partner, 'assigned_asm') and partner.assigned_asm:
-        asm_user = partner.assigned_asm.user if hasattr(partner.assigned_asm, 'user') else partner.assigned_asm
-        asm_name = asm_user.get_full_name() if asm_user else ''
-        asm_id = asm_user.id if asm_user else ''
-        zm = partner.assigned_asm.zone_manager if hasattr(partner.assigned_asm, 'zone_manager') else None
-        if zm:
-            zm_name = zm.user.get_full_name()
-            zm_id = zm.id
+    # Assigned ASM / ZM from the in-memory hierarchy
+    owners = hierarchy.current().owners_of_partner(partner.pk)
 
     return JsonResponse({
-        'asm_name': asm_name,
-        'asm_id': asm_id,
-        'zm_name': zm_name,
-        'zm_id': zm_id,
+        'asm_name': owners.asm.name if owners.asm else '',
+        'asm_id': owners.asm.id if owners.asm else '',
+        'zm_name': owners.zm.name if owners.zm else '',
+        'zm_id': owners.zm_id or '',
+        **ledger.summary(partner),
     })
 
 
@@ -1,14 +1,17 @@
 from django.contrib import admin, messages
-from django.shortcuts import redirect, render
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import path
-from .models import PincodeData, State, District, Office, TaskCategory
-import csv
+from .models import PincodeData, State, District, Office, TaskCategory, MasterJob
+from .jobs import expire_stale, save_upload, submit
+from .signals import batched_changes
 from django import forms
 # 1️⃣ CSV Upload Form
 class PincodeDataImportForm(forms.Form):
     csv_file = forms.FileField(
         label="Select CSV file",
-        help_text="CSV should have columns: officename, pincode, statename, district, officetype"
+        help_text="CSV should have columns: officename, pincode, statename, district, officetype "
+                  "(optional: circlename, regionname, divisionname, delivery, latitude, longitude)"
     )
 
 
@@ -25,41 +28,23 @@ class PincodeDataAdmin(admin.ModelAdmin):
             path("import-csv/", self.admin_site.admin_view(self.import_csv_view), name="pincodedata_import_csv"),
             path("map-to-master/", self.admin_site.admin_view(self.map_to_master_view), name="map_to_master"),
             path("map-city-state-office/", self.admin_site.admin_view(self.map_city_state_office_view), name="map_city_state_office"),
+            path("jobs/<int:job_id>/", self.admin_site.admin_view(self.job_status_view), name="master_job_status"),
+            path("jobs/<int:job_id>/progress/", self.admin_site.admin_view(self.job_progress_view), name="master_job_progress"),
         ]
         return custom_urls + urls
 
     
 
-       # 3️⃣ CSV Import View
+       # 3️⃣ CSV Import View (runs as a background MasterJob)
     def import_csv_view(self, request):
         if request.method == "POST":
             form = PincodeDataImportForm(request.POST, request.FILES)
             if form.is_valid():
-                csv_file = request.FILES['csv_file']
-                decoded_file = csv_file.read().decode('utf-8').splitlines()
-                reader = csv.DictReader(decoded_file)
-
-                created = updated = 0
-                for row in reader:
-                    if not row.get('officename') or not row.get('pincode') or not row.get('statename'):
-                        continue
-
-                    obj, obj_created = PincodeData.objects.update_or_create(
-                        officename=row['officename'].strip(),
-                        pincode=row['pincode'].strip(),
-                        statename=row['statename'].strip(),
-                        district=row.get('district', '').strip(),
-                        defaults={
-                            'officetype': row.get('officetype', '').strip()
-                        }
-                    )
-                    if obj_created:
-                        created += 1
-                    else:
-                        updated += 1
-
-                messages.success(request, f"CSV Import Completed — Created: {created}, Updated: {updated}")
-                return redirect("..")
+                source_file = save_upload(request.FILES['csv_file'])
+                job = submit("import_csv", user=request.user, source_file=source_file)
+
+                messages.info(request, f"CSV Import queued as job #{job.pk}.")
+                return redirect("admin:master_job_status", job_id=job.pk)
         else:
             form = PincodeDataImportForm()
 
@@ -69,135 +54,116 @@ class PincodeDataAdmin(admin.ModelAdmin):
         )
         return render(request, "admin/pincodedata_import.html", context)
 
-    # ✅ 1️⃣ Map-to-Master Button Logic (safe + descriptive)
+    # ✅ 1️⃣ Map-to-Master Button Logic (background job, see master/mapping.py)
     def map_to_master_view(self, request):
-        created_states = created_districts = created_offices = updated_offices = 0
-        summary_lines = []
-
-        for item in PincodeData.objects.all():
-            if not item.pincode or not item.officename or not item.statename:
-                continue
-
-            # 🏛 State
-            state, s_created = State.objects.get_or_create(name=item.statename.strip())
-            if s_created:
-                created_states += 1
-                summary_lines.append(f"🆕 State added: {state.name}")
-
-            # 🏙 District
-            district, d_created = District.objects.get_or_create(
-                name=item.district.strip(),
-                state=state
-            )
-            if d_created:
-                created_districts += 1
-                summary_lines.append(f"🏙️ District '{district.name}' under {state.name}")
-
-            # 🏢 Office
-            office, created = Office.objects.update_or_create(
-                name=item.officename.strip(),
-                district=district,
-                defaults={
-                    'officetype': item.officetype.strip() if item.officetype else "",
-                    'pincode': item.pincode.strip(),
-                }
-            )
-            if created:
-                created_offices += 1
-                summary_lines.append(f"📮 Office '{office.name}' created in {district.name} ({state.name})")
-            else:
-                updated_offices += 1
-                summary_lines.append(f"🔄 Office '{office.name}' updated in {district.name} ({state.name})")
-
-        # ✅ Success summary
-        messages.success(
-            request,
-            f"✅ Mapping Completed — "
-            f"States: {created_states}, Districts: {created_districts}, "
-            f"Offices Created: {created_offices}, Offices Updated: {updated_offices}"
-        )
+        job = submit("map_to_master", user=request.user, options={"full": request.GET.get("full") == "1"})
+        messages.info(request, f"Map to Master queued as job #{job.pk}.")
+        return redirect("admin:master_job_status", job_id=job.pk)
 
-        # ✅ Show top 10 mapping entries to avoid flooding
-        talk_summary = "<br>".join(summary_lines[:10])
-        if len(summary_lines) > 10:
-            talk_summary += f"<br>...and {len(summary_lines) - 10} more entries processed."
+    # ✅ 2️⃣ City–State–Office Button Logic (background job, see master/mapping.py)
+    def map_city_state_office_view(self, request):
+        job = submit("map_city_state_office", user=request.user, options={"full": request.GET.get("full") == "1"})
+        messages.info(request, f"City–State–Office Mapping queued as job #{job.pk}.")
+        return redirect("admin:master_job_status", job_id=job.pk)
 
-        messages.info(request, f"<b>Details:</b><br>{talk_summary}")
-        return redirect("..")
+    # ⏳ Job status page + lightweight progress endpoint (polled by the page)
+    def job_status_view(self, request, job_id):
+        job = get_object_or_404(MasterJob, pk=job_id)
+        context = dict(
+            self.admin_site.each_context(request),
+            job=job,
+            title=str(job),
+        )
+        return render(request, "admin/master_job_status.html", context)
 
-    # ✅ 2️⃣ City–State–Office Button Logic (safe + descriptive)
-    def map_city_state_office_view(self, request):
-        created_states = created_districts = created_offices = updated_offices = 0
-        summary_lines = []
-
-        for item in PincodeData.objects.all():
-            if not item.statename or not item.district or not item.officename:
-                continue
-
-            # 🏛 State
-            state, s_created = State.objects.get_or_create(name=item.statename.strip())
-            if s_created:
-                created_states += 1
-                summary_lines.append(f"🆕 State added: {state.name}")
-
-            # 🏙 District
-            district, d_created = District.objects.get_or_create(
-                name=item.district.strip(),
-                state=state
-            )
-            if d_created:
-                created_districts += 1
-                summary_lines.append(f"🏙️ District '{district.name}' under {state.name}")
-
-            # 🏢 Office
-            office, created = Office.objects.update_or_create(
-                name=item.officename.strip(),
-                district=district,
-                defaults={
-                    "officetype": item.officetype.strip() if item.officetype else "",
-                    "pincode": item.pincode.strip() if item.pincode else "",
-                }
-            )
-            if created:
-                created_offices += 1
-                summary_lines.append(f"📮 Office '{office.name}' added in {district.name} ({state.name})")
-            else:
-                updated_offices += 1
-                summary_lines.append(f"🔄 Office '{office.name}' updated in {district.name} ({state.name})")
-
-        # ✅ Summary
-        messages.success(
-            request,
-            f"📍 City–State–Office Mapping Done — "
-            f"States: {created_states}, Districts: {created_districts}, "
-            f"Offices Created: {created_offices}, Offices Updated: {updated_offices}"
+    def job_progress_view(self, request, job_id):
+        expire_stale()  # a job whose worker died shows as failed instead of polling forever
+        job = get_object_or_404(
+            MasterJob.objects.only("kind", "status", "processed_rows", "total_rows", "result", "error"),
+            pk=job_id,
         )
+        return JsonResponse({
+            "id": job.pk,
+            "kind": job.kind,
+            "status": job.status,
+            "processed_rows": job.processed_rows,
+            "total_rows": job.total_rows,
+            "finished": job.is_finished,
+            "summary": job_summary(job),
+            "details": job.result.get("details", []),
+            "error": job.error.strip().splitlines()[-1] if job.error else "",
+        })
+
+
+def job_summary(job):
+    """One-line summary of a finished job, worded like the old admin messages."""
+    result = job.result
+    if job.status != "completed":
+        return ""
+    if job.kind == "import_csv":
+        return (
+            f"CSV Import Completed — Created: {result['created']}, Updated: {result['updated']}, "
+            f"Unchanged: {result['unchanged']}, Skipped: {result['skipped']}"
+        )
+    if job.kind == "import_targets":
+        if result["errors"]:
+            summary = f"❌ Target Import Rolled Back — {result['errors']} errors in {result['rows']} rows, nothing was saved"
+            extra = result["detail_count"] - len(result["details"])
+            return summary + (f" (...and {extra} more errors)" if extra > 0 else "")
+        return (
+            f"Target Import Completed — New: {result['new']}, Updated: {result['updated']}, "
+            f"Unchanged: {result['unchanged']}"
+        )
+    prefix = "✅ Mapping Completed" if job.kind == "map_to_master" else "📍 City–State–Office Mapping Done"
+    summary = (
+        f"{prefix} — States: {result['created_states']}, Districts: {result['created_districts']}, "
+        f"Offices Created: {result['created_offices']}, Offices Updated: {result['updated_offices']}"
+    )
+    if result.get("deleted_offices"):
+        summary += f", Offices Removed: {result['deleted_offices']}"
+    if result.get("kept_offices"):
+        summary += f", Offices Kept (still assigned to users): {result['kept_offices']}"
+    if result.get("incremental"):
+        summary += f" — {result['processed']} changed rows synced"
+    extra = result["detail_count"] - len(result["details"])
+    if extra > 0:
+        summary += f" (...and {extra} more entries processed)"
+    return summary
 
-        # ✅ Display top 10 mappings
-        talk_summary = "<br>".join(summary_lines[:10])
-        if len(summary_lines) > 10:
-            talk_summary += f"<br>...and {len(summary_lines) - 10} more entries processed."
 
-        messages.info(request, f"<b>Details:</b><br>{talk_summary}")
-        return redirect("..")
+@admin.register(MasterJob)
+class MasterJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "status", "processed_rows", "total_rows", "created_by", "created_at", "finished_at")
+    list_filter = ("kind", "status")
+    readonly_fields = [f.name for f in MasterJob._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
 
 
 # ✅ Other admin registrations
+class MasterTableAdmin(admin.ModelAdmin):
+    def delete_queryset(self, request, queryset):
+        # One cache clear / revision bump for the whole selection
+        with batched_changes():
+            super().delete_queryset(request, queryset)
+
+
 @admin.register(State)
-class StateAdmin(admin.ModelAdmin):
+class StateAdmin(MasterTableAdmin):
     list_display = ('name',)
     search_fields = ('name',)
 
 
 @admin.register(District)
-class DistrictAdmin(admin.ModelAdmin):
+class DistrictAdmin(MasterTableAdmin):
     list_display = ('name', 'state')
     list_filter = ('state',)
     search_fields = ('name', 'state__name')
 
 
 @admin.register(Office)
-class OfficeAdmin(admin.ModelAdmin):
+class OfficeAdmin(MasterTableAdmin):
     list_display = ('name', 'district', 'officetype', 'pincode')
     list_filter = ('district__state', 'district')
     search_fields = ('name', 'district__name', 'pincode')
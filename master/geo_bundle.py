@@ -0,0 +1,85 @@
+# master/geo_bundle.py
+"""
+Precomputed State → District → Office bundle for the chained admin selects.
+
+The bundle is versioned by MasterRevision("geography"), which is bumped by
+the State/District/Office signals and after bulk mapping jobs. A bundle is
+built once per revision, kept in the Django cache (shared by workers) and in
+process memory, and served with the revision as its (weak) ETag.
+
+Layout (lists instead of objects keep it small):
+
+    {"revision": 7, "changed_at": "...",
+     "states":    [[id, name], ...],
+     "districts": [[id, name, state_id], ...],
+     "offices":   [[id, name, district_id, pincode], ...]}
+"""
+import gzip
+import json
+import threading
+
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from .models import MasterRevision, State, District, Office
+
+REVISION_NAME = "geography"
+CACHE_TIMEOUT = 7 * 24 * 3600
+
+_lock = threading.Lock()
+_bundle = None
+
+
+class Bundle:
+    def __init__(self, revision, changed_at, body):
+        self.revision = revision
+        self.changed_at = changed_at
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=6)
+
+
+def current_revision():
+    """(revision, changed_at) of the master tables."""
+    row, _ = MasterRevision.objects.get_or_create(name=REVISION_NAME)
+    return row.revision, row.changed_at
+
+
+def bump_revision():
+    """Mark the master tables as changed; the next request builds a new bundle."""
+    updated = MasterRevision.objects.filter(name=REVISION_NAME).update(
+        revision=F("revision") + 1, changed_at=timezone.now()
+    )
+    if not updated:
+        MasterRevision.objects.get_or_create(name=REVISION_NAME, defaults={"revision": 1})
+
+
+def build(revision, changed_at):
+    data = {
+        "revision": revision,
+        "changed_at": changed_at.isoformat(),
+        "states": list(State.objects.order_by("name").values_list("id", "name")),
+        "districts": list(District.objects.order_by("name").values_list("id", "name", "state_id")),
+        "offices": list(
+            Office.objects.order_by("name").values_list("id", "name", "district_id", "pincode").iterator(chunk_size=5000)
+        ),
+    }
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def get_bundle(revision=None, changed_at=None):
+    """The bundle of the current (or the given) revision, built only if nobody has yet."""
+    global _bundle
+    if revision is None:
+        revision, changed_at = current_revision()
+    if _bundle is not None and _bundle.revision == revision:
+        return _bundle
+    with _lock:
+        if _bundle is None or _bundle.revision != revision:
+            key = f"master:geo_bundle:{revision}"
+            body = cache.get(key)
+            if body is None:
+                body = build(revision, changed_at)
+                cache.set(key, body, CACHE_TIMEOUT)
+            _bundle = Bundle(revision, changed_at, body)
+    return _bundle
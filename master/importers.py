@@ -0,0 +1,192 @@
+# master/importers.py
+"""
+Streaming CSV import for PincodeData.
+
+The upload is decoded chunk by chunk, rows are de-duplicated on the natural
+key (officename, pincode, statename, district) and written in batches with
+bulk_create / bulk_update instead of one update_or_create per row.
+"""
+import codecs
+import csv
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import PincodeData, next_change_seq
+
+REQUIRED_COLUMNS = ("officename", "pincode", "statename")
+
+# Optional CSV columns copied onto PincodeData when present in the header
+VALUE_COLUMNS = (
+    "circlename", "regionname", "divisionname",
+    "officetype", "delivery", "latitude", "longitude",
+)
+FLOAT_COLUMNS = ("latitude", "longitude")
+
+DEFAULT_BATCH_SIZE = 2000
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    skipped: int = 0
+    duplicates: int = 0
+
+    def summary(self):
+        return (
+            f"Created: {self.created}, Updated: {self.updated}, "
+            f"Unchanged: {self.unchanged}, Skipped: {self.skipped}"
+        )
+
+
+def iter_decoded_lines(chunks, encoding="utf-8-sig"):
+    """Decode an iterable of byte chunks into text lines (line endings kept)."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    pending = ""
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        # The last piece may be an incomplete line — keep it for the next chunk
+        pending = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def _clean_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _natural_key(values):
+    return (values["officename"], values["pincode"], values["statename"], values["district"])
+
+
+class PincodeCSVImporter:
+    """
+    Import PincodeData rows from a CSV stream in bulk.
+
+    Usage:
+        result = PincodeCSVImporter().run(upload.chunks())
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+        self.batch_size = batch_size
+        self.progress = progress
+        self.result = ImportResult()
+        # Every key seen so far, to spot duplicates across batches (the keys
+        # themselves: a hash collision would pass for a duplicate)
+        self._seen = set()
+
+    def run(self, chunks):
+        reader = csv.DictReader(iter_decoded_lines(chunks))
+        header = [name.strip() for name in (reader.fieldnames or [])]
+        reader.fieldnames = header
+        self.value_fields = [name for name in VALUE_COLUMNS if name in header]
+
+        batch = {}
+        for row in reader:
+            self.result.rows += 1
+            values = self._clean_row(row)
+            if values is None:
+                self.result.skipped += 1
+                continue
+
+            key = _natural_key(values)
+            if key in self._seen:
+                # Same key twice in the file: the last row wins, like the old loop
+                self.result.duplicates += 1
+                # Already flushed by an earlier batch of this file
+                values["_duplicate"] = key not in batch
+            self._seen.add(key)
+            batch[key] = values
+
+            if len(batch) >= self.batch_size:
+                self._flush(batch)
+                batch = {}
+
+        if batch:
+            self._flush(batch)
+        return self.result
+
+    def _clean_row(self, row):
+        if not all(row.get(name) for name in REQUIRED_COLUMNS):
+            return None
+
+        values = {
+            "officename": row["officename"].strip(),
+            "pincode": row["pincode"].strip(),
+            "statename": row["statename"].strip(),
+            "district": (row.get("district") or "").strip(),
+        }
+        for name in self.value_fields:
+            raw = (row.get(name) or "").strip()
+            values[name] = _clean_float(raw) if name in FLOAT_COLUMNS else raw
+        return values
+
+    def _flush(self, batch):
+        pincodes = {key[1] for key in batch}
+        existing = {}
+        for obj in (
+            PincodeData.objects.filter(pincode__in=pincodes).order_by("id")
+        ):
+            existing.setdefault(
+                (obj.officename, obj.pincode, obj.statename, obj.district), obj
+            )
+
+        to_create, to_update = [], []
+        rewrites = 0
+        now = timezone.now()
+        for key, values in batch.items():
+            duplicate = values.pop("_duplicate", False)
+            obj = existing.get(key)
+            if obj is None:
+                obj = PincodeData(**values, modified_at=now)
+                obj.content_hash = obj.compute_content_hash()
+                to_create.append(obj)
+                continue
+
+            changed = False
+            for name in self.value_fields:
+                if getattr(obj, name) != values[name]:
+                    setattr(obj, name, values[name])
+                    changed = True
+            if changed:
+                obj.content_hash = obj.compute_content_hash()
+                obj.modified_at = now
+                to_update.append(obj)
+                # Not a separate record from the one already counted
+                rewrites += duplicate
+            elif not duplicate:
+                self.result.unchanged += 1
+
+        with transaction.atomic():
+            if to_create or to_update:
+                change_seq = next_change_seq()
+                for obj in (*to_create, *to_update):
+                    obj.change_seq = change_seq
+            if to_create:
+                PincodeData.objects.bulk_create(to_create, batch_size=self.batch_size)
+            if to_update:
+                PincodeData.objects.bulk_update(
+                    to_update, [*self.value_fields, "content_hash", "modified_at", "change_seq"],
+                    batch_size=self.batch_size,
+                )
+
+        self.result.created += len(to_create)
+        self.result.updated += len(to_update) - rewrites
+        if self.progress:
+            self.progress(self.result)
+
+
+def import_pincode_csv(chunks, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """Shortcut for PincodeCSVImporter(...).run(chunks)."""
+    return PincodeCSVImporter(batch_size=batch_size, progress=progress).run(chunks)
@@ -0,0 +1,165 @@
+# master/jobs.py
+"""
+Background runner for the long PincodeData admin actions (and the large
+daily target imports of the zonal_manager admin).
+
+Jobs are recorded in MasterJob and dispatched according to
+settings.MASTER_JOB_BACKEND:
+
+    "celery"  - master.tasks.run_master_job.delay(job_id) (sms/celery.py, needs a broker)
+    "thread"  - in-process ThreadPoolExecutor (default, no broker needed)
+    "sync"    - run inline in the calling thread
+
+Dispatch waits for the job row to be committed. A runner that dies leaves
+its job pending / running; expire_stale() fails jobs that have reported no
+progress for MASTER_JOB_TIMEOUT seconds, and a late runner won't pick them up.
+"""
+import logging
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import pincode_index
+from .importers import PincodeCSVImporter
+from .mapping import MasterSync
+from .models import MasterJob
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_SIZE = 64 * 1024
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "MASTER_JOB_WORKERS", 2),
+            thread_name_prefix="master-job",
+        )
+    return _executor
+
+
+# ---------- Job handlers ----------
+def _import_csv(job, progress):
+    with default_storage.open(job.source_file, "rb") as fh:
+        chunks = iter(lambda: fh.read(READ_CHUNK_SIZE), b"")
+        result = PincodeCSVImporter(progress=lambda r: progress(r.rows)).run(chunks)
+    # Lookups read the snapshot, so refresh it once the new rows are in
+    pincode_index.rebuild()
+    return asdict(result)
+
+
+def _mapper_handler(kind):
+    def handler(job, progress):
+        # Incremental unless the job asks for a full rebuild
+        sync = MasterSync(kind, full=job.options.get("full", False), progress=lambda r: progress(r.processed))
+        job.total_rows = sync.queryset().count()
+        MasterJob.objects.filter(pk=job.pk).update(total_rows=job.total_rows)
+        # The sync clears the autocomplete caches / bumps the revision itself
+        return asdict(sync.run())
+    return handler
+
+
+def _import_targets(job, progress):
+    from zonal_manager.resources import import_file  # zonal_manager builds on master, not the reverse
+
+    with default_storage.open(job.source_file, "rb") as fh:
+        return import_file(fh.read(), job.options["format"], progress=progress)
+
+
+JOB_HANDLERS = {
+    "import_csv": _import_csv,
+    "map_to_master": _mapper_handler("map_to_master"),
+    "map_city_state_office": _mapper_handler("map_city_state_office"),
+    "import_targets": _import_targets,
+}
+
+
+# ---------- Runner ----------
+def run_job(job_id):
+    """Execute a MasterJob and record status, progress counters and errors."""
+    now = timezone.now()
+    # Claim it: a redelivered task or an expired job is not run (again)
+    if not MasterJob.objects.filter(pk=job_id, status="pending").update(status="running", started_at=now, heartbeat_at=now):
+        logger.warning("Master job %s is no longer pending, not running it", job_id)
+        return
+    job = MasterJob.objects.get(pk=job_id)
+
+    def progress(processed):
+        MasterJob.objects.filter(pk=job.pk).update(processed_rows=processed, heartbeat_at=timezone.now())
+
+    try:
+        result = JOB_HANDLERS[job.kind](job, progress)
+    except Exception:
+        logger.exception("Master job %s failed", job.pk)
+        MasterJob.objects.filter(pk=job.pk).update(
+            status="failed", error=traceback.format_exc(), finished_at=timezone.now()
+        )
+    else:
+        processed = result.get("rows", result.get("processed", 0))
+        MasterJob.objects.filter(pk=job.pk).update(
+            status="completed", result=result, processed_rows=processed, finished_at=timezone.now()
+        )
+    finally:
+        if job.source_file and default_storage.exists(job.source_file):
+            default_storage.delete(job.source_file)
+
+
+def _run_in_thread(job_id):
+    close_old_connections()
+    try:
+        run_job(job_id)
+    finally:
+        connection.close()
+
+
+def expire_stale():
+    """Fail the pending / running jobs whose runner has gone quiet for MASTER_JOB_TIMEOUT."""
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=getattr(settings, "MASTER_JOB_TIMEOUT", 30 * 60))
+    return MasterJob.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, created_at__lt=cutoff),
+        status__in=("pending", "running"),
+    ).update(
+        status="failed",
+        error="No progress reported within MASTER_JOB_TIMEOUT; the worker running this job stopped.",
+        finished_at=now,
+    )
+
+
+def submit(kind, user=None, source_file="", options=None):
+    """Create a MasterJob and dispatch it to the configured backend once it is committed."""
+    expire_stale()
+    job = MasterJob.objects.create(
+        kind=kind,
+        source_file=source_file,
+        options=options or {},
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+    backend = getattr(settings, "MASTER_JOB_BACKEND", "thread")
+
+    if backend == "celery":
+        from .tasks import run_master_job
+        transaction.on_commit(lambda: run_master_job.delay(job.pk))
+    elif backend == "sync":
+        run_job(job.pk)
+    else:
+        def dispatch():
+            # Exposed so callers (and tests) can wait on the job
+            job.future = _get_executor().submit(_run_in_thread, job.pk)
+        transaction.on_commit(dispatch)
+    return job
+
+
+def save_upload(uploaded_file):
+    """Store an uploaded CSV where the job runner (thread or worker) can read it."""
+    return default_storage.save(f"pincode_imports/{uploaded_file.name}", uploaded_file)
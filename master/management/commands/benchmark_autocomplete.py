@@ -0,0 +1,90 @@
+import json
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+
+from master import lru
+from master.models import State, District, Office
+from master.views import DistrictAutocomplete, OfficeAutocomplete
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _name(rnd):
+    return "".join(rnd.choice(string.ascii_uppercase) for _ in range(rnd.randint(4, 10))) + " S.O"
+
+
+def seed_offices(count, seed=11):
+    rnd = random.Random(seed)
+    states = State.objects.bulk_create([State(name=f"Bench State {i}") for i in range(36)])
+    districts = District.objects.bulk_create(
+        [District(name=f"Bench District {i}", state=states[i % 36]) for i in range(750)]
+    )
+    Office.objects.bulk_create(
+        [
+            Office(name=f"{_name(rnd)} {i}", district=districts[i % 750], pincode=str(110000 + i // 8))
+            for i in range(count)
+        ],
+        batch_size=5000,
+    )
+    return districts
+
+
+class Command(BaseCommand):
+    help = "Measure District/Office autocomplete latency on a full-size office table (rolled back)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--offices", type=int, default=150000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                districts = seed_offices(options["offices"])
+                self._run(districts, options["repeat"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _time(self, label, func, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        elapsed = (time.perf_counter() - start) / repeat * 1000
+        self.stdout.write(f"{label:<48} {elapsed:8.2f} ms")
+
+    def _run(self, districts, repeat):
+        factory = RequestFactory()
+        forward = json.dumps({"districts": [districts[0].pk, districts[1].pk]})
+
+        def call(view, **params):
+            request = factory.get("/", params)
+            return view.as_view()(request)
+
+        def legacy_page():
+            # What every keystroke used to cost: the whole ordered table, paged
+            list(Office.objects.all().order_by("name")[:10])
+
+        self._time("legacy: unfiltered ordered page", legacy_page, repeat)
+        for q in ("A", "ADY", "BCD", "600"):
+            def cold(q=q):
+                lru.clear_all()
+                call(OfficeAutocomplete, q=q)
+            self._time(f"office q={q!r} (cold)", cold, repeat)
+            self._time(f"office q={q!r} (cached)", lambda q=q: call(OfficeAutocomplete, q=q), repeat)
+        self._time(
+            "office q='A' forwarded districts (cold)",
+            lambda: (lru.clear_all(), call(OfficeAutocomplete, q="A", forward=forward)),
+            repeat,
+        )
+        self._time(
+            "district q='Bench D' (cold)",
+            lambda: (lru.clear_all(), call(DistrictAutocomplete, q="Bench D")),
+            repeat,
+        )
@@ -0,0 +1,94 @@
+import csv
+import io
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from master.importers import import_pincode_csv
+from master.models import PincodeData
+
+HEADER = [
+    "circlename", "regionname", "divisionname", "officename", "pincode",
+    "officetype", "delivery", "district", "statename", "latitude", "longitude",
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+def build_csv(rows, seed=7):
+    """Synthetic all-India style pincode file as bytes."""
+    rnd = random.Random(seed)
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(HEADER)
+    for i in range(rows):
+        state = f"State {i % 36}"
+        district = f"District {i % 750}"
+        writer.writerow([
+            f"Circle {i % 23}", f"Region {i % 60}", f"Division {i % 450}",
+            f"Office {i} B.O", str(110000 + i // 8), rnd.choice(["BO", "PO", "HO"]),
+            "Delivery", district, state,
+            f"{rnd.uniform(8, 35):.4f}", f"{rnd.uniform(68, 97):.4f}",
+        ])
+    return out.getvalue().encode("utf-8")
+
+
+def legacy_import(data):
+    """The per-row update_or_create loop the admin used before the bulk importer."""
+    reader = csv.DictReader(data.decode("utf-8").splitlines())
+    for row in reader:
+        if not row.get("officename") or not row.get("pincode") or not row.get("statename"):
+            continue
+        PincodeData.objects.update_or_create(
+            officename=row["officename"].strip(),
+            pincode=row["pincode"].strip(),
+            statename=row["statename"].strip(),
+            district=row.get("district", "").strip(),
+            defaults={"officetype": row.get("officetype", "").strip()},
+        )
+
+
+def _chunks(data, size=64 * 1024):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+class Command(BaseCommand):
+    help = "Benchmark the bulk pincode CSV importer against the legacy per-row loop (rolled back)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=20000)
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--skip-legacy", action="store_true")
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        data = build_csv(rows)
+
+        runs = [("bulk (fresh)", lambda: import_pincode_csv(_chunks(data), batch_size=options["batch_size"]))]
+        if not options["skip_legacy"]:
+            runs.insert(0, ("legacy loop", lambda: legacy_import(data)))
+
+        for label, func in runs:
+            self._timed(label, rows, func)
+
+        # Re-import of an unchanged file — the common day-to-day case
+        def reimport():
+            import_pincode_csv(_chunks(data), batch_size=options["batch_size"])
+            return import_pincode_csv(_chunks(data), batch_size=options["batch_size"])
+        self._timed("bulk (re-import, 2 passes)", rows * 2, reimport)
+
+    def _timed(self, label, rows, func):
+        try:
+            with transaction.atomic():
+                start = time.perf_counter()
+                func()
+                elapsed = time.perf_counter() - start
+                raise _Rollback
+        except _Rollback:
+            pass
+        self.stdout.write(f"{label:<28} {rows:>8} rows  {elapsed:8.2f}s  {rows / elapsed:10.0f} rows/s")
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from master import pincode_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the memory-mapped pincode lookup snapshot from PincodeData."
+
+    def handle(self, *args, **options):
+        count = pincode_index.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Pincode index rebuilt: {count} records → {pincode_index.snapshot_path()}"
+        ))
@@ -0,0 +1,327 @@
+# master/mapping.py
+"""
+Set-based rebuild of the State → District → Office hierarchy from PincodeData.
+
+The existing master keys are loaded into dictionaries once, PincodeData is
+streamed with .iterator(), and the diff is written with bulk_create /
+bulk_update in chunk-sized transactions. Counters and detail lines match the
+old per-row get_or_create / update_or_create loop.
+
+MasterSync runs a mapping incrementally: only rows changed after the last
+sync watermark, plus offices whose source rows were all deleted (or renamed)
+since then. The watermark is a change number (models.next_change_seq), not a
+timestamp, so a change committed while a sync reads is never skipped.
+
+Offices users are still assigned to are not deleted with their source rows;
+they are kept and reported.
+
+Bulk writes send no model signals and the office deletes run inside
+signals.batched_changes(), so a mapping clears the autocomplete caches and
+bumps the geography revision once, at the end.
+"""
+from dataclasses import dataclass, field
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import (
+    PincodeData, PincodeDataDeletion, MasterSyncState, State, District, Office, committed_change_seq,
+)
+from .signals import batched_changes
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+@dataclass
+class MappingResult:
+    created_states: int = 0
+    created_districts: int = 0
+    created_offices: int = 0
+    updated_offices: int = 0
+    deleted_offices: int = 0
+    kept_offices: int = 0
+    processed: int = 0
+    incremental: bool = False
+    details: list = field(default_factory=list)
+    detail_count: int = 0
+
+
+class MasterMapper:
+    """
+    Map PincodeData rows onto State / District / Office.
+
+    `required` lists the PincodeData fields a row must have to be mapped,
+    `office_verb` is used in the "Office ... <verb> in ..." detail lines.
+    """
+
+    def __init__(self, required=("pincode", "officename", "statename"), office_verb="created",
+                 chunk_size=DEFAULT_CHUNK_SIZE, detail_limit=10, progress=None):
+        self.required = required
+        self.office_verb = office_verb
+        self.chunk_size = chunk_size
+        self.detail_limit = detail_limit
+        self.progress = progress
+        self.result = MappingResult()
+
+    # ---------- Source rows ----------
+    def source_queryset(self):
+        qs = PincodeData.objects.all()
+        for name in self.required:
+            qs = qs.exclude(**{name: ""})
+        return qs
+
+    def run(self, queryset=None):
+        with batched_changes() as changed:
+            self._run(self.source_queryset() if queryset is None else queryset)
+            if self.result.processed:
+                changed()
+        return self.result
+
+    def _run(self, queryset):
+        self._load_master(queryset)
+
+        pending_new, pending_dirty = {}, {}
+        rows = (
+            queryset.order_by("id")
+            .values_list("statename", "district", "officename", "officetype", "pincode")
+            .iterator(chunk_size=self.chunk_size)
+        )
+        for statename, district, officename, officetype, pincode in rows:
+            self.result.processed += 1
+            state_name = statename.strip()
+            district_name = district.strip()
+            office_name = officename.strip()
+
+            # 🏛 State / 🏙 District (already created in bulk, announce on first use)
+            if state_name in self.new_states:
+                self.new_states.discard(state_name)
+                self.result.created_states += 1
+                self._detail(f"🆕 State added: {state_name}")
+            district_key = (district_name, state_name)
+            if district_key in self.new_districts:
+                self.new_districts.discard(district_key)
+                self.result.created_districts += 1
+                self._detail(f"🏙️ District '{district_name}' under {state_name}")
+
+            # 🏢 Office
+            district_id = self.districts[district_key]
+            office_key = (office_name, district_id)
+            values = (officetype.strip() if officetype else "", pincode.strip() if pincode else "")
+            current = self.offices.get(office_key)
+            if current is None:
+                self.result.created_offices += 1
+                self._detail(f"📮 Office '{office_name}' {self.office_verb} in {district_name} ({state_name})")
+                self.offices[office_key] = [None, *values]
+                pending_new[office_key] = values
+            else:
+                self.result.updated_offices += 1
+                self._detail(f"🔄 Office '{office_name}' updated in {district_name} ({state_name})")
+                if tuple(current[1:]) != values:
+                    current[1:] = values
+                    if current[0] is None:
+                        pending_new[office_key] = values
+                    else:
+                        pending_dirty[office_key] = current
+
+            if len(pending_new) + len(pending_dirty) >= self.chunk_size:
+                self._flush_offices(pending_new, pending_dirty)
+                pending_new, pending_dirty = {}, {}
+
+        self._flush_offices(pending_new, pending_dirty)
+
+    def _detail(self, line):
+        self.result.detail_count += 1
+        if len(self.result.details) < self.detail_limit:
+            self.result.details.append(line)
+
+    # ---------- Master tables ----------
+    def _load_master(self, queryset):
+        """Load existing keys and create missing states/districts in bulk."""
+        self.states = dict(State.objects.values_list("name", "id"))
+        self.districts = {
+            (name, state_name): pk
+            for name, state_name, pk in District.objects.values_list("name", "state__name", "id")
+        }
+
+        wanted = {
+            (district.strip(), statename.strip())
+            for statename, district in queryset.values_list("statename", "district").distinct().iterator()
+        }
+        self.new_states = {state for _, state in wanted} - set(self.states)
+        self.new_districts = wanted - set(self.districts)
+
+        with transaction.atomic():
+            if self.new_states:
+                State.objects.bulk_create(
+                    [State(name=name) for name in self.new_states], batch_size=self.chunk_size
+                )
+                self.states.update(State.objects.filter(name__in=self.new_states).values_list("name", "id"))
+            if self.new_districts:
+                District.objects.bulk_create(
+                    [District(name=name, state_id=self.states[state]) for name, state in self.new_districts],
+                    batch_size=self.chunk_size,
+                )
+                state_ids = {self.states[state] for _, state in self.new_districts}
+                for name, state_name, pk in District.objects.filter(state_id__in=state_ids).values_list(
+                    "name", "state__name", "id"
+                ):
+                    self.districts[(name, state_name)] = pk
+
+        # Only the districts these rows touch (the whole table on a full run)
+        district_ids = [self.districts[key] for key in wanted]
+        self.offices = {}
+        for start in range(0, len(district_ids), self.chunk_size):
+            self.offices.update(
+                ((name, district_id), [pk, officetype, pincode])
+                for pk, name, district_id, officetype, pincode in Office.objects.filter(
+                    district_id__in=district_ids[start:start + self.chunk_size]
+                ).values_list("id", "name", "district_id", "officetype", "pincode").iterator(chunk_size=self.chunk_size)
+            )
+
+    def _flush_offices(self, pending_new, pending_dirty):
+        if not pending_new and not pending_dirty:
+            return
+        with transaction.atomic():
+            if pending_new:
+                created = Office.objects.bulk_create(
+                    [
+                        Office(name=name, district_id=district_id, officetype=officetype, pincode=pincode)
+                        for (name, district_id), (officetype, pincode) in pending_new.items()
+                    ],
+                    batch_size=self.chunk_size,
+                )
+                for obj in created:
+                    if obj.pk is None:
+                        # Backend can't return ids from bulk inserts — look them up
+                        obj.pk = Office.objects.values_list("id", flat=True).get(
+                            name=obj.name, district_id=obj.district_id
+                        )
+                    self.offices[(obj.name, obj.district_id)][0] = obj.pk
+            if pending_dirty:
+                Office.objects.bulk_update(
+                    [
+                        Office(id=pk, officetype=officetype, pincode=pincode)
+                        for pk, officetype, pincode in pending_dirty.values()
+                    ],
+                    ["officetype", "pincode"],
+                    batch_size=self.chunk_size,
+                )
+        if self.progress:
+            self.progress(self.result)
+
+    # ---------- Deleted source rows ----------
+    def apply_deletions(self, tombstones):
+        """Delete offices whose every source row has been removed."""
+        with batched_changes():
+            self._apply_deletions(tombstones)
+
+    def _apply_deletions(self, tombstones):
+        keys, raw_names = set(), set()
+        for officename, district, statename, pincode in tombstones.values_list(
+            "officename", "district", "statename", "pincode"
+        ).iterator():
+            row = {"officename": officename, "district": district, "statename": statename, "pincode": pincode}
+            if all(row[name] for name in self.required):
+                keys.add((officename.strip(), district.strip(), statename.strip()))
+                raw_names.add(officename)
+        if not keys:
+            return
+
+        # Keys still produced by a remaining PincodeData row stay
+        names = raw_names | {name for name, _, _ in keys}
+        remaining = self.source_queryset().filter(officename__in=names)
+        for officename, district, statename in remaining.values_list("officename", "district", "statename"):
+            keys.discard((officename.strip(), district.strip(), statename.strip()))
+
+        keys = sorted(keys)
+        for start in range(0, len(keys), self.chunk_size):
+            chunk = keys[start:start + self.chunk_size]
+            condition = reduce(or_, (
+                Q(name=name, district__name=district, district__state__name=state)
+                for name, district, state in chunk
+            ))
+            doomed = list(Office.objects.filter(condition).values_list("id", "name", "district__name", "district__state__name"))
+            # Deleting would silently drop these from the users' office assignments
+            assigned = dict(
+                Office.users.through.objects.filter(office_id__in=[row[0] for row in doomed])
+                .values("office_id").annotate(users=Count("*")).values_list("office_id", "users")
+            )
+            with transaction.atomic():
+                Office.objects.filter(id__in=[row[0] for row in doomed if row[0] not in assigned]).delete()
+            for pk, name, district, state in doomed:
+                if pk in assigned:
+                    self.result.kept_offices += 1
+                    self._detail(
+                        f"⚠️ Office '{name}' in {district} ({state}) has no source rows left but is kept: "
+                        f"{assigned[pk]} user(s) are assigned to it"
+                    )
+                else:
+                    self.result.deleted_offices += 1
+                    self._detail(f"🗑️ Office '{name}' removed from {district} ({state})")
+
+
+MAPPINGS = {
+    # "Map to Master": rows need pincode, officename and statename
+    "map_to_master": {"required": ("pincode", "officename", "statename"), "office_verb": "created"},
+    # "Map City–State–Office": rows need statename, district and officename
+    "map_city_state_office": {"required": ("statename", "district", "officename"), "office_verb": "added"},
+}
+
+
+class MasterSync:
+    """
+    Run one mapping action against the rows changed since its last sync.
+
+    The first run, or full=True, maps every row. Deleted rows recorded since
+    the watermark are applied either way.
+    """
+
+    def __init__(self, kind, full=False, **kwargs):
+        self.kind = kind
+        self.mapper = MasterMapper(**MAPPINGS[kind], **kwargs)
+        self.state, _ = MasterSyncState.objects.get_or_create(name=kind)
+        # Every change numbered up to here is committed (see next_change_seq)
+        self.upto = committed_change_seq()
+        self.incremental = not full and self.state.synced_seq is not None
+
+    def _window(self):
+        window = {"change_seq__lte": self.upto}
+        if self.state.synced_seq is not None:
+            window["change_seq__gt"] = self.state.synced_seq
+        return window
+
+    def queryset(self):
+        qs = self.mapper.source_queryset()
+        if self.incremental:
+            qs = qs.filter(**self._window())
+        return qs
+
+    def run(self):
+        # One cache clear / revision bump for the mapping and its deletions
+        with batched_changes():
+            result = self.mapper.run(self.queryset())
+            result.incremental = self.incremental
+            self.mapper.apply_deletions(PincodeDataDeletion.objects.filter(**self._window()))
+
+        self.state.synced_seq = self.upto
+        self.state.synced_at = timezone.now()
+        self.state.save(update_fields=["synced_seq", "synced_at"])
+
+        # Tombstones every mapping action has already seen can go
+        watermarks = dict(MasterSyncState.objects.values_list("name", "synced_seq"))
+        if all(watermarks.get(kind) is not None for kind in MAPPINGS):
+            PincodeDataDeletion.objects.filter(change_seq__lte=min(watermarks[kind] for kind in MAPPINGS)).delete()
+        return result
+
+
+def map_to_master(full=True, **kwargs):
+    """The "Map to Master" action (a full run unless full=False)."""
+    return MasterSync("map_to_master", full=full, **kwargs).run()
+
+
+def map_city_state_office(full=True, **kwargs):
+    """The "Map City–State–Office" action (a full run unless full=False)."""
+    return MasterSync("map_city_state_office", full=full, **kwargs).run()
@@ -0,0 +1,134 @@
+# Generated by Django 4.2.19 on 2026-10-18 17:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MasterRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('revision', models.PositiveIntegerField(default=0)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MasterSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('synced_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PincodeData',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('circlename', models.CharField(blank=True, default='', max_length=100)),
+                ('regionname', models.CharField(blank=True, default='', max_length=100)),
+                ('divisionname', models.CharField(blank=True, default='', max_length=100)),
+                ('officename', models.CharField(blank=True, default='', max_length=150)),
+                ('pincode', models.CharField(blank=True, default='', max_length=10)),
+                ('officetype', models.CharField(blank=True, default='', max_length=50)),
+                ('delivery', models.CharField(blank=True, default='', max_length=50)),
+                ('district', models.CharField(blank=True, default='', max_length=100)),
+                ('statename', models.CharField(blank=True, default='', max_length=100)),
+                ('latitude', models.FloatField(blank=True, null=True)),
+                ('longitude', models.FloatField(blank=True, null=True)),
+                ('content_hash', models.CharField(blank=True, default='', editable=False, max_length=40)),
+                ('modified_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PincodeDataDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('officename', models.CharField(blank=True, default='', max_length=150)),
+                ('pincode', models.CharField(blank=True, default='', max_length=10)),
+                ('district', models.CharField(blank=True, default='', max_length=100)),
+                ('statename', models.CharField(blank=True, default='', max_length=100)),
+                ('deleted_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='State',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TaskCategory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('description', models.TextField(blank=True, default='No description')),
+            ],
+            options={
+                'verbose_name': 'Task Category',
+                'verbose_name_plural': 'Task Categories',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MasterJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('import_csv', 'CSV Import'), ('map_to_master', 'Map to Master'), ('map_city_state_office', 'Map City–State–Office')], max_length=30)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('source_file', models.CharField(blank=True, default='', help_text='Uploaded file (storage path)', max_length=255)),
+                ('options', models.JSONField(blank=True, default=dict)),
+                ('processed_rows', models.PositiveIntegerField(default=0)),
+                ('total_rows', models.PositiveIntegerField(blank=True, null=True)),
+                ('result', models.JSONField(blank=True, default=dict)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='master_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Master Job',
+                'verbose_name_plural': 'Master Jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='District',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('state', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='districts', to='master.state')),
+            ],
+            options={
+                'ordering': ['state__name', 'name'],
+                'unique_together': {('name', 'state')},
+            },
+        ),
+        migrations.CreateModel(
+            name='Office',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=150)),
+                ('officetype', models.CharField(blank=True, help_text='E.g., Branch, Franchise, Head Office', max_length=50)),
+                ('pincode', models.CharField(blank=True, db_index=True, max_length=10)),
+                ('district', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offices', to='master.district')),
+            ],
+            options={
+                'ordering': ['district__state__name', 'district__name', 'name'],
+                'unique_together': {('name', 'district')},
+            },
+        ),
+    ]
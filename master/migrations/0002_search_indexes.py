@@ -0,0 +1,46 @@
+# Search indexes the autocomplete relies on. They are vendor specific
+# (trigram GIN on PostgreSQL, NOCASE on SQLite), so they can't live in Meta.
+
+from django.db import migrations
+
+SEARCH_INDEX_SQL = {
+    "postgresql": [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX IF NOT EXISTS master_office_name_trgm "
+        "ON master_office USING gin (UPPER(name) gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS master_district_name_trgm "
+        "ON master_district USING gin (UPPER(name) gin_trgm_ops)",
+    ],
+    # SQLite uses an index for LIKE 'abc%' only when it is NOCASE
+    "sqlite": [
+        "CREATE INDEX IF NOT EXISTS master_office_name_nocase ON master_office (name COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS master_district_name_nocase ON master_district (name COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS master_office_pincode_nocase ON master_office (pincode COLLATE NOCASE)",
+    ],
+}
+
+INDEX_NAMES = {
+    "postgresql": ["master_office_name_trgm", "master_district_name_trgm"],
+    "sqlite": ["master_office_name_nocase", "master_district_name_nocase", "master_office_pincode_nocase"],
+}
+
+
+def create_search_indexes(apps, schema_editor):
+    for sql in SEARCH_INDEX_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_search_indexes(apps, schema_editor):
+    for name in INDEX_NAMES.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('master', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.19 on 2026-10-18 18:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('master', '0002_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='masterjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Last progress report of the runner', null=True),
+        ),
+    ]
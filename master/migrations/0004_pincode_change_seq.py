@@ -0,0 +1,28 @@
+# Generated by Django 4.2.19 on 2026-10-18 18:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('master', '0003_masterjob_heartbeat_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mastersyncstate',
+            name='synced_seq',
+            field=models.PositiveIntegerField(blank=True, help_text='Last change_seq mapped', null=True),
+        ),
+        migrations.AddField(
+            model_name='pincodedata',
+            name='change_seq',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='pincodedatadeletion',
+            name='change_seq',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+    ]
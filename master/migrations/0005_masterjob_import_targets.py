@@ -0,0 +1,18 @@
+# Generated by Django 4.2.19 on 2026-10-18 18:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('master', '0004_pincode_change_seq'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='masterjob',
+            name='kind',
+            field=models.CharField(choices=[('import_csv', 'CSV Import'), ('map_to_master', 'Map to Master'), ('map_city_state_office', 'Map City–State–Office'), ('import_targets', 'Daily Target Import')], max_length=30),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.19 on 2026-10-18 18:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('master', '0005_masterjob_import_targets'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pincodedata',
+            index=models.Index(fields=['pincode', 'officename', 'statename', 'district'], name='pincodedata_natural_key'),
+        ),
+    ]
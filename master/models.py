@@ -1,4 +1,27 @@
-from django.db import models
+import hashlib
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+class PincodeDataQuerySet(models.QuerySet):
+    def delete(self):
+        # One tombstone INSERT and change number for the whole delete; the
+        # post_delete signal only records single-object deletes
+        with transaction.atomic():
+            keys = list(self.values_list(*PincodeData.MAPPED_FIELDS).iterator())
+            if keys:
+                change_seq = next_change_seq()
+                PincodeDataDeletion.objects.bulk_create(
+                    [
+                        PincodeDataDeletion(**dict(zip(PincodeData.MAPPED_FIELDS, key)), change_seq=change_seq)
+                        for key in keys
+                    ],
+                    batch_size=2000,
+                )
+            return super().delete()
+
 
 class PincodeData(models.Model):
     circlename = models.CharField(max_length=100, blank=True, default="")
@@ -13,9 +36,88 @@ class PincodeData(models.Model):
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
 
+    # 🔁 Change tracking for the incremental master sync (change_seq: see next_change_seq)
+    content_hash = models.CharField(max_length=40, blank=True, default="", editable=False)
+    modified_at = models.DateTimeField(default=timezone.now, db_index=True, editable=False)
+    change_seq = models.PositiveIntegerField(default=0, db_index=True, editable=False)
+
+    objects = PincodeDataQuerySet.as_manager()
+
+    MAPPED_FIELDS = ("officename", "pincode", "district", "statename")
+
+    HASHED_FIELDS = (
+        "officename", "pincode", "statename", "district", "circlename", "regionname",
+        "divisionname", "officetype", "delivery", "latitude", "longitude",
+    )
+
+    class Meta:
+        indexes = [
+            # Natural key; the CSV importer looks each batch up by pincode__in
+            models.Index(fields=["pincode", "officename", "statename", "district"], name="pincodedata_natural_key"),
+        ]
+
     def __str__(self):
         return f"{self.officename} ({self.pincode})"
 
+    def compute_content_hash(self):
+        raw = "\x1f".join(str(getattr(self, name)) for name in self.HASHED_FIELDS)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The office key the row was mapped under when loaded
+        instance._loaded_key = instance.mapped_key()
+        return instance
+
+    def mapped_key(self):
+        return tuple(getattr(self, name) for name in self.MAPPED_FIELDS)
+
+    def save(self, *args, **kwargs):
+        # Only a real content change moves the row past the sync watermark
+        content_hash = self.compute_content_hash()
+        if content_hash == self.content_hash:
+            super().save(*args, **kwargs)
+            return
+
+        with transaction.atomic():
+            self.content_hash = content_hash
+            self.modified_at = timezone.now()
+            self.change_seq = next_change_seq()
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "content_hash", "modified_at", "change_seq"}
+            old_key = getattr(self, "_loaded_key", None)
+            if self.pk is not None and old_key is not None and old_key != self.mapped_key():
+                # Renamed / moved: the office of the old key may have no source row left
+                PincodeDataDeletion.objects.create(
+                    **dict(zip(self.MAPPED_FIELDS, old_key)), change_seq=self.change_seq
+                )
+            super().save(*args, **kwargs)
+        self._loaded_key = self.mapped_key()
+
+
+# 🪦 Deleted PincodeData rows not yet seen by the master sync
+class PincodeDataDeletion(models.Model):
+    officename = models.CharField(max_length=150, blank=True, default="")
+    pincode = models.CharField(max_length=10, blank=True, default="")
+    district = models.CharField(max_length=100, blank=True, default="")
+    statename = models.CharField(max_length=100, blank=True, default="")
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+    change_seq = models.PositiveIntegerField(default=0, db_index=True)
+
+    def __str__(self):
+        return f"{self.officename} ({self.pincode}) deleted {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
+# 🕒 Watermark of the last successful master sync, per mapping action
+class MasterSyncState(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    synced_at = models.DateTimeField(null=True, blank=True)
+    synced_seq = models.PositiveIntegerField(null=True, blank=True, help_text="Last change_seq mapped")
+
+    def __str__(self):
+        return f"{self.name} @ {self.synced_at}"
+
 
 
 # 🗺️ State Table
@@ -44,7 +146,7 @@ class Office(models.Model):
     name = models.CharField(max_length=150)  # Example: Office Name
     district = models.ForeignKey(District, on_delete=models.CASCADE, related_name="offices")
     officetype = models.CharField(max_length=50, blank=True, help_text="E.g., Branch, Franchise, Head Office")
-    pincode = models.CharField(max_length=10, blank=True)
+    pincode = models.CharField(max_length=10, blank=True, db_index=True)
 
     class Meta:
         unique_together = ("name", "district")  # Prevent duplicate office names per district
@@ -54,6 +156,37 @@ class Office(models.Model):
         return f"{self.name} ({self.pincode})"
     
 
+# 🔢 Revision counter of the State/District/Office tables (versions the geography bundle)
+class MasterRevision(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    revision = models.PositiveIntegerField(default=0)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.name} r{self.revision}"
+
+
+CHANGE_SEQUENCE = "pincode_changes"
+
+
+def next_change_seq():
+    """
+    Number the PincodeData change written in the current transaction.
+
+    Bumping the counter row locks it until that transaction ends, so numbers
+    are committed in order: once committed_change_seq() reads n, every change
+    numbered up to n is visible. Timestamps give no such guarantee (a row
+    stamped before a sync started can commit after it read).
+    """
+    MasterRevision.objects.get_or_create(name=CHANGE_SEQUENCE)
+    MasterRevision.objects.filter(name=CHANGE_SEQUENCE).update(revision=F("revision") + 1, changed_at=timezone.now())
+    return MasterRevision.objects.values_list("revision", flat=True).get(name=CHANGE_SEQUENCE)
+
+
+def committed_change_seq():
+    return MasterRevision.objects.filter(name=CHANGE_SEQUENCE).values_list("revision", flat=True).first() or 0
+
+
 class TaskCategory(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True, default="No description")
@@ -64,4 +197,53 @@ class TaskCategory(models.Model):
         ordering = ["name"]
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+# ⚙️ Background jobs for the PincodeData admin actions
+class MasterJob(models.Model):
+    KIND_CHOICES = [
+        ("import_csv", "CSV Import"),
+        ("map_to_master", "Map to Master"),
+        ("map_city_state_office", "Map City–State–Office"),
+        ("import_targets", "Daily Target Import"),
+    ]
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    source_file = models.CharField(max_length=255, blank=True, default="", help_text="Uploaded file (storage path)")
+    options = models.JSONField(default=dict, blank=True)
+
+    processed_rows = models.PositiveIntegerField(default=0)
+    total_rows = models.PositiveIntegerField(null=True, blank=True)
+    result = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True, default="")
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="master_jobs",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True, help_text="Last progress report of the runner")
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Master Job"
+        verbose_name_plural = "Master Jobs"
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in ("completed", "failed")
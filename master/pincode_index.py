@@ -0,0 +1,227 @@
+# master/pincode_index.py
+"""
+Array-backed pincode → office / district / state / lat-long index.
+
+The index is built from PincodeData and saved as a flat snapshot file that
+is opened with mmap, so every worker process shares the same pages instead of
+holding its own copy. Layout (little-endian, every array aligned to its item size):
+
+    header    magic, record count, string count, string blob size, reserved
+    latitude  float64[count]     NaN when missing
+    longitude float64[count]     NaN when missing
+    pincodes  uint32[count]      sorted
+    office    uint32[count]      string id
+    district  uint32[count]      string id
+    state     uint32[count]      string id
+    offsets   uint32[strings+1]  into the blob
+    blob      utf-8 bytes
+"""
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from pathlib import Path
+
+from django.conf import settings
+
+MAGIC = b"PINIDX01"
+HEADER = struct.Struct("<8sIIII")
+
+# How often (seconds) a process checks whether the snapshot file was replaced
+RELOAD_CHECK_INTERVAL = 1.0
+
+PincodeRecord = namedtuple("PincodeRecord", "pincode office district state latitude longitude")
+
+
+def snapshot_path():
+    return Path(getattr(settings, "PINCODE_INDEX_PATH", Path(settings.MEDIA_ROOT) / "pincode_index.bin"))
+
+
+def _le(arr):
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _float(value):
+    return math.nan if value is None else float(value)
+
+
+# ---------- Build ----------
+def build_snapshot(path=None):
+    """Build the snapshot from PincodeData and atomically replace the file."""
+    from .models import PincodeData
+
+    path = Path(path or snapshot_path())
+    strings, string_ids = [], {}
+
+    def intern(value):
+        value = (value or "").strip()
+        sid = string_ids.get(value)
+        if sid is None:
+            sid = string_ids[value] = len(strings)
+            strings.append(value)
+        return sid
+
+    records = []
+    rows = PincodeData.objects.values_list(
+        "pincode", "officename", "district", "statename", "latitude", "longitude"
+    ).iterator(chunk_size=5000)
+    for pincode, office, district, state, lat, lon in rows:
+        pincode = (pincode or "").strip()
+        if not pincode.isdigit() or len(pincode) > 9:
+            continue
+        records.append((int(pincode), intern(office), intern(district), intern(state), _float(lat), _float(lon)))
+    records.sort(key=lambda r: (r[0], strings[r[1]]))
+
+    blob = bytearray()
+    offsets = array("I", [0])
+    for value in strings:
+        blob += value.encode("utf-8")
+        offsets.append(len(blob))
+
+    columns = list(zip(*records)) or [()] * 6
+    payload = [
+        HEADER.pack(MAGIC, len(records), len(strings), len(blob), 0),
+        _le(array("d", columns[4])),
+        _le(array("d", columns[5])),
+        _le(array("I", columns[0])),
+        _le(array("I", columns[1])),
+        _le(array("I", columns[2])),
+        _le(array("I", columns[3])),
+        _le(offsets),
+        bytes(blob),
+    ]
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as fh:
+        for part in payload:
+            fh.write(part)
+    # Readers keep their mapping of the old file until they notice the swap
+    os.replace(tmp_path, path)
+    return len(records)
+
+
+# ---------- Read ----------
+class PincodeIndex:
+    """Read-only view over a memory-mapped snapshot."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as fh:
+            stat = os.fstat(fh.fileno())
+            self.signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count, string_count, blob_size, _ = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a pincode index snapshot")
+        self.count = count
+
+        view = memoryview(self._mmap)
+        pos = HEADER.size
+
+        def take(fmt, length):
+            nonlocal pos
+            size = length * struct.calcsize(fmt)
+            part = view[pos:pos + size].cast(fmt)
+            pos += size
+            return part
+
+        self.latitude = take("d", count)
+        self.longitude = take("d", count)
+        self.pincodes = take("I", count)
+        self.office = take("I", count)
+        self.district = take("I", count)
+        self.state = take("I", count)
+        self.offsets = take("I", string_count + 1)
+        self.blob = view[pos:pos + blob_size]
+
+    def __len__(self):
+        return self.count
+
+    def string(self, sid):
+        return bytes(self.blob[self.offsets[sid]:self.offsets[sid + 1]]).decode("utf-8")
+
+    def record(self, i):
+        lat, lon = self.latitude[i], self.longitude[i]
+        return PincodeRecord(
+            pincode=f"{self.pincodes[i]:06d}",
+            office=self.string(self.office[i]),
+            district=self.string(self.district[i]),
+            state=self.string(self.state[i]),
+            latitude=None if math.isnan(lat) else lat,
+            longitude=None if math.isnan(lon) else lon,
+        )
+
+    def span(self, pincode):
+        """(start, end) positions of all records for a pincode."""
+        try:
+            key = int(str(pincode).strip())
+        except ValueError:
+            return 0, 0
+        return bisect_left(self.pincodes, key), bisect_right(self.pincodes, key)
+
+    def lookup(self, pincode):
+        start, end = self.span(pincode)
+        return [self.record(i) for i in range(start, end)]
+
+    def lookup_many(self, pincodes):
+        return {str(pincode).strip(): self.lookup(pincode) for pincode in pincodes}
+
+
+_lock = threading.Lock()
+_index = None
+_checked_at = 0.0
+
+
+def _file_signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def get_index():
+    """Return the shared index, building the snapshot on first use and
+    re-opening it when another process has replaced the file."""
+    global _index, _checked_at
+    now = time.monotonic()
+    if _index is not None and now - _checked_at < RELOAD_CHECK_INTERVAL:
+        return _index
+
+    with _lock:
+        path = snapshot_path()
+        signature = _file_signature(path)
+        if signature is None:
+            build_snapshot(path)
+            signature = _file_signature(path)
+        if _index is None or _index.path != path or _index.signature != signature:
+            _index = PincodeIndex(path)
+        _checked_at = now
+        return _index
+
+
+def rebuild():
+    """Rebuild the snapshot (e.g. after a CSV import) and drop the cached view."""
+    global _index
+    count = build_snapshot()
+    with _lock:
+        _index = None
+    return count
+
+
+def lookup(pincode):
+    return get_index().lookup(pincode)
+
+
+def lookup_many(pincodes):
+    return get_index().lookup_many(pincodes)
@@ -0,0 +1,74 @@
+# master/signals.py
+import threading
+from contextlib import contextmanager
+
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import geo_bundle, lru
+from .models import PincodeData, PincodeDataDeletion, State, District, Office, next_change_seq
+
+_batch = threading.local()
+
+
+def master_changed():
+    """Drop the autocomplete caches and bump the geography revision."""
+    lru.clear_all()
+    geo_bundle.bump_revision()
+
+
+def _mark_changed():
+    _batch.changed = True
+
+
+@contextmanager
+def batched_changes():
+    """
+    Hold back the per-row cache clear / revision bump of the State, District
+    and Office signals during a bulk write; the outermost block does it once
+    on exit. Yields a callable that marks the batch as changed, for
+    bulk_create / bulk_update which send no signals.
+    """
+    outer = not getattr(_batch, "active", False)
+    if outer:
+        _batch.active, _batch.changed = True, False
+    try:
+        yield _mark_changed
+    finally:
+        if outer:
+            _batch.active = False
+            if _batch.changed:
+                master_changed()
+
+
+@receiver(post_save, sender=State)
+@receiver(post_save, sender=District)
+@receiver(post_save, sender=Office)
+@receiver(post_delete, sender=State)
+@receiver(post_delete, sender=District)
+@receiver(post_delete, sender=Office)
+def clear_autocomplete_cache(sender, instance, **kwargs):
+    if getattr(_batch, "active", False):
+        _batch.changed = True
+        return
+    # Rows cascading from a deleted State / District: its own signal comes last
+    origin = kwargs.get("origin")
+    if isinstance(origin, (State, District)) and origin is not instance:
+        return
+    master_changed()
+
+
+@receiver(post_delete, sender=PincodeData)
+def record_pincode_deletion(sender, instance, **kwargs):
+    # The incremental sync drops offices whose source rows are all gone
+    # (PincodeDataQuerySet.delete() writes the tombstones of a bulk delete)
+    if isinstance(kwargs.get("origin"), QuerySet):
+        return
+    PincodeDataDeletion.objects.create(
+        officename=instance.officename,
+        pincode=instance.pincode,
+        district=instance.district,
+        statename=instance.statename,
+        change_seq=next_change_seq(),
+    )
@@ -0,0 +1,136 @@
+# master/spatial.py
+"""
+Nearest-office search over the geocoded PincodeData rows.
+
+Points come straight from the pincode snapshot (see pincode_index.py) via
+np.frombuffer, so no extra copy of the table is loaded. They are bucketed
+into a regular lat/long grid sorted by cell id: a query only computes
+distances for the cells around the point and grows the ring until the k-th
+result is provably the closest.
+
+Longitudes are not wrapped at ±180°, which is fine for Indian pincodes.
+"""
+import threading
+
+import numpy as np
+
+from . import pincode_index
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180
+CELL_DEGREES = 0.25
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Vectorised great-circle distance in km; arguments broadcast like NumPy arrays."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class SpatialIndex:
+    def __init__(self, index, cell_degrees=CELL_DEGREES):
+        self.index = index
+        self.cell = cell_degrees
+        self.rows_per_band = int(np.ceil(360 / cell_degrees)) + 1
+
+        lat = np.frombuffer(index.latitude, dtype="<f8")
+        lon = np.frombuffer(index.longitude, dtype="<f8")
+        positions = np.flatnonzero(~np.isnan(lat) & ~np.isnan(lon))
+
+        cells = self._cell_ids(lat[positions], lon[positions])
+        order = np.argsort(cells, kind="stable")
+        self.cells = cells[order]
+        self.positions = positions[order]
+        self.lat = lat[self.positions]
+        self.lon = lon[self.positions]
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _band(self, lat):
+        return np.floor((np.asarray(lat) + 90) / self.cell).astype(np.int64)
+
+    def _column(self, lon):
+        return np.floor((np.asarray(lon) + 180) / self.cell).astype(np.int64)
+
+    def _cell_ids(self, lat, lon):
+        return self._band(lat) * self.rows_per_band + self._column(lon)
+
+    def _candidates(self, lat, lon, dlat, dlon):
+        """Point slots inside the cells covering lat±dlat, lon±dlon."""
+        band_lo, band_hi = self._band(lat - dlat), self._band(lat + dlat)
+        col_lo, col_hi = self._column(max(lon - dlon, -180)), self._column(min(lon + dlon, 180))
+        # Cells of one latitude band are contiguous ids → one searchsorted pair per band
+        bands = np.arange(band_lo, band_hi + 1) * self.rows_per_band
+        starts = np.searchsorted(self.cells, bands + col_lo, side="left")
+        ends = np.searchsorted(self.cells, bands + col_hi, side="right")
+        if not len(starts):
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)])
+
+    def _results(self, slots, distances):
+        results = []
+        for slot, distance in zip(slots, distances):
+            record = self.index.record(int(self.positions[slot]))._asdict()
+            record["distance_km"] = round(float(distance), 3)
+            results.append(record)
+        return results
+
+    def nearest(self, lat, lon, k=5):
+        """The k closest geocoded offices to (lat, lon), nearest first."""
+        k = min(k, len(self))
+        if k <= 0:
+            return []
+        ring = 1
+        while True:
+            reach = ring * self.cell
+            slots = self._candidates(lat, lon, reach, reach)
+            if len(slots) >= k or reach >= 180:
+                distances = haversine_km(lat, lon, self.lat[slots], self.lon[slots])
+                best = np.argsort(distances, kind="stable")[:k]
+                # Everything within `covered` km is guaranteed to be in the scanned cells
+                covered = reach * KM_PER_DEGREE * max(np.cos(np.radians(min(abs(lat) + reach, 90))), 0)
+                if reach >= 180 or distances[best[-1]] <= covered:
+                    return self._results(slots[best], distances[best])
+            ring *= 2
+
+    def within(self, lat, lon, radius_km, limit=None):
+        """All geocoded offices within radius_km of (lat, lon), nearest first."""
+        dlat = radius_km / KM_PER_DEGREE
+        cos_lat = np.cos(np.radians(min(abs(lat) + dlat, 90)))
+        dlon = 180 if cos_lat < 1e-6 else dlat / cos_lat
+        slots = self._candidates(lat, lon, dlat, dlon)
+        distances = haversine_km(lat, lon, self.lat[slots], self.lon[slots])
+        inside = np.flatnonzero(distances <= radius_km)
+        inside = inside[np.argsort(distances[inside], kind="stable")][:limit]
+        return self._results(slots[inside], distances[inside])
+
+    def nearest_many(self, points, k=5):
+        return [self.nearest(lat, lon, k=k) for lat, lon in points]
+
+
+_lock = threading.Lock()
+_spatial = None
+
+
+def get_spatial_index():
+    """Build lazily; a new pincode snapshot (e.g. after an import) triggers a rebuild."""
+    global _spatial
+    index = pincode_index.get_index()
+    if _spatial is None or _spatial.index is not index:
+        with _lock:
+            if _spatial is None or _spatial.index is not index:
+                _spatial = SpatialIndex(index)
+    return _spatial
+
+
+def nearest(lat, lon, k=5):
+    return get_spatial_index().nearest(lat, lon, k=k)
+
+
+def within(lat, lon, radius_km, limit=None):
+    return get_spatial_index().within(lat, lon, radius_km, limit=limit)
@@ -0,0 +1,9 @@
+# master/tasks.py
+from celery import shared_task
+
+from .jobs import run_job
+
+
+@shared_task
+def run_master_job(job_id):
+    run_job(job_id)
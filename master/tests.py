@@ -1,3 +1,506 @@
-from django.test import TestCase
+import json
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import geo_bundle, jobs, lru, pincode_index, spatial
+
+from .importers import import_pincode_csv, iter_decoded_lines
+from .mapping import MasterMapper, MasterSync, map_to_master, map_city_state_office
+from .models import PincodeData, PincodeDataDeletion, State, District, Office, MasterJob
+
+
+def _csv(*lines):
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _chunked(data, size=7):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class PincodeImportTests(TestCase):
+    HEADER = "officename,pincode,statename,district,officetype,latitude,longitude"
+
+    def test_decoder_handles_split_multibyte_chunks(self):
+        data = "a,b\nचेन्नई,600001\n".encode("utf-8")
+        lines = list(iter_decoded_lines(_chunked(data, size=3)))
+        self.assertEqual(lines, ["a,b\n", "चेन्नई,600001\n"])
+
+    def test_import_creates_updates_and_skips(self):
+        PincodeData.objects.create(
+            officename="Adyar S.O", pincode="600020", statename="Tamil Nadu",
+            district="Chennai", officetype="SO",
+        )
+        data = _csv(
+            self.HEADER,
+            "Adyar S.O,600020,Tamil Nadu,Chennai,HO,13.0,80.2",   # update
+            "Anna Nagar S.O,600040,Tamil Nadu,Chennai,SO,NA,NA",  # create
+            "Anna Nagar S.O,600040,Tamil Nadu,Chennai,BO,,",      # duplicate, last wins
+            ",600041,Tamil Nadu,Chennai,SO,,",                    # skipped
+        )
+
+        result = import_pincode_csv(_chunked(data), batch_size=2)
+
+        self.assertEqual((result.created, result.updated, result.skipped), (1, 1, 1))
+        self.assertEqual(result.duplicates, 1)
+        self.assertEqual(PincodeData.objects.count(), 2)
+        adyar = PincodeData.objects.get(pincode="600020")
+        self.assertEqual((adyar.officetype, adyar.latitude), ("HO", 13.0))
+        self.assertEqual(PincodeData.objects.get(pincode="600040").officetype, "BO")
+
+    def test_only_equal_keys_count_as_duplicates(self):
+        data = _csv(
+            self.HEADER,
+            "Adyar S.O,600020,Tamil Nadu,Chennai,SO,,",
+            "Guindy S.O,600032,Tamil Nadu,Chennai,SO,,",
+        )
+        # Every key hashing alike must not make the second row a duplicate
+        with patch("master.importers.hash", create=True, return_value=0):
+            result = import_pincode_csv(_chunked(data), batch_size=1)
+        self.assertEqual((result.created, result.duplicates), (2, 0))
+
+    def test_batch_lookup_uses_the_natural_key_index(self):
+        sql, params = PincodeData.objects.filter(pincode__in=["600020", "600032"]).query.sql_with_params()
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute(f"EXPLAIN {sql}", params)
+                plan = " ".join(row[0] for row in cursor.fetchall())
+            else:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("pincodedata_natural_key", plan)
+
+    def test_reimport_of_same_file_is_unchanged(self):
+        data = _csv(self.HEADER, "Adyar S.O,600020,Tamil Nadu,Chennai,SO,13.0,80.2")
+        import_pincode_csv([data])
+        result = import_pincode_csv([data])
+        self.assertEqual((result.created, result.updated, result.unchanged), (0, 0, 1))
+
+
+def _legacy_mapping(required):
+    """The per-row loop map_to_master_view used before MasterMapper."""
+    counts = [0, 0, 0, 0]
+    for item in PincodeData.objects.order_by("id"):
+        if not all(getattr(item, name) for name in required):
+            continue
+        state, created = State.objects.get_or_create(name=item.statename.strip())
+        counts[0] += created
+        district, created = District.objects.get_or_create(name=item.district.strip(), state=state)
+        counts[1] += created
+        _, created = Office.objects.update_or_create(
+            name=item.officename.strip(), district=district,
+            defaults={"officetype": item.officetype.strip(), "pincode": item.pincode.strip()},
+        )
+        counts[2 if created else 3] += 1
+    return counts
+
+
+class MasterMappingTests(TestCase):
+    def setUp(self):
+        rows = [
+            ("Adyar S.O", "600020", "Chennai", "Tamil Nadu", "SO"),
+            ("Adyar S.O", "600020", "Chennai", "Tamil Nadu", "HO"),
+            ("Guindy S.O", "600032", "Chennai ", "Tamil Nadu", "SO"),
+            ("Fort B.O", "", "Kochi", "Kerala", "BO"),
+            ("Ooty H.O", "643001", "", "Tamil Nadu", "HO"),
+        ]
+        for officename, pincode, district, statename, officetype in rows:
+            PincodeData.objects.create(
+                officename=officename, pincode=pincode, district=district,
+                statename=statename, officetype=officetype,
+            )
+        state = State.objects.create(name="Tamil Nadu")
+        district = District.objects.create(name="Chennai", state=state)
+        Office.objects.create(name="Guindy S.O", district=district, officetype="BO", pincode="600032")
+
+    def _snapshot(self):
+        return sorted(
+            Office.objects.values_list("name", "district__name", "district__state__name", "officetype", "pincode")
+        )
+
+    def _assert_matches_legacy(self, mapper, required):
+        result = mapper(chunk_size=2)
+        new_state = self._snapshot()
+        counts = [result.created_states, result.created_districts, result.created_offices, result.updated_offices]
+
+        Office.objects.all().delete()
+        District.objects.exclude(name="Chennai").delete()
+        State.objects.exclude(name="Tamil Nadu").delete()
+        Office.objects.create(
+            name="Guindy S.O", district=District.objects.get(name="Chennai"), officetype="BO", pincode="600032"
+        )
+        self.assertEqual(counts, _legacy_mapping(required))
+        self.assertEqual(new_state, self._snapshot())
+        return result
+
+    def test_map_to_master_matches_legacy_loop(self):
+        result = self._assert_matches_legacy(map_to_master, ("pincode", "officename", "statename"))
+        self.assertEqual(result.details[0], "📮 Office 'Adyar S.O' created in Chennai (Tamil Nadu)")
+        self.assertEqual(result.detail_count, 5)
+
+    def test_map_city_state_office_matches_legacy_loop(self):
+        self._assert_matches_legacy(map_city_state_office, ("statename", "district", "officename"))
+
+
+class IncrementalSyncTests(TestCase):
+    HEADER = "officename,pincode,statename,district,officetype"
+    FILE = _csv(
+        HEADER,
+        "Adyar S.O,600020,Tamil Nadu,Chennai,SO",
+        "Guindy S.O,600032,Tamil Nadu,Chennai,SO",
+    )
+
+    def _sync(self):
+        return MasterSync("map_to_master").run()
+
+    def test_reimport_of_unchanged_file_syncs_nothing(self):
+        import_pincode_csv([self.FILE])
+        first = self._sync()
+        self.assertEqual((first.incremental, first.processed, first.created_offices), (False, 2, 2))
+
+        import_pincode_csv([self.FILE])
+        second = self._sync()
+        self.assertEqual((second.incremental, second.processed), (True, 0))
+
+    def test_changed_and_deleted_rows_are_synced(self):
+        import_pincode_csv([self.FILE])
+        self._sync()
+
+        import_pincode_csv([_csv(self.HEADER, "Adyar S.O,600020,Tamil Nadu,Chennai,HO")])
+        PincodeData.objects.filter(officename="Guindy S.O").delete()
+        result = self._sync()
+
+        self.assertEqual((result.processed, result.updated_offices, result.deleted_offices), (1, 1, 1))
+        self.assertEqual(
+            list(Office.objects.values_list("name", "officetype")), [("Adyar S.O", "HO")]
+        )
+
+    def test_change_committed_during_a_sync_is_picked_up_next_time(self):
+        import_pincode_csv([self.FILE])
+        self._sync()
+
+        sync = MasterSync("map_to_master")  # has read its watermark
+        row = PincodeData.objects.get(officename="Adyar S.O")
+        row.officetype = "HO"
+        row.save()
+        self.assertEqual(sync.run().processed, 0)
+        self.assertEqual(self._sync().processed, 1)
+        self.assertEqual(Office.objects.get(name="Adyar S.O").officetype, "HO")
+
+    def test_renamed_row_replaces_its_office(self):
+        import_pincode_csv([self.FILE])
+        self._sync()
+
+        row = PincodeData.objects.get(officename="Guindy S.O")
+        row.officename = "Guindy Industrial Estate S.O"
+        row.save()
+        result = self._sync()
+        self.assertEqual((result.created_offices, result.deleted_offices), (1, 1))
+        self.assertEqual(
+            sorted(Office.objects.values_list("name", flat=True)), ["Adyar S.O", "Guindy Industrial Estate S.O"]
+        )
+
+    def test_offices_assigned_to_users_are_kept(self):
+        import_pincode_csv([self.FILE])
+        self._sync()
+        user = get_user_model().objects.create_user(username="p", email="p@example.com")
+        user.offices.add(Office.objects.get(name="Guindy S.O"))
+
+        PincodeData.objects.filter(officename="Guindy S.O").delete()
+        result = self._sync()
+        self.assertEqual((result.deleted_offices, result.kept_offices), (0, 1))
+        self.assertIn("kept", result.details[-1])
+        self.assertEqual(list(user.offices.values_list("name", flat=True)), ["Guindy S.O"])
+
+    def test_bulk_delete_writes_its_tombstones_in_one_batch(self):
+        import_pincode_csv([self.FILE])
+        with patch("master.models.PincodeDataDeletion.objects.create") as create:
+            PincodeData.objects.all().delete()
+        create.assert_not_called()
+        self.assertEqual(
+            sorted(PincodeDataDeletion.objects.values_list("officename", "pincode")),
+            [("Adyar S.O", "600020"), ("Guindy S.O", "600032")],
+        )
+        self.assertEqual(PincodeDataDeletion.objects.values("change_seq").distinct().count(), 1)
+
+        import_pincode_csv([self.FILE])
+        PincodeData.objects.get(officename="Adyar S.O").delete()
+        self.assertEqual(PincodeDataDeletion.objects.filter(officename="Adyar S.O").count(), 2)
+
+    def test_tombstones_are_purged_once_every_mapping_has_seen_them(self):
+        import_pincode_csv([self.FILE])
+        PincodeData.objects.filter(officename="Guindy S.O").delete()
+        self._sync()
+        self.assertEqual(PincodeDataDeletion.objects.count(), 1)
+        MasterSync("map_city_state_office").run()
+        self.assertFalse(PincodeDataDeletion.objects.exists())
+
+
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(),
+    PINCODE_INDEX_PATH=f"{tempfile.mkdtemp()}/pincode_index.bin",
+    MASTER_JOB_BACKEND="thread",
+)
+class MasterJobTests(TransactionTestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass"
+        )
+
+    def test_import_and_mapping_run_in_thread_pool(self):
+        upload = SimpleUploadedFile(
+            "pincodes.csv", _csv(PincodeImportTests.HEADER, "Adyar S.O,600020,Tamil Nadu,Chennai,SO,13.0,80.2")
+        )
+        job = jobs.submit("import_csv", user=self.admin, source_file=jobs.save_upload(upload))
+        job.future.result(timeout=30)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "completed")
+        self.assertEqual((job.result["created"], job.processed_rows), (1, 1))
+        # The snapshot is rebuilt when the import finishes
+        self.assertEqual(pincode_index.lookup("600020")[0].office, "Adyar S.O")
+
+        job = jobs.submit("map_to_master", user=self.admin)
+        job.future.result(timeout=30)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.total_rows), ("completed", 1))
+        self.assertTrue(Office.objects.filter(name="Adyar S.O", pincode="600020").exists())
+
+    def test_failed_job_records_error(self):
+        job = jobs.submit("import_csv", source_file="pincode_imports/missing.csv")
+        job.future.result(timeout=30)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "failed")
+        self.assertIn("Traceback", job.error)
+
+    def test_dispatch_waits_for_commit_and_stale_jobs_expire(self):
+        with transaction.atomic():
+            job = jobs.submit("map_to_master", user=self.admin)
+            self.assertFalse(hasattr(job, "future"))  # not handed to a worker before the row is committed
+        job.future.result(timeout=30)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "completed")
+
+        stuck = MasterJob.objects.create(kind="map_to_master", status="running")
+        MasterJob.objects.filter(pk=stuck.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        fresh = MasterJob.objects.create(kind="map_to_master")
+        self.assertEqual(jobs.expire_stale(), 1)
+        stuck.refresh_from_db()
+        self.assertEqual(stuck.status, "failed")
+        self.assertIn("MASTER_JOB_TIMEOUT", stuck.error)
+
+        # An expired job is not picked up by a late worker
+        MasterJob.objects.filter(pk=fresh.pk).update(status="failed")
+        jobs.run_job(fresh.pk)
+        fresh.refresh_from_db()
+        self.assertIsNone(fresh.started_at)
+
+    @override_settings(MASTER_JOB_BACKEND="sync")
+    def test_admin_action_redirects_to_progress_page(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse("admin:map_city_state_office"))
+        job = MasterJob.objects.get()
+        self.assertRedirects(response, reverse("admin:master_job_status", args=[job.pk]))
+
+        progress = self.client.get(reverse("admin:master_job_progress", args=[job.pk])).json()
+        self.assertEqual(progress["status"], "completed")
+        self.assertTrue(progress["finished"])
+        self.assertIn("City–State–Office Mapping Done", progress["summary"])
+
+
+@override_settings(PINCODE_INDEX_PATH=f"{tempfile.mkdtemp()}/pincode_index.bin")
+class PincodeIndexTests(TestCase):
+    def setUp(self):
+        rows = [
+            ("Adyar S.O", "600020", "Chennai", "Tamil Nadu", 13.0067, 80.2571),
+            ("Gandhi Nagar S.O", "600020", "Chennai", "Tamil Nadu", None, None),
+            ("Kochi H.O", "682001", "Ernakulam", "Kerala", 9.9312, 76.2673),
+            ("Bad row", "N/A", "Nowhere", "Kerala", None, None),
+        ]
+        for officename, pincode, district, statename, lat, lon in rows:
+            PincodeData.objects.create(
+                officename=officename, pincode=pincode, district=district,
+                statename=statename, latitude=lat, longitude=lon,
+            )
+        self.assertEqual(pincode_index.rebuild(), 3)
+
+    def test_single_and_batch_lookup(self):
+        records = pincode_index.lookup("600020")
+        self.assertEqual([r.office for r in records], ["Adyar S.O", "Gandhi Nagar S.O"])
+        self.assertEqual((records[0].latitude, records[0].longitude), (13.0067, 80.2571))
+        self.assertIsNone(records[1].latitude)
+
+        found = pincode_index.lookup_many(["682001", "110001", "abc"])
+        self.assertEqual(found["682001"][0].district, "Ernakulam")
+        self.assertEqual((found["110001"], found["abc"]), ([], []))
+
+    def test_json_endpoints(self):
+        user = get_user_model().objects.create_user(username="u1", email="u1@example.com", password="pass")
+        self.client.force_login(user)
+
+        data = self.client.get(reverse("pincode_lookup", args=["682001"])).json()
+        self.assertTrue(data["found"])
+        self.assertEqual(data["results"][0]["state"], "Kerala")
+
+        data = self.client.get(reverse("pincode_batch_lookup"), {"pincodes": "600020,682001"}).json()
+        self.assertEqual(len(data["results"]["600020"]), 2)
+
+
+@override_settings(PINCODE_INDEX_PATH=f"{tempfile.mkdtemp()}/pincode_index.bin")
+class SpatialIndexTests(TestCase):
+    POINTS = [
+        ("Chennai GPO", "600001", 13.0827, 80.2707),
+        ("Adyar S.O", "600020", 13.0067, 80.2571),
+        ("Tambaram S.O", "600045", 12.9249, 80.1000),
+        ("Vellore H.O", "632001", 12.9165, 79.1325),
+        ("Kochi H.O", "682001", 9.9312, 76.2673),
+        ("Delhi GPO", "110006", 28.6562, 77.2410),
+    ]
+
+    def setUp(self):
+        for officename, pincode, lat, lon in self.POINTS:
+            PincodeData.objects.create(
+                officename=officename, pincode=pincode, district="D", statename="S",
+                latitude=lat, longitude=lon,
+            )
+        PincodeData.objects.create(officename="No geo", pincode="600002", district="D", statename="S")
+        pincode_index.rebuild()
+
+    def test_haversine_batch(self):
+        distances = spatial.haversine_km(13.0827, 80.2707, [13.0827, 28.6562], [80.2707, 77.2410])
+        self.assertAlmostEqual(distances[0], 0.0)
+        self.assertAlmostEqual(distances[1], 1759, delta=5)
+
+    def test_nearest_matches_brute_force(self):
+        for lat, lon in [(13.05, 80.25), (10.0, 76.0), (25.0, 78.0)]:
+            expected = sorted(
+                self.POINTS, key=lambda p: float(spatial.haversine_km(lat, lon, p[2], p[3]))
+            )[:3]
+            found = spatial.nearest(lat, lon, k=3)
+            self.assertEqual([r["office"] for r in found], [p[0] for p in expected])
+
+    def test_within_radius(self):
+        found = spatial.within(13.0827, 80.2707, 30)
+        self.assertEqual([r["office"] for r in found], ["Chennai GPO", "Adyar S.O", "Tambaram S.O"])
+        self.assertEqual(found[0]["distance_km"], 0.0)
+
+    def test_endpoints_reject_bad_parameters(self):
+        self.client.force_login(get_user_model().objects.create_user(username="u", email="u@example.com", password="p"))
+        nearest, within = reverse("nearest_offices"), reverse("offices_within")
+        for params in [{"k": "inf"}, {"k": "nan"}, {"k": "many"}, {"lat": "nan"}, {"lon": "200"}]:
+            response = self.client.get(nearest, {"lat": "13.08", "lon": "80.27", **params})
+            self.assertEqual(response.status_code, 400, params)
+        for params in [{"lat": "91"}, {"lon": "-181"}, {"lat": "inf"}, {"radius_km": "nan"}]:
+            response = self.client.get(within, {"lat": "13.08", "lon": "80.27", "radius_km": "10", **params})
+            self.assertEqual(response.status_code, 400, params)
+
+        self.assertEqual(len(self.client.get(nearest, {"lat": "13.08", "lon": "80.27", "k": "0"}).json()["results"]), 1)
+        self.assertEqual(len(self.client.get(nearest, {"lat": "13.08", "lon": "80.27", "k": "1e9"}).json()["results"]), 6)
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        lru.clear_all()
+        state = State.objects.create(name="Tamil Nadu")
+        self.chennai = District.objects.create(name="Chennai", state=state)
+        self.vellore = District.objects.create(name="Vellore", state=state)
+        for name, district, pincode in [
+            ("Adyar S.O", self.chennai, "600020"),
+            ("Anna Nagar S.O", self.chennai, "600040"),
+            ("Padyar B.O", self.chennai, "600099"),
+            ("Adyar Colony B.O", self.vellore, "632001"),
+        ]:
+            Office.objects.create(name=name, district=district, pincode=pincode)
+
+    def _texts(self, url_name, **params):
+        response = self.client.get(reverse(url_name), params)
+        return [r["text"] for r in response.json()["results"]]
+
+    def test_office_query_is_applied_prefix_first(self):
+        self.assertEqual(
+            self._texts("office-autocomplete", q="ady"),
+            ["Adyar Colony B.O (632001)", "Adyar S.O (600020)", "Padyar B.O (600099)"],
+        )
+        self.assertEqual(self._texts("office-autocomplete", q="an"), ["Anna Nagar S.O (600040)"])
+        self.assertEqual(self._texts("office-autocomplete", q="6320"), ["Adyar Colony B.O (632001)"])
+
+    def test_forwarded_districts_limit_results(self):
+        forward = json.dumps({"districts": [self.chennai.pk]})
+        self.assertEqual(
+            self._texts("office-autocomplete", q="adyar", forward=forward),
+            ["Adyar S.O (600020)", "Padyar B.O (600099)"],
+        )
+
+    def test_pages_are_cached_until_master_data_changes(self):
+        self.assertEqual(self._texts("district-autocomplete", q="vel"), ["Vellore (Tamil Nadu)"])
+        with self.assertNumQueries(0):
+            self._texts("district-autocomplete", q="vel")
+
+        District.objects.create(name="Velachery", state=self.chennai.state)
+        self.assertEqual(
+            self._texts("district-autocomplete", q="vel"), ["Velachery (Tamil Nadu)", "Vellore (Tamil Nadu)"]
+        )
+
+
+class GeographyBundleTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="ops", password="x", email="ops@example.com")
+        self.client.force_login(self.user)
+        state = State.objects.create(name="Kerala")
+        self.district = District.objects.create(name="Kochi", state=state)
+        Office.objects.create(name="Fort B.O", district=self.district, pincode="682001")
+
+    def test_bundle_holds_the_hierarchy_and_revalidates_with_etag(self):
+        response = self.client.get(reverse("geography_bundle"))
+        data = response.json()
+        self.assertEqual(data["states"], [[self.district.state_id, "Kerala"]])
+        self.assertEqual(data["offices"][0][1:], ["Fort B.O", self.district.pk, "682001"])
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        with self.assertNumQueries(3):  # session, user, revision
+            cached = self.client.get(reverse("geography_bundle"), HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(cached.status_code, 304)
+
+    def test_master_change_bumps_the_revision(self):
+        first = self.client.get(reverse("geography_bundle"))
+        Office.objects.create(name="Ernakulam H.O", district=self.district, pincode="682011")
+
+        second = self.client.get(reverse("geography_bundle"), HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(len(second.json()["offices"]), 2)
+
+        revision = second.json()["revision"]
+        stale = self.client.get(reverse("geography_bundle_revision", args=[revision - 1]))
+        self.assertRedirects(stale, reverse("geography_bundle_revision", args=[revision]), fetch_redirect_response=False)
+        pinned = self.client.get(reverse("geography_bundle_revision", args=[revision]))
+        self.assertIn("immutable", pinned["Cache-Control"])
+
+    def _revision(self):
+        return geo_bundle.current_revision()[0]
+
+    def test_cascading_delete_bumps_the_revision_once(self):
+        Office.objects.create(name="Ernakulam H.O", district=self.district, pincode="682011")
+        before = self._revision()
+        with patch("master.signals.lru.clear_all") as clear_all:
+            self.district.state.delete()
+        self.assertEqual(self._revision(), before + 1)
+        self.assertEqual(clear_all.call_count, 1)
+
+    def test_removed_offices_bump_the_revision_once(self):
+        Office.objects.create(name="Ernakulam H.O", district=self.district, pincode="682011")
+        for name, pincode in (("Fort B.O", "682001"), ("Ernakulam H.O", "682011")):
+            PincodeDataDeletion.objects.create(
+                officename=name, pincode=pincode, district="Kochi", statename="Kerala", change_seq=1
+            )
+        before = self._revision()
+        mapper = MasterMapper()
+        mapper.apply_deletions(PincodeDataDeletion.objects.all())
+        self.assertEqual(mapper.result.deleted_offices, 2)
+        self.assertEqual(self._revision(), before + 1)
@@ -5,4 +5,10 @@ from . import views
 urlpatterns = [
     path("district-autocomplete/", views.DistrictAutocomplete.as_view(), name="district-autocomplete"),
     path("office-autocomplete/", views.OfficeAutocomplete.as_view(), name="office-autocomplete"),
+    path("pincode/lookup/", views.pincode_batch_lookup, name="pincode_batch_lookup"),
+    path("pincode/<str:pincode>/", views.pincode_lookup, name="pincode_lookup"),
+    path("offices/nearest/", views.nearest_offices, name="nearest_offices"),
+    path("offices/within/", views.offices_within, name="offices_within"),
+    path("geo/bundle/", views.geography_bundle, name="geography_bundle"),
+    path("geo/bundle/<int:revision>/", views.geography_bundle, name="geography_bundle_revision"),
 ]
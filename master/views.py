@@ -1,20 +1,207 @@
 # master/views.py
+import json
+
 from dal import autocomplete
+from django.db.models import Case, IntegerField, Value, When
+from django.http import HttpResponse
+from .lru import LRUCache
 from .models import District, Office
 
-class DistrictAutocomplete(autocomplete.Select2QuerySetView):
+# Queries shorter than this only do an (indexed) prefix match
+MIN_SUBSTRING_QUERY = 3
+
+
+class CachedSearchAutocomplete(autocomplete.Select2QuerySetView):
+    """
+    Select2 endpoint that searches `search_field` by prefix first (served by
+    the name index) and falls back to a substring match (pg_trgm GIN on
+    PostgreSQL) when the prefix does not fill a page. Rendered pages are kept
+    in a per-process LRU keyed by (forwarded ids, query, page).
+    """
+    search_field = "name"
+    cache = None
+
+    def get_search_results(self, queryset, search_term):
+        q = search_term.strip()
+        if not q:
+            return queryset
+
+        prefix = queryset.filter(**{f"{self.search_field}__istartswith": q})
+        if len(q) < MIN_SUBSTRING_QUERY or prefix[:self.paginate_by + 1].count() > self.paginate_by:
+            return prefix
+
+        # Prefix matches first, then the remaining substring matches
+        return queryset.filter(**{f"{self.search_field}__icontains": q}).annotate(
+            prefix_rank=Case(
+                When(**{f"{self.search_field}__istartswith": q}, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField(),
+            )
+        ).order_by("prefix_rank", self.search_field)
+
+    def cache_key(self):
+        forwarded = json.dumps(self.forwarded, sort_keys=True)
+        return (forwarded, self.q.strip().lower(), self.request.GET.get("page", "1"))
+
+    def get(self, request, *args, **kwargs):
+        key = self.cache_key()
+        content = self.cache.get(key)
+        if content is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            content = response.content
+            self.cache.set(key, content)
+        return HttpResponse(content, content_type="application/json")
+
+
+class DistrictAutocomplete(CachedSearchAutocomplete):
+    cache = LRUCache(maxsize=256)
+
     def get_queryset(self):
         qs = District.objects.all()
         state_ids = self.forwarded.get('states', None)
         if state_ids:
             qs = qs.filter(state_id__in=state_ids)
-        return qs.order_by('name')
+        # Label is "<district> (<state>)" — avoid a state query per row
+        qs = qs.select_related("state").order_by('name')
+        return self.get_search_results(qs, self.q)
+
 
+class OfficeAutocomplete(CachedSearchAutocomplete):
+    cache = LRUCache(maxsize=512)
 
-class OfficeAutocomplete(autocomplete.Select2QuerySetView):
     def get_queryset(self):
         qs = Office.objects.all()
         district_ids = self.forwarded.get('districts', None)
         if district_ids:
             qs = qs.filter(district_id__in=district_ids)
-        return qs.order_by('name')
+        qs = qs.order_by('name')
+        q = self.q.strip()
+        if q.isdigit():
+            # Numbers are pincodes
+            return qs.filter(pincode__startswith=q)
+        return self.get_search_results(qs, q)
+
+# 📮 Pincode lookup (served from the memory-mapped snapshot, see pincode_index.py)
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from . import pincode_index
+
+MAX_BATCH_PINCODES = 500
+
+
+@login_required
+def pincode_lookup(request, pincode):
+    records = pincode_index.lookup(pincode)
+    return JsonResponse({
+        "pincode": pincode,
+        "found": bool(records),
+        "results": [r._asdict() for r in records],
+    })
+
+
+@login_required
+def pincode_batch_lookup(request):
+    """GET ?pincodes=600001,600002 (or repeated ?pincode=...)"""
+    pincodes = request.GET.getlist("pincode")
+    for value in request.GET.getlist("pincodes"):
+        pincodes.extend(p for p in value.split(",") if p.strip())
+    if len(pincodes) > MAX_BATCH_PINCODES:
+        return JsonResponse({"error": f"At most {MAX_BATCH_PINCODES} pincodes per request."}, status=400)
+
+    found = pincode_index.lookup_many(pincodes)
+    return JsonResponse({
+        "results": {pincode: [r._asdict() for r in records] for pincode, records in found.items()},
+    })
+
+
+# 📍 Nearest offices (grid index over the snapshot's lat/long, see spatial.py)
+import math
+
+from . import spatial
+
+MAX_NEAREST = 50
+
+
+def _float_param(request, name):
+    """A finite float, or None when missing or not a number (nan / inf included)."""
+    try:
+        value = float(request.GET[name])
+    except (KeyError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def _coordinates(request):
+    lat, lon = _float_param(request, "lat"), _float_param(request, "lon")
+    if lat is None or lon is None or not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+@login_required
+def nearest_offices(request):
+    """GET ?lat=13.08&lon=80.27&k=5"""
+    point = _coordinates(request)
+    if point is None:
+        return JsonResponse({"error": "Valid lat and lon are required."}, status=400)
+    k = _float_param(request, "k") if "k" in request.GET else 5
+    if k is None:
+        return JsonResponse({"error": f"k must be a number from 1 to {MAX_NEAREST}."}, status=400)
+    k = max(1, min(int(k), MAX_NEAREST))
+    return JsonResponse({"results": spatial.nearest(*point, k=k)})
+
+
+@login_required
+def offices_within(request):
+    """GET ?lat=13.08&lon=80.27&radius_km=10"""
+    point = _coordinates(request)
+    radius = _float_param(request, "radius_km")
+    if point is None or radius is None or not (0 < radius <= 500):
+        return JsonResponse({"error": "Valid lat, lon and radius_km (max 500) are required."}, status=400)
+    return JsonResponse({"results": spatial.within(*point, radius, limit=MAX_NEAREST * 10)})
+
+
+# 🧭 Geography bundle for the chained State → District → Office selects (see geo_bundle.py)
+from django.shortcuts import redirect
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+from . import geo_bundle
+
+BUNDLE_MAX_AGE = 365 * 24 * 3600
+
+
+def _geo_revision(request, revision=None):
+    # Looked up once per request (condition() asks for the ETag and Last-Modified separately)
+    if not hasattr(request, "_geo_revision"):
+        request._geo_revision = geo_bundle.current_revision()
+    return request._geo_revision
+
+
+@login_required
+@condition(
+    etag_func=lambda request, revision=None: f'W/"geo-{_geo_revision(request)[0]}"',
+    last_modified_func=lambda request, revision=None: _geo_revision(request)[1],
+)
+def geography_bundle(request, revision=None):
+    """
+    GET /master/geo/bundle/      → current bundle, revalidated with ETag (304s are cheap)
+    GET /master/geo/bundle/<n>/  → immutable copy of revision n (redirects when outdated)
+    """
+    current, changed_at = _geo_revision(request)
+    if revision is not None and revision != current:
+        return redirect("geography_bundle_revision", revision=current)
+
+    bundle = geo_bundle.get_bundle(current, changed_at)
+    if "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", ""):
+        response = HttpResponse(bundle.gzipped, content_type="application/json")
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = HttpResponse(bundle.body, content_type="application/json")
+    patch_vary_headers(response, ("Accept-Encoding",))
+    if revision is None:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(response, private=True, max_age=BUNDLE_MAX_AGE, immutable=True)
+    return response
@@ -1,8 +1,7 @@
 from django.contrib import admin
 from .models import SDCollection
 from .forms import SDCollectionForm
-from asm.models import ASM
-from zonal_manager.models import ZonalManager
+from account import hierarchy
 
 @admin.register(SDCollection)
 class SDCollectionAdmin(admin.ModelAdmin):
@@ -33,11 +32,10 @@ class SDCollectionAdmin(admin.ModelAdmin):
 
     # ✅ Auto-fill ASM + ZM before saving
     def save_model(self, request, obj, form, change):
-        if obj.partner:
-            asm = ASM.objects.filter(partners=obj.partner).select_related("user").first()
-            if asm:
-                obj.asm = asm.user
-                zm = ZonalManager.objects.filter(asms=asm.user).select_related("user").first()
-                if zm:
-                    obj.zone_manager = zm
+        if obj.partner_id:
+            owners = hierarchy.current().owners_of_partner(obj.partner_id)
+            if owners.asm:
+                obj.asm_id = owners.asm.id
+                if owners.zm_id:
+                    obj.zone_manager_id = owners.zm_id
         super().save_model(request, obj, form, change)
@@ -0,0 +1,113 @@
+# partner/ledger.py
+"""
+Per-partner security-deposit ledger (see PartnerLedger).
+
+Only live rows (is_deleted=False) count. A saved or deleted collection
+re-aggregates the ledger of its partner (and of the previous partner if it
+moved) from that partner's rows and upserts it in one statement, holding
+the partner's user row locked from the aggregate to the write so two
+concurrent changes can't each store a total missing the other's row. rebuild()
+and check() use one grouped query over the whole table.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+
+from account.models import CustomUser
+
+from .models import PartnerLedger, SDCollection
+
+STATUSES = ("pending", "completed", "cancelled")
+LEDGER_FIELDS = (
+    "collections",
+    *(f"{status}_count" for status in STATUSES),
+    *(f"{status}_amount" for status in STATUSES),
+    "last_collection_date",
+)
+
+
+def for_partner(partner):
+    """The partner's ledger in one indexed lookup (an unsaved, empty one if they have no collections)."""
+    return PartnerLedger.objects.filter(partner=partner).first() or PartnerLedger(partner=partner)
+
+
+def summary(partner):
+    """JSON-ready ledger numbers for the SD collection forms."""
+    entry = for_partner(partner)
+    return {
+        "sd_collected": str(entry.completed_amount),
+        "sd_pending": str(entry.pending_amount),
+        "sd_collections": entry.collections,
+        "sd_last_date": entry.last_collection_date.isoformat() if entry.last_collection_date else "",
+    }
+
+
+def _aggregates():
+    values = {"collections": Count("id"), "last_collection_date": Max("date")}
+    for status in STATUSES:
+        values[f"{status}_count"] = Count("id", filter=Q(status=status))
+        values[f"{status}_amount"] = Sum("amount", filter=Q(status=status))
+    return values
+
+
+def _aggregated(queryset=None):
+    """Ledger values computed from the live rows: {partner_id: values}."""
+    queryset = SDCollection.objects.all() if queryset is None else queryset
+    rows = (
+        queryset.filter(is_deleted=False, partner__isnull=False)
+        .values("partner_id")
+        .annotate(**_aggregates())
+        .order_by()
+    )
+    result = {}
+    for row in rows:
+        for status in STATUSES:
+            row[f"{status}_amount"] = row[f"{status}_amount"] or Decimal("0")
+        result[row.pop("partner_id")] = row
+    return result
+
+
+def _upsert(aggregated, batch_size=2000):
+    PartnerLedger.objects.bulk_create(
+        [PartnerLedger(partner_id=partner_id, **values) for partner_id, values in aggregated.items()],
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["partner"],
+        update_fields=[*LEDGER_FIELDS, "updated_at"],
+    )
+
+
+def refresh(partner_ids):
+    """Re-aggregate the ledgers of these partners from their live collections."""
+    partner_ids = {pk for pk in partner_ids if pk is not None}
+    if not partner_ids:
+        return
+    with transaction.atomic():
+        # The partner rows always exist, unlike a first ledger row; lock them in pk order
+        list(CustomUser.objects.select_for_update().filter(pk__in=partner_ids).order_by("pk").values_list("pk", flat=True))
+        aggregated = _aggregated(SDCollection.objects.filter(partner_id__in=partner_ids))
+        emptied = partner_ids - aggregated.keys()
+        if emptied:
+            PartnerLedger.objects.filter(partner_id__in=emptied).delete()
+        _upsert(aggregated)
+
+
+def rebuild(batch_size=2000):
+    """Throw the ledgers away and recompute them all. Returns the number of partners."""
+    aggregated = _aggregated()
+    with transaction.atomic():
+        PartnerLedger.objects.all().delete()
+        _upsert(aggregated, batch_size)
+    return len(aggregated)
+
+
+def check():
+    """Partners whose stored ledger differs from their rows: list of (partner_id, stored, expected)."""
+    expected = _aggregated()
+    stored = {row.pop("partner_id"): row for row in PartnerLedger.objects.values("partner_id", *LEDGER_FIELDS)}
+    return [
+        (partner_id, stored.get(partner_id), expected.get(partner_id))
+        for partner_id in expected.keys() | stored.keys()
+        if stored.get(partner_id) != expected.get(partner_id)
+    ]
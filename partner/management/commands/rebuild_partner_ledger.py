@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from partner import ledger
+
+
+class Command(BaseCommand):
+    help = "Rebuild the partner SD ledgers from the collections, or --check them in one pass."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true", help="Only report partners that differ (exit 1 if any)")
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            problems = ledger.check()
+            for partner_id, stored, expected in problems[:50]:
+                self.stdout.write(f"partner={partner_id}: stored {stored}, expected {expected}")
+            if problems:
+                raise CommandError(f"{len(problems)} partner ledger(s) out of date — run without --check to rebuild.")
+            self.stdout.write(self.style.SUCCESS("✅ Partner ledgers match the SD collections."))
+            return
+
+        count = ledger.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt {count} partner ledgers."))
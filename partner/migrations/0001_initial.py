@@ -0,0 +1,41 @@
+# Generated by Django 4.2.19 on 2026-10-18 17:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('zonal_manager', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SDCollection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(default=django.utils.timezone.now)),
+                ('amount', models.DecimalField(decimal_places=2, default=0.0, max_digits=12)),
+                ('note', models.TextField(blank=True, default='', null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], default='pending', max_length=20)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('asm', models.ForeignKey(blank=True, limit_choices_to={'role': 'Area Sales Manager'}, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='asm_sd_collections', to=settings.AUTH_USER_MODEL)),
+                ('partner', models.ForeignKey(blank=True, limit_choices_to={'role': 'Partner'}, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='partner_sd_collections', to=settings.AUTH_USER_MODEL)),
+                ('zone_manager', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='zm_sd_collections', to='zonal_manager.zonalmanager')),
+            ],
+            options={
+                'verbose_name': 'Security Deposit Collection',
+                'verbose_name_plural': 'Security Deposit Collections',
+                'ordering': ['-date'],
+                'indexes': [models.Index(condition=models.Q(('is_deleted', False)), fields=['asm', 'date'], name='sdcollection_asm_live_date'), models.Index(fields=['zone_manager', 'status', 'date'], name='sdcollection_zm_status_date')],
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.19 on 2026-10-18 17:48
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_ledgers(apps, schema_editor):
+    # Same grouped query as partner.ledger.rebuild(), over the historical models
+    SDCollection = apps.get_model('partner', 'SDCollection')
+    PartnerLedger = apps.get_model('partner', 'PartnerLedger')
+    aggregates = {'collections': models.Count('id'), 'last_collection_date': models.Max('date')}
+    for status in ('pending', 'completed', 'cancelled'):
+        aggregates[f'{status}_count'] = models.Count('id', filter=models.Q(status=status))
+        aggregates[f'{status}_amount'] = models.Sum('amount', filter=models.Q(status=status))
+    rows = (
+        SDCollection.objects.filter(is_deleted=False, partner__isnull=False)
+        .values('partner_id').annotate(**aggregates).order_by()
+    )
+    ledgers = []
+    for row in rows:
+        for status in ('pending', 'completed', 'cancelled'):
+            row[f'{status}_amount'] = row[f'{status}_amount'] or 0
+        ledgers.append(PartnerLedger(**row))
+    PartnerLedger.objects.bulk_create(ledgers, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('partner', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PartnerLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('collections', models.PositiveIntegerField(default=0)),
+                ('pending_count', models.PositiveIntegerField(default=0)),
+                ('completed_count', models.PositiveIntegerField(default=0)),
+                ('cancelled_count', models.PositiveIntegerField(default=0)),
+                ('pending_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('completed_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cancelled_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('last_collection_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('partner', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='sd_ledger', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Partner SD Ledger',
+                'verbose_name_plural': 'Partner SD Ledgers',
+            },
+        ),
+        migrations.RunPython(fill_ledgers, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 from account.models import CustomUser
 from zonal_manager.models import ZonalManager
@@ -53,6 +54,12 @@ class SDCollection(models.Model):
         ordering = ['-date']
         verbose_name = "Security Deposit Collection"
         verbose_name_plural = "Security Deposit Collections"
+        indexes = [
+            # ASM lists / dashboard: asm=…, is_deleted=False, by date
+            models.Index(fields=['asm', 'date'], condition=Q(is_deleted=False), name='sdcollection_asm_live_date'),
+            # ZM list: zone_manager=…, optional status, by date
+            models.Index(fields=['zone_manager', 'status', 'date'], name='sdcollection_zm_status_date'),
+        ]
 
     def __str__(self):
         partner_name = (
@@ -61,3 +68,44 @@ class SDCollection(models.Model):
             else "Unknown Partner"
         )
         return f"{partner_name} - ₹{self.amount} on {self.date}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Whose ledger the row counted in when loaded (refreshed too if it moves)
+        instance._loaded_partner_id = instance.partner_id
+        return instance
+
+
+class PartnerLedger(models.Model):
+    """
+    Running security-deposit totals of one partner over their live
+    (not soft-deleted) SDCollection rows.
+
+    Kept in step by partner/signals.py; rebuilt or checked with
+    `manage.py rebuild_partner_ledger`.
+    """
+    partner = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name='sd_ledger')
+
+    collections = models.PositiveIntegerField(default=0)
+    pending_count = models.PositiveIntegerField(default=0)
+    completed_count = models.PositiveIntegerField(default=0)
+    cancelled_count = models.PositiveIntegerField(default=0)
+    pending_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    completed_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cancelled_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    last_collection_date = models.DateField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Partner SD Ledger"
+        verbose_name_plural = "Partner SD Ledgers"
+
+    @property
+    def balance(self):
+        """Deposit actually collected (completed collections)."""
+        return self.completed_amount
+
+    def __str__(self):
+        return f"{self.partner} - ₹{self.completed_amount} collected, ₹{self.pending_amount} pending"
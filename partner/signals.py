@@ -0,0 +1,14 @@
+# partner/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import ledger
+from .models import SDCollection
+
+
+@receiver(post_save, sender=SDCollection)
+@receiver(post_delete, sender=SDCollection)
+def refresh_partner_ledger(sender, instance, **kwargs):
+    # Soft deletes are saves too: the refresh only counts live rows
+    ledger.refresh({instance.partner_id, getattr(instance, "_loaded_partner_id", None)})
+    instance._loaded_partner_id = instance.partner_id
@@ -1,3 +1,101 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from zonal_manager.models import ZonalManager
+
+from . import ledger
+from .models import PartnerLedger, SDCollection
+
+User = get_user_model()
+
+
+class PartnerLedgerTests(TestCase):
+    def setUp(self):
+        self.partner = User.objects.create_user(username="p1", password="pass", role="Partner", email="p1@example.com")
+        self.other = User.objects.create_user(username="p2", role="Partner", email="p2@example.com")
+        self.asm = User.objects.create_user(username="asm1", role="Area Sales Manager", email="asm1@example.com")
+
+    def _collect(self, amount, day, status="pending", partner=None):
+        return SDCollection.objects.create(
+            partner=partner or self.partner, asm=self.asm, amount=amount, date=day, status=status
+        )
+
+    def _ledger(self, partner=None):
+        return PartnerLedger.objects.get(partner=partner or self.partner)
+
+    def test_follows_create_update_soft_delete_and_moves(self):
+        first = self._collect(Decimal("100.00"), date(2025, 3, 1))
+        self._collect(Decimal("50.00"), date(2025, 3, 5), status="completed")
+        entry = self._ledger()
+        self.assertEqual((entry.collections, entry.pending_amount, entry.completed_amount), (2, 100, 50))
+        self.assertEqual(entry.last_collection_date, date(2025, 3, 5))
+
+        first.status = "completed"
+        first.amount = Decimal("120.00")
+        first.save()
+        entry = self._ledger()
+        self.assertEqual((entry.pending_count, entry.completed_count, entry.balance), (0, 2, Decimal("170.00")))
+
+        # Soft delete (what the ASM pages do) leaves the ledger
+        first = SDCollection.objects.get(pk=first.pk)
+        first.is_deleted = True
+        first.save()
+        self.assertEqual((self._ledger().collections, self._ledger().balance), (1, 50))
+
+        # Moving a row to another partner updates both ledgers
+        moved = SDCollection.objects.get(amount=50)
+        moved.partner = self.other
+        moved.save()
+        self.assertFalse(PartnerLedger.objects.filter(partner=self.partner).exists())
+        self.assertEqual(self._ledger(self.other).completed_amount, 50)
+
+        moved.delete()
+        self.assertFalse(PartnerLedger.objects.exists())
+        self.assertEqual(ledger.check(), [])
+
+    def test_refresh_locks_the_partners_before_summing(self):
+        self._collect(10, date(2025, 3, 1))
+        with CaptureQueriesContext(connection) as queries:
+            ledger.refresh({self.partner.pk, self.other.pk})
+        sql = [query["sql"] for query in queries.captured_queries]
+        lock = next(i for i, q in enumerate(sql) if q.startswith("SELECT") and '"account_customuser"' in q)
+        aggregate = next(i for i, q in enumerate(sql) if '"partner_sdcollection"' in q)
+        self.assertLess(lock, aggregate)
+        self.assertEqual(ledger.check(), [])
+
+    def test_rebuild_and_check_command(self):
+        self._collect(10, date(2025, 3, 1))
+        self._collect(20, date(2025, 3, 2), status="cancelled", partner=self.other)
+        SDCollection.objects.filter(partner=self.partner).update(amount=15)  # bypasses the signals
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_partner_ledger", "--check", stdout=StringIO())
+        call_command("rebuild_partner_ledger", stdout=StringIO())
+        call_command("rebuild_partner_ledger", "--check", stdout=StringIO())
+        self.assertEqual(self._ledger().pending_amount, 15)
+        self.assertEqual((self._ledger(self.other).cancelled_count, self._ledger(self.other).cancelled_amount), (1, 20))
+
+    def test_pages_read_the_ledger(self):
+        self._collect(Decimal("75.50"), date(2025, 3, 1), status="completed")
+        zm_user = User.objects.create_user(username="zm1", password="pass", role="Zone Manager", email="zm1@example.com")
+        ZonalManager.objects.create(user=zm_user)
+
+        self.client.login(username="zm1", password="pass")
+        data = self.client.get(reverse("get_partner_details", args=[self.partner.pk])).json()
+        self.assertEqual((data["sd_collected"], data["sd_pending"], data["sd_last_date"]), ("75.50", "0.00", "2025-03-01"))
+        data = self.client.get(reverse("get_partner_details", args=[self.other.pk])).json()
+        self.assertEqual((data["sd_collections"], data["sd_collected"]), (0, "0"))
 
-# Create your tests here.
+        self.client.login(username="p1", password="pass")
+        with self.assertNumQueries(3):  # session, user, ledger
+            response = self.client.get(reverse("partner_dashboard"))
+        self.assertContains(response, "₹75.50")
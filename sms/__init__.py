@@ -0,0 +1,7 @@
+try:
+    # Loaded with Django so @shared_task binds to the project's app
+    from .celery import app as celery_app
+except ImportError:  # Celery not installed: only the "thread" / "sync" job backends work
+    celery_app = None
+
+__all__ = ('celery_app',)
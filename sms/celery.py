@@ -0,0 +1,16 @@
+# sms/celery.py
+"""
+Celery app for MASTER_JOB_BACKEND = "celery" (worker: `celery -A sms worker`).
+
+Settings prefixed CELERY_ in sms/settings.py configure it; tasks are picked
+up from each app's tasks.py.
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sms.settings')
+
+app = Celery('sms')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 from pathlib import Path
+import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -143,6 +144,45 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Uploaded files (e.g. pincode CSVs waiting for a background import)
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Background jobs for the pincode import / master mapping:
+# "thread" (in-process pool, no broker), "celery" or "sync"
+MASTER_JOB_BACKEND = os.environ.get('MASTER_JOB_BACKEND', 'thread')
+MASTER_JOB_WORKERS = 2
+# A pending / running job with no progress for this long is marked failed (its runner died)
+MASTER_JOB_TIMEOUT = 30 * 60
+
+# Celery (sms/celery.py), used by MASTER_JOB_BACKEND = "celery"
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', os.environ.get('REDIS_URL', ''))
+CELERY_TASK_ACKS_LATE = True
+
+# 🧠 Cache (Redis when REDIS_URL is set, per-process memory otherwise).
+# Production with several workers needs REDIS_URL: the dashboard cache invalidates through it.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+            'OPTIONS': {'CLIENT_CLASS': 'django_redis.client.DefaultClient'},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Role dashboards: fresh for TTL seconds, then served stale up to STALE seconds while one request refreshes
+DASHBOARD_CACHE_TTL = 300
+DASHBOARD_CACHE_STALE = 600
+
+# Memory-mapped pincode lookup snapshot shared by all worker processes
+PINCODE_INDEX_PATH = BASE_DIR / 'var' / 'pincode_index.bin'
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,94 @@
+/*
+ * 🧭 Chained State → District → Office selects filtered in the browser.
+ *
+ * Widgets with data-autocomplete-light-function="geo-select2" read the
+ * versioned geography bundle (/master/geo/bundle/) once per page and search
+ * it locally instead of calling the autocomplete views on every keystroke.
+ * The browser revalidates the bundle with its ETag, so an unchanged master
+ * costs a single 304. If the bundle can't be loaded the widget falls back to
+ * the regular DAL select2 (server-side autocomplete).
+ */
+document.addEventListener('dal-init-function', function () {
+
+    var PAGE_SIZE = 50;
+    var bundlePromises = {};
+
+    function loadBundle($, url) {
+        if (!bundlePromises[url]) {
+            bundlePromises[url] = $.ajax({url: url, dataType: 'json', cache: true}).then(function (data) {
+                // Index once: level → [{id, text, parent, search}]
+                var states = {};
+                data.states.forEach(function (s) { states[s[0]] = s[1]; });
+                return {
+                    states: data.states.map(function (s) {
+                        return {id: String(s[0]), text: s[1], parent: null, search: s[1].toUpperCase()};
+                    }),
+                    districts: data.districts.map(function (d) {
+                        var text = d[1] + ' (' + (states[d[2]] || '') + ')';
+                        return {id: String(d[0]), text: text, parent: String(d[2]), search: d[1].toUpperCase()};
+                    }),
+                    offices: data.offices.map(function (o) {
+                        var text = o[1] + ' (' + o[3] + ')';
+                        return {id: String(o[0]), text: text, parent: String(o[2]), search: o[1].toUpperCase(), pincode: o[3]};
+                    }),
+                };
+            });
+        }
+        return bundlePromises[url];
+    }
+
+    // Same ranking as CachedSearchAutocomplete: prefix matches first, then contains
+    function search(items, term, parents) {
+        var q = (term || '').trim().toUpperCase();
+        var prefix = [], contains = [];
+        var digits = /^\d+$/.test(q);
+        for (var i = 0; i < items.length; i++) {
+            var item = items[i];
+            if (parents && parents.indexOf(item.parent) === -1) continue;
+            if (!q) {
+                prefix.push(item);
+            } else if (digits && item.pincode !== undefined) {
+                if (item.pincode.indexOf(q) === 0) prefix.push(item);
+            } else if (item.search.indexOf(q) === 0) {
+                prefix.push(item);
+            } else if (q.length >= 3 && item.search.indexOf(q) !== -1) {
+                contains.push(item);
+            }
+        }
+        return prefix.concat(contains);
+    }
+
+    yl.registerFunction('geo-select2', function ($, element) {
+        var $element = $(element);
+        var level = $element.attr('data-geo-level');
+        var parentId = $element.attr('data-geo-parent');
+
+        loadBundle($, $element.attr('data-geo-bundle-url')).then(function (bundle) {
+            $element.select2({
+                placeholder: $element.attr('data-placeholder') || '',
+                allowClear: !$element.is('[required]'),
+                ajax: {
+                    delay: 100,
+                    transport: function (params, success) {
+                        var parents = null;
+                        if (parentId) {
+                            parents = ($('#' + parentId).val() || []).map(String);
+                            if (!parents.length) parents = null;
+                        }
+                        var page = params.data.page || 1;
+                        var matches = search(bundle[level], params.data.term, parents);
+                        var start = (page - 1) * PAGE_SIZE;
+                        success({
+                            results: matches.slice(start, start + PAGE_SIZE),
+                            pagination: {more: matches.length > start + PAGE_SIZE},
+                        });
+                        return {abort: function () {}};
+                    },
+                },
+            });
+        }, function () {
+            console.warn('⚠️ Geography bundle unavailable, using server autocomplete.');
+            yl.functions['select2']($, element);
+        });
+    });
+});
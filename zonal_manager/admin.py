@@ -1,6 +1,52 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.core.files.storage import default_storage
+from django.db.models import Count, DecimalField, F, Func, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.shortcuts import redirect, render
+from django.urls import path
 from django.utils.html import format_html
+from import_export.admin import ImportExportModelAdmin
+
+from account import closure
+from master.jobs import submit
+from partner.models import SDCollection
+
 from .models import ZonalManager, ZMDailyTarget
+from .resources import IMPORT_FORMATS, ZMDailyTargetResource
+
+
+def _sd_aggregate(function, output_field, **filters):
+    """
+    SUM / COUNT over a ZM's live SD collections, correlated to the outer
+    ZonalManager row: its own rows plus those of anyone under it, the scope of
+    the ZM's SD collection list.
+    """
+    rows = SDCollection.objects.filter(
+        Q(zone_manager=OuterRef("pk")) | Q(asm_id__in=closure.descendants(OuterRef(OuterRef("user_id")), min_depth=1)),
+        is_deleted=False,
+        **filters,
+    )
+    value = rows.order_by().values(value=Func(F("amount") if function == "SUM" else Value(1), function=function))
+    return Coalesce(Subquery(value, output_field=output_field), 0, output_field=output_field)
+
+
+def hierarchy_overview():
+    """Every ZM with its ASM and partner counts and SD totals, in one grouped query."""
+    amount = DecimalField(max_digits=14, decimal_places=2)
+    return (
+        ZonalManager.objects.select_related("user")
+        .annotate(
+            asms_total=Count("asms", distinct=True),
+            partners_total=Count("asms__asm_profile__partners", distinct=True),
+            sd_count=_sd_aggregate("COUNT", IntegerField()),
+            sd_amount=_sd_aggregate("SUM", amount),
+            sd_pending_amount=_sd_aggregate("SUM", amount, status="pending"),
+            sd_completed_amount=_sd_aggregate("SUM", amount, status="completed"),
+        )
+        .order_by("user__username")
+    )
 
 
 @admin.register(ZonalManager)
@@ -9,23 +55,96 @@ class ZonalManagerAdmin(admin.ModelAdmin):
     search_fields = ('user__username', 'user__first_name', 'user__last_name')
     filter_horizontal = ('asms',)
     list_filter = ('created_at',)
+    change_list_template = "admin/zonalmanager_changelist.html"
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("user").annotate(asms_total=Count("asms"))
+
+    def get_urls(self):
+        custom_urls = [
+            path("hierarchy/", self.admin_site.admin_view(self.hierarchy_view), name="zonal_manager_hierarchy"),
+        ]
+        return custom_urls + super().get_urls()
 
     def zm_name(self, obj):
         return obj.user.get_full_name() if obj.user else "Unassigned"
     zm_name.short_description = "Zonal Manager"
 
+    @admin.display(description="ASMs Assigned", ordering="asms_total")
     def asm_count(self, obj):
-        return obj.asms.count()
-    asm_count.short_description = "ASMs Assigned"
+        return obj.asms_total
+
+    # 🌳 Hierarchy overview: ZM → ASMs → partners, with SD totals
+    def hierarchy_view(self, request):
+        if not self.has_view_permission(request):
+            raise PermissionDenied  # admin_view only checks is_staff
+        zms = list(hierarchy_overview())
+        totals = {
+            name: sum(getattr(zm, name) for zm in zms)
+            for name in ("asms_total", "partners_total", "sd_count", "sd_amount", "sd_pending_amount", "sd_completed_amount")
+        }
+        context = dict(
+            self.admin_site.each_context(request),
+            title="Hierarchy overview",
+            opts=self.model._meta,
+            zms=zms,
+            totals=totals,
+        )
+        return render(request, "admin/zonal_manager_hierarchy.html", context)
+
+
+class AchievementFilter(admin.SimpleListFilter):
+    """Achievement % bands, filtered on the stored achievement_percent column."""
+    title = "achievement"
+    parameter_name = "achievement"
+
+    BANDS = {
+        "under_50": {"achievement_percent__lt": 50},
+        "50_99": {"achievement_percent__gte": 50, "achievement_percent__lt": 100},
+        "100_plus": {"achievement_percent__gte": 100},
+    }
+
+    def lookups(self, request, model_admin):
+        return [("under_50", "Below 50%"), ("50_99", "50–99%"), ("100_plus", "100% and above")]
+
+    def queryset(self, request, queryset):
+        band = self.BANDS.get(self.value())
+        return queryset.filter(**band) if band else queryset
+
+
+def _extension(name):
+    return name.rsplit(".", 1)[-1].lower()
+
+
+class BackgroundImportForm(forms.Form):
+    import_file = forms.FileField(
+        label="Select target file",
+        help_text="Same columns as the regular import; checked and saved in one go, nothing is saved if any row has an error.",
+    )
+
+    def __init__(self, extensions, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.extensions = extensions
+
+    def clean_import_file(self):
+        upload = self.cleaned_data["import_file"]
+        if _extension(upload.name) not in self.extensions:
+            raise forms.ValidationError(f"Upload one of: {', '.join(sorted(self.extensions))}.")
+        return upload
+
+
 @admin.register(ZMDailyTarget)
-class ZMDailyTargetAdmin(admin.ModelAdmin):
+class ZMDailyTargetAdmin(ImportExportModelAdmin):
+    resource_classes = [ZMDailyTargetResource]
     list_display = (
         'zonal_manager_name', 'asm_name', 'date',
         'total_target_display', 'total_achieve_display', 'achievement_percent_display',
     )
-    list_filter = ('date', 'zonal_manager__user__username')
+    list_filter = ('date', AchievementFilter, 'zonal_manager__user__username')
+    list_select_related = ('zonal_manager__user', 'asm')
     search_fields = ('zonal_manager__user__username', 'asm__username')
     date_hierarchy = 'date'
+    import_export_change_list_template = "admin/zmdailytarget_changelist.html"
     readonly_fields = ('achievement_summary_display',)
 
     fieldsets = (
@@ -47,6 +166,41 @@ class ZMDailyTargetAdmin(admin.ModelAdmin):
         ("📊 Summary", {"fields": ('achievement_summary_display',)}),
     )
 
+    def get_urls(self):
+        custom_urls = [
+            path(
+                "import-background/",
+                self.admin_site.admin_view(self.background_import_view),
+                name="zonal_manager_zmdailytarget_import_background",
+            ),
+        ]
+        return custom_urls + super().get_urls()
+
+    # ---------- Large files: import as a background master job ----------
+    def background_import_view(self, request):
+        if not self.has_import_permission(request):
+            raise PermissionDenied
+        extensions = {fmt().get_extension() for fmt in self.get_import_formats()} & IMPORT_FORMATS.keys()
+        if request.method == "POST":
+            form = BackgroundImportForm(extensions, request.POST, request.FILES)
+            if form.is_valid():
+                upload = form.cleaned_data["import_file"]
+                source_file = default_storage.save(f"target_imports/{upload.name}", upload)
+                job = submit("import_targets", user=request.user, source_file=source_file,
+                             options={"format": _extension(upload.name)})
+                messages.info(request, f"Daily Target Import queued as job #{job.pk}.")
+                return redirect("admin:master_job_status", job_id=job.pk)
+        else:
+            form = BackgroundImportForm(extensions)
+
+        context = dict(
+            self.admin_site.each_context(request),
+            title="Import daily targets in background",
+            opts=self.model._meta,
+            form=form,
+        )
+        return render(request, "admin/zmdailytarget_import_background.html", context)
+
     # ---------- Manager Names ----------
     def zonal_manager_name(self, obj):
         return obj.zonal_manager.user.get_full_name() if obj.zonal_manager and obj.zonal_manager.user else "No ZM"
@@ -56,43 +210,35 @@ class ZMDailyTargetAdmin(admin.ModelAdmin):
         return obj.asm.get_full_name() if obj.asm else "No ASM"
     asm_name.short_description = "ASM"
 
-    # ---------- Numeric Helpers ----------
-    def total_target_value(self, obj):
-        return float(sum([
-            obj.application_target, obj.pop_target, obj.esign_target,
-            obj.new_taluk_target, obj.new_live_partners_target,
-            obj.activations_target, obj.calls_target, obj.sd_collection_target
-        ]))
-
-    def total_achieve_value(self, obj):
-        return float(sum([
-            obj.application_achieve, obj.pop_achieve, obj.esign_achieve,
-            obj.new_taluk_achieve, obj.new_live_partners_achieve,
-            obj.activations_achieve, obj.calls_achieve, obj.sd_collection_achieve
-        ]))
+    # ---------- Footer: totals of the filtered rows (one aggregate) ----------
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        cl = (getattr(response, "context_data", None) or {}).get("cl")
+        if cl is not None:
+            totals = cl.queryset.totals()
+            target, achieve = totals["total_target"], totals["total_achieve"]
+            totals["achievement_percent"] = achieve / target * 100 if target > 0 else 0
+            response.context_data["totals"] = totals
+        return response
 
     # ---------- List Display Fields ----------
-        # ---------- List Display Fields ----------
+    @admin.display(description="Total Target", ordering="total_target")
     def total_target_display(self, obj):
-        value = self.total_target_value(obj)
-        return format_html('<span>{}</span>', f"{value:.2f}")
-    total_target_display.short_description = "Total Target"
+        return format_html('<span>{}</span>', f"{obj.total_target:.2f}")
 
+    @admin.display(description="Total Achieved", ordering="total_achieve")
     def total_achieve_display(self, obj):
-        total = self.total_achieve_value(obj)
+        total = obj.total_achieve
         color = "green" if total > 0 else "red"
         formatted_total = f"{total:.2f}"
         return format_html('<b style="color:{};">{}</b>', color, formatted_total)
-    total_achieve_display.short_description = "Total Achieved"
 
+    @admin.display(description="Achievement %", ordering="achievement_percent")
     def achievement_percent_display(self, obj):
-        total_t = self.total_target_value(obj)
-        total_a = self.total_achieve_value(obj)
-        percent = (total_a / total_t * 100) if total_t > 0 else 0
+        percent = obj.achievement_percent
         color = "green" if percent >= 100 else "orange" if percent >= 50 else "red"
         formatted_percent = f"{percent:.1f}%"
         return format_html('<b style="color:{};">{}</b>', color, formatted_percent)
-    achievement_percent_display.short_description = "Achievement %"
 
 
     # ---------- Summary Display ----------
@@ -121,8 +267,8 @@ class ZMDailyTargetAdmin(admin.ModelAdmin):
             color = "green" if percent >= 100 else "orange" if percent >= 50 else "red"
             html += f"<tr><td>{name}</td><td>{target_val:.0f}</td><td>{achieved_val:.0f}</td><td style='color:{color};'><b>{percent:.1f}%</b></td></tr>"
 
-        total_t = float(self.total_target_value(obj))
-        total_a = float(self.total_achieve_value(obj))
+        total_t = float(obj.total_target)
+        total_a = float(obj.total_achieve)
         overall = (total_a / total_t * 100) if total_t > 0 else 0
         overall_color = "green" if overall >= 100 else "orange" if overall >= 50 else "red"
 
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ZonalManagerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'zonal_manager'
+
+    def ready(self):
+        from . import signals  # keeps ZMTargetRollup in step
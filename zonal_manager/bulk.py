@@ -0,0 +1,96 @@
+# zonal_manager/bulk.py
+"""
+Bulk target assignment: many ASMs × a date range in one go.
+
+Existing (asm, date) rows are found with one set-based query and reported as
+conflicts instead of being overwritten; the rest is inserted with
+bulk_create. The (asm, date) unique constraint makes a concurrent submission
+fail the insert, in which case the plan is rebuilt once against the new rows.
+"""
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+
+from account import dashboard_cache
+
+from . import rollups
+from .models import TARGET_FIELDS, ZMDailyTarget
+
+MAX_BULK_DAYS = 92
+
+
+@dataclass
+class BulkResult:
+    created: int = 0
+    conflicts: list = field(default_factory=list)   # [(asm, date)] already had a target
+    missing_source: list = field(default_factory=list)  # [(asm, date)] nothing to copy from
+
+
+def date_range(start, end):
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def _source_values(asms, days, copy_from):
+    """{(asm_id, day): {metric: value}} copied from the period starting at copy_from."""
+    offset = days[0] - copy_from
+    rows = ZMDailyTarget.objects.filter(
+        asm__in=asms, date__gte=copy_from, date__lte=copy_from + (days[-1] - days[0]),
+    ).values("asm_id", "date", *TARGET_FIELDS)
+    return {(row.pop("asm_id"), row.pop("date") + offset): row for row in rows}
+
+
+def _plan(zonal_manager, asms, days, values, copy_from):
+    result = BulkResult()
+    existing = set(
+        ZMDailyTarget.objects.filter(asm__in=asms, date__gte=days[0], date__lte=days[-1])
+        .values_list("asm_id", "date")
+    )
+    source = _source_values(asms, days, copy_from) if copy_from else None
+
+    rows = []
+    for asm in asms:
+        for day in days:
+            if (asm.pk, day) in existing:
+                result.conflicts.append((asm, day))
+                continue
+            targets = values
+            if source is not None:
+                targets = source.get((asm.pk, day))
+                if targets is None:
+                    result.missing_source.append((asm, day))
+                    continue
+            rows.append(ZMDailyTarget(zonal_manager=zonal_manager, asm=asm, date=day, **targets))
+    return rows, result
+
+
+def assign_targets(zonal_manager, asms, start, end, values=None, copy_from=None):
+    """
+    Create targets for every (asm, day) in start..end without one yet.
+
+    `values` maps target field → value; with `copy_from` (a date) each day
+    takes the ASM's targets from the same position in the period starting
+    there instead.
+    """
+    asms = list(asms)
+    days = date_range(start, end)
+    for attempt in range(2):
+        rows, result = _plan(zonal_manager, asms, days, values or {}, copy_from)
+        try:
+            with transaction.atomic():
+                ZMDailyTarget.objects.bulk_create(rows, batch_size=1000)
+        except IntegrityError:
+            # Another submission inserted some of these meanwhile — re-plan once
+            if attempt:
+                raise
+            continue
+        break
+
+    result.created = len(rows)
+    if rows:
+        # bulk_create skips the model signals
+        rollups.refresh_range([asm.pk for asm in asms], start, end)
+        dashboard_cache.invalidate("zm", zonal_manager.pk)
+        for asm in asms:
+            dashboard_cache.invalidate("asm", asm.pk)
+    return result
@@ -0,0 +1,131 @@
+import random
+import time
+from datetime import date, timedelta
+
+import tablib
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from import_export import fields, resources, widgets
+
+from account.models import CustomUser
+from zonal_manager.models import ACHIEVE_FIELDS, TARGET_FIELDS, ZMDailyTarget, ZonalManager
+from zonal_manager.resources import ZMDailyTargetResource
+
+
+class _Rollback(Exception):
+    pass
+
+
+class LegacyResource(resources.ModelResource):
+    """A plain ModelResource: per-row username lookups, instance queries and saves."""
+    zonal_manager = fields.Field(
+        attribute="zonal_manager", column_name="zonal_manager",
+        widget=widgets.ForeignKeyWidget(ZonalManager, "user__username"),
+    )
+    asm = fields.Field(attribute="asm", column_name="asm", widget=widgets.ForeignKeyWidget(CustomUser, "username"))
+
+    class Meta:
+        model = ZMDailyTarget
+        fields = ("zonal_manager", "asm", "date", *TARGET_FIELDS, *ACHIEVE_FIELDS)
+        import_id_fields = ("asm", "date")
+        skip_unchanged = True
+
+
+def seed(zms, asms_per_zm):
+    users = CustomUser.objects.bulk_create(
+        [
+            CustomUser(username=f"bench-zm{i}", email=f"bench-zm{i}@example.com", role="Zone Manager")
+            for i in range(zms)
+        ]
+        + [
+            CustomUser(username=f"bench-asm{i}", email=f"bench-asm{i}@example.com", role="Area Sales Manager")
+            for i in range(zms * asms_per_zm)
+        ]
+    )
+    zm_users = CustomUser.objects.filter(username__startswith="bench-zm").order_by("id")
+    ZonalManager.objects.bulk_create([ZonalManager(user=user) for user in zm_users])
+    return [f"bench-zm{i}" for i in range(zms)], [f"bench-asm{i}" for i in range(len(users) - zms)]
+
+
+def synthetic_dataset(zm_names, asm_names, rows, seed_=3):
+    """`rows` targets: every ASM, consecutive days from 2025-01-01."""
+    rnd = random.Random(seed_)
+    per_zm = len(asm_names) // len(zm_names)
+    headers = ["zonal_manager", "asm", "date", *TARGET_FIELDS, *ACHIEVE_FIELDS]
+    data = tablib.Dataset(headers=headers)
+    start = date(2025, 1, 1)
+    for i in range(rows):
+        asm_index = i % len(asm_names)
+        day = start + timedelta(days=i // len(asm_names))
+        data.append([
+            zm_names[asm_index // per_zm], asm_names[asm_index], day.isoformat(),
+            *(rnd.randint(0, 50) for _ in TARGET_FIELDS), *(rnd.randint(0, 50) for _ in ACHIEVE_FIELDS),
+        ])
+    return data
+
+
+class Command(BaseCommand):
+    help = "Time a synthetic ZMDailyTarget spreadsheet import: plain resource vs bulk resource (rolled back)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=50000)
+        parser.add_argument("--zms", type=int, default=20)
+        parser.add_argument("--asms-per-zm", type=int, default=25)
+        parser.add_argument("--legacy-rows", type=int, default=2000, help="Rows timed with the plain resource")
+        parser.add_argument("--format", choices=["csv", "xlsx"], default="csv")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                zm_names, asm_names = seed(options["zms"], options["asms_per_zm"])
+                source = synthetic_dataset(zm_names, asm_names, options["rows"])
+                self._run(source, options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _load(self, source, file_format):
+        start = time.perf_counter()
+        content = source.export(file_format)
+        dataset = tablib.Dataset().load(content, format=file_format)
+        self.stdout.write(f"{'parse ' + file_format:<40} {(time.perf_counter() - start) * 1000:10.0f} ms")
+        return dataset
+
+    def _time(self, label, resource, dataset, dry_run):
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            # The debug query log is capped, so count through a wrapper
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            start = time.perf_counter()
+            result = resource.import_data(dataset, dry_run=dry_run)
+            elapsed = (time.perf_counter() - start) * 1000
+        totals = dict(result.totals)
+        self.stdout.write(
+            f"{label:<40} {elapsed:10.0f} ms {queries:7d} queries  "
+            f"new={totals.get('new', 0)} update={totals.get('update', 0)} "
+            f"skip={totals.get('skip', 0)} errors={len(result.base_errors) + len(result.row_errors())}"
+        )
+        return result
+
+    def _run(self, source, options):
+        dataset = self._load(source, options["format"])
+        rows = len(dataset)
+
+        legacy = tablib.Dataset(*dataset[:options["legacy_rows"]], headers=dataset.headers)
+        self._time(f"plain resource, {len(legacy)} rows, dry run", LegacyResource(), legacy, True)
+
+        self._time(f"bulk resource, {rows} rows, dry run", ZMDailyTargetResource(), dataset, True)
+        self._time(f"bulk resource, {rows} rows, import", ZMDailyTargetResource(), dataset, False)
+
+        # Same file again: every row exists → updates / unchanged rows
+        changed = tablib.Dataset(*[
+            (*row[:3], *(float(value) + 1 for value in row[3:])) if i % 2 else row for i, row in enumerate(dataset)
+        ], headers=dataset.headers)
+        self._time(f"bulk resource, {rows} rows, update dry run", ZMDailyTargetResource(), changed, True)
+        self._time(f"bulk resource, {rows} rows, update", ZMDailyTargetResource(), changed, False)
+        self.stdout.write(f"Stored targets: {ZMDailyTarget.objects.count()}")
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from zonal_manager import rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the ZMDailyTarget day/week/month rollups, or --check them against the raw rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true", help="Only report buckets that differ (exit 1 if any)")
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            problems = rollups.check()
+            for (zm_id, asm_id, period, start), stored, expected in problems[:50]:
+                self.stdout.write(
+                    f"{period} {start} zm={zm_id} asm={asm_id}: stored rows={stored and stored['rows']}, "
+                    f"expected rows={expected and expected['rows']}"
+                )
+            if problems:
+                raise CommandError(f"{len(problems)} rollup bucket(s) out of date — run without --check to rebuild.")
+            self.stdout.write(self.style.SUCCESS("✅ Rollups match the daily targets."))
+            return
+
+        count = rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt {count} rollup buckets."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from zonal_manager.models import ZMDailyTarget
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored total_target / total_achieve / achievement_percent columns of every daily target."
+
+    def handle(self, *args, **options):
+        updated = ZMDailyTarget.objects.refresh_totals()
+        self.stdout.write(self.style.SUCCESS(f"✅ Refreshed totals of {updated} daily targets."))
@@ -0,0 +1,103 @@
+# Generated by Django 4.2.19 on 2026-10-18 17:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ZonalManager',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('asms', models.ManyToManyField(blank=True, help_text='Select ASMs under this Zonal Manager', limit_choices_to={'role': 'Area Sales Manager'}, related_name='assigned_zms', to=settings.AUTH_USER_MODEL)),
+                ('user', models.OneToOneField(blank=True, limit_choices_to={'role': 'Zone Manager'}, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='zm_profile', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ZMTargetRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'Day'), ('week', 'ISO Week'), ('month', 'Month')], max_length=5)),
+                ('period_start', models.DateField(help_text='Day, Monday of the ISO week, or 1st of the month')),
+                ('rows', models.PositiveIntegerField(default=0)),
+                ('application_target', models.FloatField(default=0)),
+                ('pop_target', models.FloatField(default=0)),
+                ('esign_target', models.FloatField(default=0)),
+                ('new_taluk_target', models.FloatField(default=0)),
+                ('new_live_partners_target', models.FloatField(default=0)),
+                ('activations_target', models.FloatField(default=0)),
+                ('calls_target', models.FloatField(default=0)),
+                ('sd_collection_target', models.FloatField(default=0)),
+                ('application_achieve', models.FloatField(default=0)),
+                ('pop_achieve', models.FloatField(default=0)),
+                ('esign_achieve', models.FloatField(default=0)),
+                ('new_taluk_achieve', models.FloatField(default=0)),
+                ('new_live_partners_achieve', models.FloatField(default=0)),
+                ('activations_achieve', models.FloatField(default=0)),
+                ('calls_achieve', models.FloatField(default=0)),
+                ('sd_collection_achieve', models.FloatField(default=0)),
+                ('asm', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='target_rollups', to=settings.AUTH_USER_MODEL)),
+                ('zonal_manager', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='target_rollups', to='zonal_manager.zonalmanager')),
+            ],
+            options={
+                'ordering': ['period', 'period_start'],
+                'indexes': [models.Index(fields=['period', 'zonal_manager', 'period_start'], name='zonal_manag_period_b8c572_idx')],
+                'unique_together': {('zonal_manager', 'asm', 'period', 'period_start')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ZMDailyTarget',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(default=django.utils.timezone.now)),
+                ('application_target', models.FloatField(default=0)),
+                ('pop_target', models.FloatField(default=0)),
+                ('esign_target', models.FloatField(default=0)),
+                ('new_taluk_target', models.FloatField(default=0)),
+                ('new_live_partners_target', models.FloatField(default=0)),
+                ('activations_target', models.FloatField(default=0)),
+                ('calls_target', models.FloatField(default=0)),
+                ('sd_collection_target', models.FloatField(default=0)),
+                ('asm_application_target', models.FloatField(default=0)),
+                ('asm_pop_target', models.FloatField(default=0)),
+                ('asm_esign_target', models.FloatField(default=0)),
+                ('asm_new_taluk_target', models.FloatField(default=0)),
+                ('asm_new_live_partners_target', models.FloatField(default=0)),
+                ('asm_activations_target', models.FloatField(default=0)),
+                ('asm_calls_target', models.FloatField(default=0)),
+                ('asm_sd_collection_target', models.FloatField(default=0)),
+                ('application_achieve', models.FloatField(default=0)),
+                ('pop_achieve', models.FloatField(default=0)),
+                ('esign_achieve', models.FloatField(default=0)),
+                ('new_taluk_achieve', models.FloatField(default=0)),
+                ('new_live_partners_achieve', models.FloatField(default=0)),
+                ('activations_achieve', models.FloatField(default=0)),
+                ('calls_achieve', models.FloatField(default=0)),
+                ('sd_collection_achieve', models.FloatField(default=0)),
+                ('total_target', models.FloatField(default=0, editable=False)),
+                ('total_achieve', models.FloatField(default=0, editable=False)),
+                ('achievement_percent', models.FloatField(default=0, editable=False, help_text='Total achieve ÷ total target × 100')),
+                ('asm', models.ForeignKey(blank=True, default=None, help_text='Select the ASM under this Zonal Manager', limit_choices_to={'role': 'Area Sales Manager'}, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='zm_targets', to=settings.AUTH_USER_MODEL)),
+                ('zonal_manager', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_targets', to='zonal_manager.zonalmanager')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['zonal_manager', 'date', 'achievement_percent'], name='zonal_manag_zonal_m_3f0f05_idx'), models.Index(fields=['asm', 'date', 'achievement_percent'], name='zonal_manag_asm_id_d75af9_idx'), models.Index(fields=['achievement_percent'], name='zonal_manag_achieve_5d8a02_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='zmdailytarget',
+            constraint=models.UniqueConstraint(fields=('asm', 'date'), name='unique_daily_target_per_asm'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.19 on 2026-10-18 18:19
+
+from django.db import migrations, models
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+METRICS = (
+    'application', 'pop', 'esign', 'new_taluk', 'new_live_partners', 'activations', 'calls', 'sd_collection',
+)
+SUM_FIELDS = tuple(f'{m}_target' for m in METRICS) + tuple(f'{m}_achieve' for m in METRICS)
+
+
+def fill_rollups(apps, schema_editor):
+    # Same grouped queries as zonal_manager.rollups.rebuild(), over the historical models;
+    # also drops any duplicate NULL-owner buckets before the constraints below
+    ZMDailyTarget = apps.get_model('zonal_manager', 'ZMDailyTarget')
+    ZMTargetRollup = apps.get_model('zonal_manager', 'ZMTargetRollup')
+    rollups = []
+    for period, trunc in (('day', TruncDay), ('week', TruncWeek), ('month', TruncMonth)):
+        rows = (
+            ZMDailyTarget.objects.annotate(period_start=trunc('date'))
+            .values('zonal_manager_id', 'asm_id', 'period_start')
+            .annotate(rows=models.Count('id'), **{name: models.Sum(name) for name in SUM_FIELDS})
+            .order_by()
+        )
+        for row in rows:
+            row['period_start'] = models.DateField().to_python(row['period_start'])
+            rollups.append(ZMTargetRollup(period=period, **row))
+    ZMTargetRollup.objects.all().delete()
+    ZMTargetRollup.objects.bulk_create(rollups, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zonal_manager', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='zmtargetrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('asm__isnull', True)), fields=('zonal_manager', 'period', 'period_start'), name='unique_rollup_without_asm'),
+        ),
+        migrations.AddConstraint(
+            model_name='zmtargetrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('zonal_manager__isnull', True)), fields=('asm', 'period', 'period_start'), name='unique_rollup_without_zm'),
+        ),
+        migrations.AddConstraint(
+            model_name='zmtargetrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('asm__isnull', True), ('zonal_manager__isnull', True)), fields=('period', 'period_start'), name='unique_rollup_without_owner'),
+        ),
+    ]
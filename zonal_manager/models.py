@@ -1,4 +1,10 @@
+from functools import reduce
+from operator import add
+
 from django.db import models
+from django.db.models import Case, Count, ExpressionWrapper, F, FloatField, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThan
 from django.conf import settings
 from django.utils import timezone
 
@@ -35,6 +41,89 @@ class ZonalManager(models.Model):
         return f"ZM: {self.user.get_full_name() if self.user else 'Unassigned'}"
 
 
+# 🎯 The eight metrics every daily target row carries
+METRICS = (
+    "application", "pop", "esign", "new_taluk",
+    "new_live_partners", "activations", "calls", "sd_collection",
+)
+TARGET_FIELDS = tuple(f"{m}_target" for m in METRICS)
+ACHIEVE_FIELDS = tuple(f"{m}_achieve" for m in METRICS)
+
+
+def _as_expression(value):
+    # Literals become SQL values, so the sums and the division below never run in Python
+    if hasattr(value, "resolve_expression"):
+        return value
+    return Value(float(value or 0), output_field=FloatField())
+
+
+def _field_sum(fields, values=None):
+    # Summed left to right, like the Python loops it replaces
+    values = values or {}
+    return ExpressionWrapper(
+        reduce(add, (_as_expression(values.get(name, F(name))) for name in fields)), output_field=FloatField()
+    )
+
+
+def _totals_expressions(values=None):
+    """SQL for the stored total/percent columns (new `values` take precedence over columns)."""
+    total_target = _field_sum(TARGET_FIELDS, values)
+    total_achieve = _field_sum(ACHIEVE_FIELDS, values)
+    return {
+        "total_target": total_target,
+        "total_achieve": total_achieve,
+        "achievement_percent": Case(
+            When(GreaterThan(total_target, 0), then=total_achieve / total_target * Value(100.0)),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+    }
+
+
+class ZMDailyTargetQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        # Keep the stored totals right in the same UPDATE when a metric changes
+        # (bulk_update() passes totals it already computed)
+        if any(name in kwargs for name in TARGET_FIELDS + ACHIEVE_FIELDS) and not any(
+            name in kwargs for name in TOTAL_FIELDS
+        ):
+            kwargs.update(_totals_expressions(kwargs))
+        return super().update(**kwargs)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        for obj in objs:
+            obj.compute_totals()
+        # Upserts (update_conflicts=True) rewrite the totals along with the metrics
+        update_fields = kwargs.get("update_fields")
+        if update_fields and any(name in update_fields for name in TARGET_FIELDS + ACHIEVE_FIELDS):
+            kwargs["update_fields"] = list(update_fields) + [name for name in TOTAL_FIELDS if name not in update_fields]
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        fields = list(fields)
+        if any(name in fields for name in TARGET_FIELDS + ACHIEVE_FIELDS):
+            for obj in objs:
+                obj.compute_totals()
+            fields += [name for name in TOTAL_FIELDS if name not in fields]
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def refresh_totals(self):
+        """Recompute the stored totals from the metric columns (after raw SQL edits etc.)."""
+        return super().update(**_totals_expressions())
+
+    def totals(self, **extra):
+        """Row count and overall target / achieve sums (plus any `extra` aggregates) in one query."""
+        return self.aggregate(
+            records=Count("id"),
+            total_target=Coalesce(Sum("total_target"), Value(0.0)),
+            total_achieve=Coalesce(Sum("total_achieve"), Value(0.0)),
+            **extra,
+        )
+
+
+TOTAL_FIELDS = ("total_target", "total_achieve", "achievement_percent")
+
+
 class ZMDailyTarget(models.Model):
     """
     Daily target and achievement tracking for each Zonal Manager.
@@ -93,5 +182,116 @@ class ZMDailyTarget(models.Model):
     calls_achieve = models.FloatField(default=0)
     sd_collection_achieve = models.FloatField(default=0)
 
+    # 📊 Maintained from the fields above (save() and the queryset bulk paths)
+    total_target = models.FloatField(default=0, editable=False)
+    total_achieve = models.FloatField(default=0, editable=False)
+    achievement_percent = models.FloatField(default=0, editable=False, help_text="Total achieve ÷ total target × 100")
+
+    objects = ZMDailyTargetQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # "ASMs under 50% this week", sorted lists per ZM / ASM
+            models.Index(fields=["zonal_manager", "date", "achievement_percent"]),
+            models.Index(fields=["asm", "date", "achievement_percent"]),
+            models.Index(fields=["achievement_percent"]),
+        ]
+        constraints = [
+            # One target per ASM and day, also under concurrent (bulk) submissions
+            models.UniqueConstraint(fields=["asm", "date"], name="unique_daily_target_per_asm"),
+        ]
+
     def __str__(self):
         return f"Target for {self.zonal_manager} on {self.date}"
+
+    def compute_totals(self):
+        # float(): the edit views assign Decimals
+        self.total_target = sum(float(getattr(self, name) or 0) for name in TARGET_FIELDS)
+        self.total_achieve = sum(float(getattr(self, name) or 0) for name in ACHIEVE_FIELDS)
+        self.achievement_percent = (
+            self.total_achieve / self.total_target * 100 if self.total_target > 0 else 0.0
+        )
+
+    def save(self, *args, **kwargs):
+        self.compute_totals()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and any(name in update_fields for name in TARGET_FIELDS + ACHIEVE_FIELDS):
+            kwargs["update_fields"] = {*update_fields, *TOTAL_FIELDS}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Where the row sat when loaded (rollup buckets to refresh if it moves)
+        instance._loaded_key = (instance.zonal_manager_id, instance.asm_id, instance.date)
+        return instance
+
+
+class ZMTargetRollup(models.Model):
+    """
+    Summed targets/achievements of ZMDailyTarget per (ZM, ASM, period).
+
+    Kept in step by zonal_manager/signals.py; rebuilt or checked with
+    `manage.py rebuild_target_rollups`. QuerySet.update() / bulk writes on
+    ZMDailyTarget send no signals and so bypass the rollups: refresh them
+    (rollups.refresh_rows / refresh_range) after such writes.
+
+    A deleted ASM user's target rows are kept with asm=NULL, so their sums
+    move to the ZM's no-ASM buckets (see signals.refresh_asm_rollups).
+    """
+    PERIOD_CHOICES = [
+        ("day", "Day"),
+        ("week", "ISO Week"),
+        ("month", "Month"),
+    ]
+
+    zonal_manager = models.ForeignKey(
+        ZonalManager, on_delete=models.CASCADE, related_name="target_rollups", null=True, blank=True,
+    )
+    asm = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="target_rollups", null=True, blank=True,
+    )
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    period_start = models.DateField(help_text="Day, Monday of the ISO week, or 1st of the month")
+    rows = models.PositiveIntegerField(default=0)
+
+    application_target = models.FloatField(default=0)
+    pop_target = models.FloatField(default=0)
+    esign_target = models.FloatField(default=0)
+    new_taluk_target = models.FloatField(default=0)
+    new_live_partners_target = models.FloatField(default=0)
+    activations_target = models.FloatField(default=0)
+    calls_target = models.FloatField(default=0)
+    sd_collection_target = models.FloatField(default=0)
+
+    application_achieve = models.FloatField(default=0)
+    pop_achieve = models.FloatField(default=0)
+    esign_achieve = models.FloatField(default=0)
+    new_taluk_achieve = models.FloatField(default=0)
+    new_live_partners_achieve = models.FloatField(default=0)
+    activations_achieve = models.FloatField(default=0)
+    calls_achieve = models.FloatField(default=0)
+    sd_collection_achieve = models.FloatField(default=0)
+
+    class Meta:
+        unique_together = ("zonal_manager", "asm", "period", "period_start")
+        constraints = [
+            # NULLs never collide in unique_together: one bucket without a ZM / ASM each
+            models.UniqueConstraint(
+                fields=["zonal_manager", "period", "period_start"],
+                condition=models.Q(asm__isnull=True), name="unique_rollup_without_asm",
+            ),
+            models.UniqueConstraint(
+                fields=["asm", "period", "period_start"],
+                condition=models.Q(zonal_manager__isnull=True), name="unique_rollup_without_zm",
+            ),
+            models.UniqueConstraint(
+                fields=["period", "period_start"],
+                condition=models.Q(zonal_manager__isnull=True, asm__isnull=True), name="unique_rollup_without_owner",
+            ),
+        ]
+        indexes = [models.Index(fields=["period", "zonal_manager", "period_start"])]
+        ordering = ["period", "period_start"]
+
+    def __str__(self):
+        return f"{self.get_period_display()} {self.period_start} — {self.zonal_manager} / {self.asm}"
@@ -0,0 +1,118 @@
+# zonal_manager/pagination.py
+"""
+Keyset ("seek") pagination for the long date-ordered lists.
+
+Pages are addressed by the ordering key of their last (or first) row instead of
+an OFFSET, so page 50 costs the same indexed range scan as page 1 and rows
+inserted meanwhile don't shift the pages. Cursors are opaque URL-safe strings;
+one that doesn't decode to valid values of the ordering fields (garbled or
+tampered with) is ignored and the first page is served.
+"""
+import base64
+import json
+from dataclasses import dataclass, field
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+DEFAULT_PER_PAGE = 50
+
+
+@dataclass
+class KeysetPage:
+    rows: list = field(default_factory=list)
+    next_cursor: str = ""
+    prev_cursor: str = ""
+
+    @property
+    def has_next(self):
+        return bool(self.next_cursor)
+
+    @property
+    def has_previous(self):
+        return bool(self.prev_cursor)
+
+
+def encode_cursor(values):
+    raw = json.dumps([str(v) for v in values], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, fields):
+    """Cursor → list of key values converted by `fields`' to_python(), or None when it is missing/garbled."""
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != len(fields):
+        return None
+    try:
+        values = [model_field.to_python(value) for model_field, value in zip(fields, values)]
+    except (ValidationError, TypeError, ValueError):
+        return None
+    if any(value is None for value in values):
+        return None
+    return values
+
+
+def _seek(ordering, values, forward):
+    """Rows strictly after (forward) or before the key `values` in `ordering`."""
+    conditions = []
+    for i, name in enumerate(ordering):
+        field_name = name.lstrip("-")
+        descending = name.startswith("-")
+        lookup = "lt" if descending == forward else "gt"
+        equal = {ordering[j].lstrip("-"): values[j] for j in range(i)}
+        conditions.append(Q(**equal, **{f"{field_name}__{lookup}": values[i]}))
+    return reduce(or_, conditions)
+
+
+def _flip(ordering):
+    return [name[1:] if name.startswith("-") else f"-{name}" for name in ordering]
+
+
+def keyset_paginate(queryset, ordering, after=None, before=None, per_page=DEFAULT_PER_PAGE):
+    """
+    One page of `queryset` in `ordering` (model fields of the queryset's
+    model, the last one unique).
+
+    `after` / `before` are cursors from a previous page's next_cursor /
+    prev_cursor. Costs a single query fetching per_page + 1 rows.
+    """
+    ordering = list(ordering)
+    names = [name.lstrip("-") for name in ordering]
+
+    def key(row):
+        return [row[name] if isinstance(row, dict) else getattr(row, name) for name in names]
+
+    fields = [queryset.model._meta.get_field(name) for name in names]
+    before_values = decode_cursor(before, fields)
+    after_values = None if before_values else decode_cursor(after, fields)
+
+    if before_values:
+        rows = list(queryset.filter(_seek(ordering, before_values, forward=False)).order_by(*_flip(ordering))[:per_page + 1])
+        has_more = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        page = KeysetPage(rows=rows)
+        if rows:
+            page.next_cursor = encode_cursor(key(rows[-1]))
+            if has_more:
+                page.prev_cursor = encode_cursor(key(rows[0]))
+        return page
+
+    if after_values:
+        queryset = queryset.filter(_seek(ordering, after_values, forward=True))
+    rows = list(queryset.order_by(*ordering)[:per_page + 1])
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    page = KeysetPage(rows=rows)
+    if rows:
+        if has_more:
+            page.next_cursor = encode_cursor(key(rows[-1]))
+        if after_values:
+            page.prev_cursor = encode_cursor(key(rows[0]))
+    return page
@@ -0,0 +1,324 @@
+# zonal_manager/resources.py
+"""
+Spreadsheet import / export of ZMDailyTarget (django-import-export).
+
+Rows are keyed by (asm username, date), the same pair the unique constraint
+guards. Everything an import needs from the database is loaded up front —
+the ZM and ASM username maps and the existing targets of the file's ASMs and
+dates, one query each — so rows never trigger lookups of their own. The
+username columns map straight to the *_id attributes, which keeps the
+per-row instance copies the diff preview takes small.
+
+Rows are written with bulk_create / bulk_update in batches; those skip the
+model signals, so after_import refreshes the rollups and dashboards once.
+
+The admin's import page parses, previews and writes the file within its
+requests, which is fine for a few thousand rows; bigger files (a 50k row file
+takes ~45 s) go through "Import in background", a master job (master/jobs.py)
+running import_file().
+"""
+from functools import partial
+
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.utils.html import escape
+from diff_match_patch import diff_match_patch
+from import_export import fields, resources, widgets
+from import_export.formats.base_formats import DEFAULT_FORMATS
+from import_export.instance_loaders import BaseInstanceLoader
+from import_export.results import RowResult
+
+from account import dashboard_cache
+from account.models import CustomUser
+
+from . import rollups
+from .models import ACHIEVE_FIELDS, TARGET_FIELDS, ZMDailyTarget, ZonalManager
+
+IMPORT_BATCH_SIZE = 1000
+
+
+class UsernameIdWidget(widgets.Widget):
+    """Username column ↔ foreign key id, through a map loaded once per import / export."""
+
+    def __init__(self, required=False, **kwargs):
+        super().__init__(**kwargs)
+        self.required = required
+        self.load({})
+
+    def load(self, ids):
+        """`ids` maps username → id."""
+        self.ids = ids
+        self.usernames = {pk: username for username, pk in ids.items()}
+
+    def clean(self, value, row=None, **kwargs):
+        username = str(value).strip() if value is not None else ""
+        if not username:
+            if self.required:
+                raise ValueError("A username is required.")
+            return None
+        try:
+            return self.ids[username]
+        except KeyError:
+            raise ValueError(f"Unknown username '{username}'.")
+
+    def render(self, value, obj=None, **kwargs):
+        return self.usernames.get(value, "") if value is not None else ""
+
+
+class CachedDateWidget(widgets.DateWidget):
+    """DateWidget parsing each distinct cell once (a month file repeats ~30 dates)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.parsed = {}
+
+    def clean(self, value, row=None, **kwargs):
+        if not isinstance(value, str):
+            return super().clean(value, row, **kwargs)
+        if value not in self.parsed:
+            self.parsed[value] = super().clean(value, row, **kwargs)
+        return self.parsed[value]
+
+
+class MetricWidget(widgets.FloatWidget):
+    """Floats kept native: spreadsheet cells stay numbers and diffs compare values, not formatted text."""
+
+    def __init__(self, **kwargs):
+        super().__init__(coerce_to_string=False, **kwargs)
+
+    def clean(self, value, row=None, **kwargs):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+        try:
+            return float(value)  # plain "12" / "12.5" cells skip the locale parsing
+        except (TypeError, ValueError):
+            return super().clean(value, row, **kwargs)
+
+
+class TargetInstanceLoader(BaseInstanceLoader):
+    """Existing targets of the dataset's ASMs and date span, loaded in one query."""
+
+    def __init__(self, resource, dataset=None):
+        super().__init__(resource, dataset)
+        self.instances = {}
+        keys = resource.dataset_keys
+        if keys:
+            days = [day for _, day in keys]
+            existing = ZMDailyTarget.objects.filter(
+                asm_id__in={asm_id for asm_id, _ in keys}, date__gte=min(days), date__lte=max(days)
+            )
+            self.instances = {(t.asm_id, t.date): t for t in existing}
+
+    def get_instance(self, row):
+        try:
+            key = self.resource.row_key(row)
+        except ValueError:
+            return None  # reported when the row itself is imported
+        return self.instances.get(key)
+
+
+class TargetDiff(resources.Diff):
+    """Only changed cells of existing rows go through diff-match-patch."""
+
+    def __init__(self, resource, instance, new):
+        # A new row has no "before" side worth rendering
+        self.left = [] if new else self._read_field_values(resource, instance)
+        self.right = []
+        self.new = new
+
+    def as_html(self):
+        if self.new:
+            return [escape(value) for value in self.right]
+        dmp = diff_match_patch()
+        cells = []
+        for old, new in zip(self.left, self.right):
+            if old == new:
+                cells.append(escape(new))
+                continue
+            diff = dmp.diff_main(str(old), str(new))
+            dmp.diff_cleanupSemantic(diff)
+            cells.append(dmp.diff_prettyHtml(diff))
+        return cells
+
+
+class TargetRowResult(RowResult):
+    """RowResult labelling rows from the username maps (str(target) would fetch the ZM and user)."""
+
+    def __init__(self, resource):
+        super().__init__()
+        self.resource = resource
+
+    def add_instance_info(self, instance):
+        if instance is not None:
+            self.object_id = instance.pk
+            asm = self.resource.fields["asm"].widget.render(instance.asm_id)
+            self.object_repr = f"Target for {asm or 'no ASM'} on {instance.date}"
+
+
+class ZMDailyTargetResource(resources.ModelResource):
+    zonal_manager = fields.Field(attribute="zonal_manager_id", column_name="zonal_manager", widget=UsernameIdWidget())
+    asm = fields.Field(attribute="asm_id", column_name="asm", widget=UsernameIdWidget(required=True))
+    date = fields.Field(attribute="date", column_name="date", widget=CachedDateWidget())
+
+    class Meta:
+        model = ZMDailyTarget
+        fields = ("zonal_manager", "asm", "date", *TARGET_FIELDS, *ACHIEVE_FIELDS)
+        import_id_fields = ("asm", "date")
+        instance_loader_class = TargetInstanceLoader
+        use_bulk = True
+        batch_size = IMPORT_BATCH_SIZE
+        skip_unchanged = True
+        report_skipped = False
+
+    def __init__(self, progress=None, **kwargs):
+        super().__init__(**kwargs)
+        self.progress = progress
+        self.dataset_keys = set()
+        self.dataset_headers = ()
+        self._imported_keys = set()
+        self._owners = set()
+
+    @classmethod
+    def widget_from_django_field(cls, f, default=widgets.Widget):
+        if isinstance(f, models.FloatField):
+            return MetricWidget
+        return super().widget_from_django_field(f, default)
+
+    def get_diff_class(self):
+        return TargetDiff
+
+    def get_row_result_class(self):
+        return partial(TargetRowResult, self)
+
+    def row_key(self, row):
+        return self.fields["asm"].clean(row), self.fields["date"].clean(row)
+
+    def _load_usernames(self, zm_filter, asm_filter):
+        self.fields["zonal_manager"].widget.load(
+            dict(ZonalManager.objects.filter(**zm_filter).values_list("user__username", "id"))
+        )
+        self.fields["asm"].widget.load(
+            dict(CustomUser.objects.filter(role="Area Sales Manager", **asm_filter).values_list("username", "id"))
+        )
+
+    # ---------- Export ----------
+    def before_export(self, queryset, **kwargs):
+        super().before_export(queryset, **kwargs)
+        queryset = self.get_queryset() if queryset is None else queryset
+        self._load_usernames(
+            {"id__in": queryset.values("zonal_manager_id")}, {"id__in": queryset.values("asm_id")}
+        )
+
+    # ---------- Import ----------
+    def before_import(self, dataset, **kwargs):
+        """Load the username maps and the (asm, date) keys of the file."""
+        super().before_import(dataset, **kwargs)
+
+        def column(name):
+            return {str(v).strip() for v in dataset[name] if v} if name in dataset.headers else set()
+
+        self._load_usernames({"user__username__in": column("zonal_manager")}, {"username__in": column("asm")})
+        self.dataset_headers = tuple(dataset.headers)
+        self.dataset_keys = set()
+        for row in dataset.dict:
+            try:
+                self.dataset_keys.add(self.row_key(row))
+            except (KeyError, ValueError):
+                continue
+        self._imported_keys = set()
+        self._owners = set()
+
+    def before_import_row(self, row, **kwargs):
+        super().before_import_row(row, **kwargs)
+        # A new row without one would be saved with no ZM at all
+        if not str(row.get("zonal_manager") or "").strip():
+            raise ValidationError({"zonal_manager": "A zonal manager username is required."})
+
+    def after_import_row(self, row, row_result, **kwargs):
+        super().after_import_row(row, row_result, **kwargs)
+        if self.progress and kwargs["row_number"] % IMPORT_BATCH_SIZE == 0:
+            self.progress(kwargs["row_number"])
+
+    def get_bulk_update_fields(self):
+        # Columns missing from the file keep their stored values
+        return [
+            name for name in super().get_bulk_update_fields()
+            if self.fields[name].column_name in self.dataset_headers
+        ]
+
+    def bulk_update(self, using_transactions, dry_run, raise_errors, batch_size=None, result=None):
+        """
+        Write changed rows as an upsert on (asm, date): one INSERT … ON CONFLICT
+        per batch instead of bulk_update()'s CASE expression per column and row.
+        """
+        update_fields = self.get_bulk_update_fields()
+        try:
+            if self.update_instances and update_fields and not (dry_run and not using_transactions):
+                ZMDailyTarget.objects.bulk_create(
+                    self.update_instances,
+                    batch_size=batch_size,
+                    update_conflicts=True,
+                    unique_fields=["asm", "date"],
+                    update_fields=update_fields,
+                )
+        except Exception as e:
+            self.handle_import_error(result, e, raise_errors)
+        finally:
+            self.update_instances.clear()
+
+    def import_instance(self, instance, row, **kwargs):
+        if instance.pk is not None and instance.zonal_manager_id:
+            self._owners.add(("zm", instance.zonal_manager_id))
+        super().import_instance(instance, row, **kwargs)
+        key = (instance.asm_id, instance.date)
+        if key in self._imported_keys:
+            raise ValidationError({"date": "This ASM and date appear more than once in the file."})
+        self._imported_keys.add(key)
+        self._owners.update({("zm", instance.zonal_manager_id), ("asm", instance.asm_id)})
+
+    def after_import(self, dataset, result, **kwargs):
+        super().after_import(dataset, result, **kwargs)
+        if kwargs.get("dry_run") or not self._imported_keys:
+            return
+        # Bulk writes skip the signals that keep these in step
+        days = [day for _, day in self._imported_keys]
+        rollups.refresh_range({asm_id for asm_id, _ in self._imported_keys}, min(days), max(days))
+        for kind, owner_id in self._owners:
+            dashboard_cache.invalidate(kind, owner_id)
+
+
+# ---------- Background import (master job "import_targets") ----------
+IMPORT_FORMATS = {fmt().get_extension(): fmt for fmt in DEFAULT_FORMATS}
+
+MAX_ERROR_DETAILS = 20
+
+
+def import_file(content, extension, progress=None):
+    """
+    Import a whole target file (bytes) in one transaction and summarise it.
+
+    Like the admin's confirm step nothing is written when any row has an
+    error; the first MAX_ERROR_DETAILS of them are listed in "details".
+    """
+    input_format = IMPORT_FORMATS[extension]()
+    if not input_format.is_binary():
+        content = content.decode("utf-8-sig")  # spreadsheet apps often save CSVs with a BOM
+    dataset = input_format.create_dataset(content)
+    result = ZMDailyTargetResource(progress=progress).import_data(
+        dataset, use_transactions=True, rollback_on_validation_errors=True
+    )
+
+    lines = [(number, str(error.error)) for number, errors in result.row_errors() for error in errors]
+    lines += [(row.number, "; ".join(row.error.messages)) for row in result.invalid_rows]
+    details = [f"File: {error.error}" for error in result.base_errors]
+    details += [f"Line {number}: {message}" for number, message in sorted(lines, key=lambda line: line[0])]
+    failed = result.has_errors() or result.has_validation_errors()
+    return {
+        "rows": result.total_rows,
+        "new": 0 if failed else result.totals["new"],
+        "updated": 0 if failed else result.totals["update"],
+        "unchanged": 0 if failed else result.totals["skip"],
+        "errors": len(details),
+        "details": details[:MAX_ERROR_DETAILS],
+        "detail_count": len(details),
+    }
@@ -0,0 +1,147 @@
+# zonal_manager/rollups.py
+"""
+Day / ISO-week / month rollups of ZMDailyTarget (see ZMTargetRollup).
+
+A saved or deleted target row only affects the three buckets it falls in (six
+if it moved), so those buckets are re-aggregated from their raw rows, which is
+at most a month of one ASM's rows. Each bucket row is locked (created first if
+needed) before its rows are summed, so concurrent writers to a bucket take
+turns and the last one sees every committed row; the bucket's unique
+constraints (NULL ZM / ASM included) make a concurrent create wait and reuse
+the winner's row. refresh_range() (bulk inserts), rebuild() and check() use
+one grouped query per period instead.
+
+ZMDailyTarget.objects.update() and bulk_create / bulk_update send no signals
+and bypass the rollups; callers refresh the affected buckets themselves.
+"""
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+from .models import ACHIEVE_FIELDS, TARGET_FIELDS, ZMDailyTarget, ZMTargetRollup
+
+PERIODS = ("day", "week", "month")
+TRUNC = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth}
+SUM_FIELDS = TARGET_FIELDS + ACHIEVE_FIELDS
+
+
+def period_start(period, day):
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+
+def period_end(period, start):
+    """Last day of the bucket starting at `start`."""
+    if period == "week":
+        return start + timedelta(days=6)
+    if period == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return start
+
+
+def _sums():
+    return {name: Sum(name) for name in SUM_FIELDS}
+
+
+def buckets_for(zonal_manager_id, asm_id, day):
+    day = models.DateField().to_python(day)
+    return {(zonal_manager_id, asm_id, period, period_start(period, day)) for period in PERIODS}
+
+
+def refresh(buckets):
+    """Re-aggregate the given (zm_id, asm_id, period, period_start) buckets from raw rows."""
+    for zm_id, asm_id, period, start in buckets:
+        owner = {"zonal_manager_id": zm_id, "asm_id": asm_id}
+        with transaction.atomic():
+            # Lock first, sum after: an empty bucket row is created to hold the lock
+            rollup, _ = ZMTargetRollup.objects.select_for_update().get_or_create(
+                **owner, period=period, period_start=start
+            )
+            values = ZMDailyTarget.objects.filter(
+                **owner, date__gte=start, date__lte=period_end(period, start)
+            ).aggregate(rows=Count("id"), **_sums())
+            if not values["rows"]:
+                rollup.delete()
+            else:
+                ZMTargetRollup.objects.filter(pk=rollup.pk).update(**values)
+
+
+def refresh_rows(keys):
+    """Refresh the buckets of (zm_id, asm_id, date) keys, e.g. after a bulk insert."""
+    buckets = set()
+    for zm_id, asm_id, day in keys:
+        buckets |= buckets_for(zm_id, asm_id, day)
+    refresh(buckets)
+
+
+def _aggregated(period, queryset=None):
+    """Buckets of one period computed from the raw rows: {(zm_id, asm_id, period, start): values}."""
+    queryset = ZMDailyTarget.objects.all() if queryset is None else queryset
+    result = {}
+    rows = (
+        queryset.annotate(period_start=TRUNC[period]("date"))
+        .values("zonal_manager_id", "asm_id", "period_start")
+        .annotate(rows=Count("id"), **_sums())
+        .order_by()
+    )
+    for row in rows:
+        start = models.DateField().to_python(row.pop("period_start"))
+        key = (row.pop("zonal_manager_id"), row.pop("asm_id"), period, start)
+        result[key] = row
+    return result
+
+
+def _create(aggregated, batch_size=2000):
+    ZMTargetRollup.objects.bulk_create(
+        [
+            ZMTargetRollup(zonal_manager_id=zm_id, asm_id=asm_id, period=period, period_start=start, **values)
+            for (zm_id, asm_id, period, start), values in aggregated.items()
+        ],
+        batch_size=batch_size,
+    )
+
+
+def refresh_range(asm_ids, start, end):
+    """Set-based refresh of every bucket of these ASMs touching start..end (after bulk writes)."""
+    for period in PERIODS:
+        low = period_start(period, start)
+        high = period_end(period, period_start(period, end))
+        aggregated = _aggregated(period, ZMDailyTarget.objects.filter(asm_id__in=asm_ids, date__gte=low, date__lte=high))
+        with transaction.atomic():
+            ZMTargetRollup.objects.filter(
+                asm_id__in=asm_ids, period=period, period_start__gte=low, period_start__lte=high
+            ).delete()
+            _create(aggregated)
+
+
+def rebuild(batch_size=2000):
+    """Throw the rollups away and recompute them all. Returns the number of buckets."""
+    aggregated = {}
+    for period in PERIODS:
+        aggregated.update(_aggregated(period))
+    with transaction.atomic():
+        ZMTargetRollup.objects.all().delete()
+        _create(aggregated, batch_size)
+    return len(aggregated)
+
+
+def check(tolerance=1e-6):
+    """Buckets whose stored sums differ from the raw rows: list of (key, stored, expected)."""
+    expected = {}
+    for period in PERIODS:
+        expected.update(_aggregated(period))
+    stored = {
+        (r.pop("zonal_manager_id"), r.pop("asm_id"), r.pop("period"), r.pop("period_start")): r
+        for r in ZMTargetRollup.objects.values("zonal_manager_id", "asm_id", "period", "period_start", "rows", *SUM_FIELDS)
+    }
+    problems = []
+    for key in expected.keys() | stored.keys():
+        have, want = stored.get(key), expected.get(key)
+        if have is None or want is None or any(abs(have[n] - want[n]) > tolerance for n in want):
+            problems.append((key, have, want))
+    return problems
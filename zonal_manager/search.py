@@ -0,0 +1,168 @@
+# zonal_manager/search.py
+"""
+Structured search box for the daily target lists.
+
+The query is split into terms and each recognised term becomes an exact or
+range predicate the (zonal_manager / asm, date) indexes can serve:
+
+    2025-03-05, 05-03-2025, 05/03/2025      one day
+    2025-03-01..2025-03-15, "<date> to <date>"  a date range
+    March, mar 2025, 2025-03, 03/2025       a month (without a year: the latest one)
+    2025                                    a year
+    asm:ravi / user:ravi                    exact username
+    ravi@example.com                        exact email
+
+Anything else is free text and matched against the ASM's username / first /
+last name, which the trigram indexes (account migration 0003) serve on
+PostgreSQL. All person terms are resolved in one users subquery.
+"""
+import calendar
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+from django.db.models import Q
+
+from account.models import CustomUser
+
+DAY_FORMATS = ("%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y", "%d.%m.%Y")
+MONTH_FORMATS = ("%Y-%m", "%m/%Y", "%m-%Y")
+RANGE_SEPARATORS = re.compile(r"\s*(?:\.\.|\bto\b)\s*", re.IGNORECASE)
+MONTHS = {
+    name.lower(): number
+    for number in range(1, 13)
+    for name in (calendar.month_name[number], calendar.month_abbr[number])
+}
+# "sept" is common enough in typed dates
+MONTHS["sept"] = 9
+
+
+@dataclass
+class TargetSearch:
+    date_from: date = None
+    date_to: date = None
+    usernames: list = field(default_factory=list)
+    emails: list = field(default_factory=list)
+    text: list = field(default_factory=list)
+
+    def __bool__(self):
+        return any((self.date_from, self.date_to, self.usernames, self.emails, self.text))
+
+    def narrow(self, start, end):
+        """Intersect the date window with start..end."""
+        self.date_from = max(start, self.date_from) if self.date_from else start
+        self.date_to = min(end, self.date_to) if self.date_to else end
+
+
+def _parse_day(value):
+    for fmt in DAY_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _month_span(year, month):
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _parse_month(value, year_hint, today):
+    """(first, last) day of a numeric or named month, or None."""
+    for fmt in MONTH_FORMATS:
+        try:
+            parsed = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        return _month_span(parsed.year, parsed.month)
+
+    month = MONTHS.get(value.lower().rstrip("."))
+    if month is None:
+        return None
+    if year_hint is None:
+        # The latest such month that has started
+        year_hint = today.year if month <= today.month else today.year - 1
+    return _month_span(year_hint, month)
+
+
+def _parse_span(value, today):
+    """(first, last) day for a day, month or year term."""
+    day = _parse_day(value)
+    if day:
+        return day, day
+    if re.fullmatch(r"(19|20)\d{2}", value):
+        year = int(value)
+        return date(year, 1, 1), date(year, 12, 31)
+    return _parse_month(value, None, today)
+
+
+def parse(query, today=None):
+    """Split a search box value into a TargetSearch."""
+    today = today or date.today()
+    search = TargetSearch()
+    query = (query or "").strip()
+
+    # Ranges first, so their halves aren't read as separate terms
+    parts = RANGE_SEPARATORS.split(query, maxsplit=1)
+    if len(parts) == 2:
+        left_terms, right_terms = parts[0].split(), parts[1].split()
+        start = _parse_span(left_terms[-1], today) if left_terms else None
+        end = _parse_span(right_terms[0], today) if right_terms else None
+        if start and end:
+            search.narrow(start[0], end[1])
+            query = " ".join(left_terms[:-1] + right_terms[1:])
+        else:
+            # Not a range after all; the connector itself is no search term
+            query = " ".join(left_terms + right_terms)
+
+    terms = query.split()
+    i = 0
+    while i < len(terms):
+        term = terms[i]
+        lowered = term.lower()
+        following = terms[i + 1] if i + 1 < len(terms) else ""
+
+        if lowered.startswith(("asm:", "user:")):
+            username = term.split(":", 1)[1]
+            if username:
+                search.usernames.append(username)
+        elif "@" in term.strip("@") and "." in term.split("@")[-1]:
+            search.emails.append(term)
+        elif lowered.rstrip(".") in MONTHS and re.fullmatch(r"(19|20)\d{2}", following):
+            # "March 2025"
+            search.narrow(*_parse_month(term, int(following), today))
+            i += 1
+        else:
+            span = _parse_span(term, today)
+            if span:
+                search.narrow(*span)
+            else:
+                search.text.append(term)
+        i += 1
+    return search
+
+
+def user_condition(search):
+    """Q over CustomUser for the person terms (every free-text term must match)."""
+    condition = Q()
+    if search.usernames:
+        condition &= Q(username__in=search.usernames)
+    if search.emails:
+        # Exact (unique index); addresses are stored as typed, usually lower case
+        condition &= Q(email__in={variant for email in search.emails for variant in (email, email.lower())})
+    for term in search.text:
+        condition &= Q(username__icontains=term) | Q(first_name__icontains=term) | Q(last_name__icontains=term)
+    return condition
+
+
+def apply(targets, query, today=None):
+    """Filter a ZMDailyTarget queryset by a search box value."""
+    search = parse(query, today)
+    if search.date_from:
+        targets = targets.filter(date__gte=search.date_from)
+    if search.date_to:
+        targets = targets.filter(date__lte=search.date_to)
+    if search.usernames or search.emails or search.text:
+        asm_ids = CustomUser.objects.filter(user_condition(search)).values("id")
+        targets = targets.filter(asm_id__in=asm_ids)
+    return targets
@@ -0,0 +1,40 @@
+# zonal_manager/signals.py
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from account import dashboard_cache
+from account.models import CustomUser
+
+from . import rollups
+from .models import ZMDailyTarget, ZMTargetRollup
+
+
+@receiver(post_save, sender=ZMDailyTarget)
+@receiver(post_delete, sender=ZMDailyTarget)
+def refresh_target_rollups(sender, instance, **kwargs):
+    buckets = rollups.buckets_for(instance.zonal_manager_id, instance.asm_id, instance.date)
+    loaded = getattr(instance, "_loaded_key", None)
+    if loaded is not None:
+        buckets |= rollups.buckets_for(*loaded)
+    rollups.refresh(buckets)
+    instance._loaded_key = (instance.zonal_manager_id, instance.asm_id, instance.date)
+
+
+@receiver(pre_delete, sender=CustomUser)
+def remember_asm_rollups(sender, instance, **kwargs):
+    # The user's rollups cascade away while their target rows are kept with asm=NULL
+    # (SET_NULL, no signal): those rows move into the ZM's no-ASM buckets
+    instance._rollup_buckets = {
+        (zm_id, None, period, start)
+        for zm_id, period, start in ZMTargetRollup.objects.filter(asm=instance).values_list(
+            "zonal_manager_id", "period", "period_start"
+        )
+    }
+
+
+@receiver(post_delete, sender=CustomUser)
+def refresh_asm_rollups(sender, instance, **kwargs):
+    buckets = getattr(instance, "_rollup_buckets", ())
+    rollups.refresh(buckets)
+    for zm_id in {zm_id for zm_id, _, _, _ in buckets}:
+        dashboard_cache.invalidate("zm", zm_id)
@@ -5,9 +5,26 @@ from unittest.mock import patch
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
-from zonal_manager.models import ZonalManager, ZMDailyTarget
+from datetime import date
+from io import StringIO
+from django.db.models import F
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, transaction
+
+import tablib
+import tempfile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from zonal_manager import bulk, rollups, search
+from zonal_manager.resources import ZMDailyTargetResource
+from zonal_manager.models import ACHIEVE_FIELDS, TARGET_FIELDS, ZonalManager, ZMDailyTarget, ZMTargetRollup
 from activity.models import Task, TaskNote
-from master.models import TaskCategory
+from partner.models import SDCollection
+from master.models import MasterJob, TaskCategory
 
 User = get_user_model()
 
@@ -16,9 +33,9 @@ class ZonalManagerViewsTests(TestCase):
     def setUp(self):
         self.client = Client()
         # Users
-        self.zm_user = User.objects.create_user(username="zm1", password="pass", role="Zone Manager")
-        self.asm_user = User.objects.create_user(username="asm1", password="pass", role="Area Sales Manager")
-        self.other_asm = User.objects.create_user(username="asm2", password="pass", role="Area Sales Manager")
+        self.zm_user = User.objects.create_user(username="zm1", password="pass", role="Zone Manager", email="zm1@example.com")
+        self.asm_user = User.objects.create_user(username="asm1", password="pass", role="Area Sales Manager", email="asm1@example.com")
+        self.other_asm = User.objects.create_user(username="asm2", password="pass", role="Area Sales Manager", email="asm2@example.com")
 
         # ZM and relations
         self.zm = ZonalManager.objects.create(user=self.zm_user)
@@ -83,7 +100,8 @@ class ZonalManagerViewsTests(TestCase):
         metrics = response.context['metrics']
         self.assertEqual(len(metrics), 8)
         for m in metrics:
-            self.assertIn('percent', m)
+            self.assertIn('zm_percent', m)
+            self.assertIn('asm_percent', m)
 
     # 3. daily_target_edit rejects negative values and accepts valid updates
     def test_daily_target_edit_validation(self):
@@ -146,7 +164,7 @@ class ZonalManagerViewsTests(TestCase):
     # 5. Task assignment validates ASM ownership and creates task
     def test_assign_task_to_asm_validation_and_create(self):
         self.login_zm()
-        url = reverse('assign_task_to_asm')
+        url = reverse('zm_assign_task')
 
         # Unauthorized role
         self.zm_user.role = 'Area Sales Manager'
@@ -241,3 +259,573 @@ class ZonalManagerViewsTests(TestCase):
         self.assertEqual(resp.status_code, 302)
         task.refresh_from_db()
         self.assertEqual(task.status, 'completed')
+
+
+class DailyTargetListTests(TestCase):
+    """daily_target totals come from the database and the list is keyset-paginated."""
+
+    def setUp(self):
+        self.zm_user = User.objects.create_user(username="zm9", password="pass", role="Zone Manager", email="zm9@example.com")
+        self.asm_user = User.objects.create_user(username="asm9", password="pass", role="Area Sales Manager", email="asm9@example.com")
+        # Second ASM so two rows can share a date (one target per ASM and day)
+        self.asm_b = User.objects.create_user(username="asm9b", password="pass", role="Area Sales Manager", email="asm9b@example.com")
+        self.zm = ZonalManager.objects.create(user=self.zm_user)
+        self.zm.asms.add(self.asm_user, self.asm_b)
+        start = timezone.now().date()
+        for i in range(7):
+            ZMDailyTarget.objects.create(
+                zonal_manager=self.zm, asm=self.asm_b if i % 2 else self.asm_user, date=start - timezone.timedelta(days=i // 2),
+                application_target=10 + i, calls_target=3, sd_collection_target=0 if i == 3 else 7,
+                application_achieve=i, calls_achieve=1.5, sd_collection_achieve=2,
+            )
+        # Zero target row → percent 0
+        ZMDailyTarget.objects.filter(application_target=13).update(application_target=0, calls_target=0)
+        self.client.login(username="zm9", password="pass")
+
+    def _legacy(self):
+        rows, total_target, total_achieve = [], 0, 0
+        for t in ZMDailyTarget.objects.filter(zonal_manager=self.zm).order_by("-date", "-id"):
+            t_target = sum(getattr(t, f"{m}_target") for m in ("application", "pop", "esign", "new_taluk",
+                           "new_live_partners", "activations", "calls", "sd_collection"))
+            t_achieve = sum(getattr(t, f"{m}_achieve") for m in ("application", "pop", "esign", "new_taluk",
+                            "new_live_partners", "activations", "calls", "sd_collection"))
+            rows.append((t.id, t_target, t_achieve, round(t_achieve / t_target * 100, 1) if t_target > 0 else 0))
+            total_target += t_target
+            total_achieve += t_achieve
+        return rows, total_target, total_achieve
+
+    def test_totals_and_percents_match_the_python_loop(self):
+        with patch("zonal_manager.views.DAILY_TARGETS_PER_PAGE", 3):
+            response = self.client.get(reverse("daily_target"))
+            pages = [response.context["targets"]]
+            while response.context["page"].has_next:
+                response = self.client.get(reverse("daily_target"), {"after": response.context["page"].next_cursor})
+                pages.append(response.context["targets"])
+
+        rows, total_target, total_achieve = self._legacy()
+        self.assertEqual([len(p) for p in pages], [3, 3, 1])
+        self.assertEqual(
+            [(t["id"], t["total_target"], t["total_achieve"], t["percent"]) for p in pages for t in p], rows
+        )
+        self.assertEqual(response.context["total_target"], total_target)
+        self.assertEqual(response.context["total_achieve"], total_achieve)
+        self.assertEqual(response.context["record_count"], 7)
+
+    def test_previous_page_and_filters(self):
+        with patch("zonal_manager.views.DAILY_TARGETS_PER_PAGE", 3):
+            first = self.client.get(reverse("daily_target"), {"search": "asm9"})
+            second = self.client.get(reverse("daily_target"), {"search": "asm9", "after": first.context["page"].next_cursor})
+            back = self.client.get(reverse("daily_target"), {"search": "asm9", "before": second.context["page"].prev_cursor})
+        self.assertEqual([t["id"] for t in back.context["targets"]], [t["id"] for t in first.context["targets"]])
+        self.assertFalse(back.context["page"].has_previous)
+        self.assertIn("search=asm9", second.context["page_query"])
+        self.assertNotIn("after", second.context["page_query"])
+
+    def test_tampered_cursor_serves_the_first_page(self):
+        from zonal_manager.pagination import encode_cursor
+
+        first = self.client.get(reverse("daily_target"))
+        for values in (["not-a-date", "1"], ["2025-03-01", "x"], ["x", "not-a-date", "1"]):
+            for direction in ("after", "before"):
+                response = self.client.get(reverse("daily_target"), {direction: encode_cursor(values)})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual([t["id"] for t in response.context["targets"]], [t["id"] for t in first.context["targets"]])
+        response = self.client.get(reverse("sd_collection_list_zm"), {"after": encode_cursor(["x", "y"])})
+        self.assertEqual(response.status_code, 200)
+
+
+class TargetRollupTests(TestCase):
+    def setUp(self):
+        self.asm = User.objects.create_user(username="asm7", password="pass", role="Area Sales Manager", email="asm7@example.com")
+        self.other = User.objects.create_user(username="asm8", password="pass", role="Area Sales Manager", email="asm8@example.com")
+        self.zm = ZonalManager.objects.create()
+
+    def _rollup(self, period, start, asm=None):
+        return ZMTargetRollup.objects.get(zonal_manager=self.zm, asm=asm or self.asm, period=period, period_start=start)
+
+    def test_buckets_follow_saves_moves_and_deletes(self):
+        # Sun 2025-03-30, Mon 2025-03-31 and Tue 2025-04-01 → two ISO weeks, two months
+        for day, value in [(date(2025, 3, 30), 1), (date(2025, 3, 31), 2), (date(2025, 4, 1), 4)]:
+            ZMDailyTarget.objects.create(zonal_manager=self.zm, asm=self.asm, date=day, calls_target=value, calls_achieve=value / 2)
+
+        week = self._rollup("week", date(2025, 3, 31))
+        self.assertEqual((week.rows, week.calls_target, week.calls_achieve), (2, 6, 3))
+        self.assertEqual(self._rollup("month", date(2025, 3, 1)).calls_target, 3)
+        self.assertEqual(self._rollup("day", date(2025, 4, 1)).calls_target, 4)
+
+        target = ZMDailyTarget.objects.get(date=date(2025, 3, 31))
+        target.asm = self.other
+        target.calls_target = 10
+        target.save()
+        self.assertEqual(self._rollup("week", date(2025, 3, 31)).calls_target, 4)
+        self.assertEqual(self._rollup("week", date(2025, 3, 31), asm=self.other).calls_target, 10)
+
+        target.delete()
+        self.assertFalse(ZMTargetRollup.objects.filter(asm=self.other).exists())
+        self.assertEqual(rollups.check(), [])
+
+    def test_bucket_without_asm_stays_single(self):
+        for day in (date(2025, 3, 3), date(2025, 3, 4)):
+            ZMDailyTarget.objects.create(zonal_manager=self.zm, date=day, calls_target=2)
+        week = ZMTargetRollup.objects.get(zonal_manager=self.zm, asm=None, period="week")
+        self.assertEqual((week.rows, week.calls_target), (2, 4))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ZMTargetRollup.objects.create(zonal_manager=self.zm, period="week", period_start=week.period_start)
+        self.assertEqual(rollups.check(), [])
+
+    def test_rebuild_and_check_command(self):
+        ZMDailyTarget.objects.create(zonal_manager=self.zm, asm=self.asm, date=date(2025, 1, 6), pop_target=3)
+        ZMDailyTarget.objects.filter(pop_target=3).update(pop_target=5)  # bypasses the signals
+        with self.assertRaises(CommandError):
+            call_command("rebuild_target_rollups", check=True, stdout=StringIO())
+
+        call_command("rebuild_target_rollups", stdout=StringIO())
+        self.assertEqual(rollups.check(), [])
+        self.assertEqual(self._rollup("month", date(2025, 1, 1)).pop_target, 5)
+        self.assertEqual(ZMTargetRollup.objects.count(), 3)
+
+
+class StoredTotalsTests(TestCase):
+    def setUp(self):
+        self.zm_user = User.objects.create_user(username="zm5", password="pass", role="Zone Manager", email="zm5@example.com")
+        self.asm = User.objects.create_user(username="asm5", password="pass", role="Area Sales Manager", email="asm5@example.com")
+        self.zm = ZonalManager.objects.create(user=self.zm_user)
+        self.zm.asms.add(self.asm)
+
+    def _target(self, day, target, achieve):
+        return ZMDailyTarget.objects.create(
+            zonal_manager=self.zm, asm=self.asm, date=day, calls_target=target, calls_achieve=achieve,
+        )
+
+    def test_totals_follow_save_update_and_bulk_paths(self):
+        target = self._target(date(2025, 2, 3), 10, 4)
+        self.assertEqual((target.total_target, target.total_achieve, target.achievement_percent), (10, 4, 40))
+
+        target.pop_target = Decimal("10")  # the edit views assign Decimals
+        target.save(update_fields=["pop_target"])
+        target.refresh_from_db()
+        self.assertEqual((target.total_target, target.achievement_percent), (20, 20))
+
+        ZMDailyTarget.objects.filter(pk=target.pk).update(calls_achieve=F("calls_achieve") + 6)
+        target.refresh_from_db()
+        self.assertEqual((target.total_achieve, target.achievement_percent), (10, 50))
+
+        target.calls_target = 0
+        target.pop_target = 0
+        ZMDailyTarget.objects.bulk_update([target], ["calls_target", "pop_target"])
+        target.refresh_from_db()
+        self.assertEqual((target.total_target, target.achievement_percent), (0, 0))
+
+        ZMDailyTarget.objects.bulk_create([ZMDailyTarget(asm=self.asm, date=date(2025, 2, 4), esign_target=4, esign_achieve=5)])
+        self.assertEqual(ZMDailyTarget.objects.get(date=date(2025, 2, 4)).achievement_percent, 125)
+
+    def test_update_with_every_metric_as_a_literal(self):
+        target = self._target(date(2025, 2, 3), 10, 4)
+        ZMDailyTarget.objects.filter(pk=target.pk).update(**{name: 0 for name in TARGET_FIELDS + ACHIEVE_FIELDS})
+        target.refresh_from_db()
+        self.assertEqual((target.total_target, target.total_achieve, target.achievement_percent), (0, 0, 0))
+
+        ZMDailyTarget.objects.filter(pk=target.pk).update(
+            **{name: 1 for name in TARGET_FIELDS}, **{name: Decimal("0.5") for name in ACHIEVE_FIELDS}
+        )
+        target.refresh_from_db()
+        self.assertEqual((target.total_target, target.total_achieve, target.achievement_percent), (8, 4, 50))
+
+    def test_lists_filter_and_sort_on_achievement(self):
+        low = self._target(date(2025, 2, 3), 10, 2)
+        high = self._target(date(2025, 2, 4), 10, 9)
+        self._target(date(2025, 2, 5), 10, 12)
+
+        self.client.login(username="zm5", password="pass")
+        response = self.client.get(reverse("daily_target"), {"max_percent": "100", "sort": "percent_low"})
+        self.assertEqual([t["id"] for t in response.context["targets"]], [low.pk, high.pk])
+        self.assertEqual(response.context["total_target"], 20)
+
+        self.client.login(username="asm5", password="pass")
+        response = self.client.get(reverse("asm_daily_target"), {"min_percent": "50", "sort": "percent_high"})
+        self.assertEqual([t.zm_vs_achieve_percent for t in response.context["targets"]], [120.0, 90.0])
+
+    def test_admin_sorts_and_filters_by_band(self):
+        self._target(date(2025, 2, 3), 10, 2)
+        self._target(date(2025, 2, 4), 10, 7)
+        admin_user = User.objects.create_superuser(username="root5", password="pass", email="root5@example.com")
+        self.client.force_login(admin_user)
+        url = reverse("admin:zonal_manager_zmdailytarget_changelist")
+        response = self.client.get(url, {"achievement": "under_50"})
+        self.assertEqual(response.context["cl"].result_count, 1)
+        response = self.client.get(url, {"o": "-6"})
+        self.assertEqual([t.achievement_percent for t in response.context["cl"].result_list], [70, 20])
+
+    def test_admin_footer_totals_the_filtered_rows(self):
+        self._target(date(2025, 2, 3), 10, 2)
+        self._target(date(2025, 2, 4), 10, 7)
+        self.client.force_login(User.objects.create_superuser(username="root5", password="pass", email="root5@example.com"))
+        url = reverse("admin:zonal_manager_zmdailytarget_changelist")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        totals = response.context["totals"]
+        self.assertEqual((totals["records"], totals["total_target"], totals["total_achieve"]), (2, 20, 9))
+        self.assertEqual(totals["achievement_percent"], 45)
+        self.assertContains(response, "Totals for 2 records")
+
+        response = self.client.get(url, {"achievement": "50_99"})
+        self.assertEqual((response.context["totals"]["records"], response.context["totals"]["total_achieve"]), (1, 7))
+
+        # Names come from the joined rows, the footer from one aggregate
+        for day in range(5, 25):
+            self._target(date(2025, 2, day), 10, day)
+        with CaptureQueriesContext(connection) as more:
+            self.client.get(url)
+        self.assertEqual(len(more), len(queries))
+
+
+class BulkTargetAssignmentTests(TestCase):
+    def setUp(self):
+        self.zm_user = User.objects.create_user(username="zm4", password="pass", role="Zone Manager", email="zm4@example.com")
+        self.asms = [
+            User.objects.create_user(username=f"asm4{i}", password="pass", role="Area Sales Manager", email=f"asm4{i}@example.com")
+            for i in range(3)
+        ]
+        self.zm = ZonalManager.objects.create(user=self.zm_user)
+        self.zm.asms.add(*self.asms)
+        self.client.force_login(self.zm_user)
+
+    def test_assigns_range_and_reports_conflicts(self):
+        ZMDailyTarget.objects.create(zonal_manager=self.zm, asm=self.asms[1], date=date(2025, 5, 2), calls_target=99)
+        response = self.client.post(reverse("daily_target_bulk"), {
+            "asms": [a.pk for a in self.asms],
+            "start_date": "2025-05-01", "end_date": "2025-05-10",
+            "calls_target": "5", "pop_target": "2",
+        })
+        result = response.context["result"]
+        self.assertEqual(result.created, 29)
+        self.assertEqual(result.conflicts, [(self.asms[1], date(2025, 5, 2))])
+        # The existing row is left alone; the new ones carry totals and rollups
+        self.assertEqual(ZMDailyTarget.objects.get(asm=self.asms[1], date=date(2025, 5, 2)).calls_target, 99)
+        self.assertEqual(ZMDailyTarget.objects.filter(total_target=7).count(), 29)
+        self.assertEqual(rollups.check(), [])
+
+    def test_copy_from_previous_period(self):
+        for offset, value in enumerate([1, 2, 3]):
+            ZMDailyTarget.objects.create(zonal_manager=self.zm, asm=self.asms[0], date=date(2025, 4, 1 + offset), esign_target=value)
+        response = self.client.post(reverse("daily_target_bulk"), {
+            "asms": [self.asms[0].pk, self.asms[2].pk],
+            "start_date": "2025-05-01", "end_date": "2025-05-03", "copy_from": "2025-04-01",
+        })
+        self.assertEqual(
+            list(ZMDailyTarget.objects.filter(date__month=5).values_list("date__day", "esign_target")),
+            [(1, 1), (2, 2), (3, 3)],
+        )
+        self.assertEqual(len(response.context["result"].missing_source), 3)
+
+    def test_rejects_invalid_ranges_and_duplicates(self):
+        response = self.client.post(reverse("daily_target_bulk"), {
+            "asms": [self.asms[0].pk], "start_date": "2025-05-01", "end_date": "2025-09-01",
+        })
+        self.assertIn("end_date", response.context["form"].errors)
+        self.assertFalse(ZMDailyTarget.objects.exists())
+
+        bulk.assign_targets(self.zm, self.asms[:1], date(2025, 5, 1), date(2025, 5, 1), values={"calls_target": 1})
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ZMDailyTarget.objects.create(zonal_manager=self.zm, asm=self.asms[0], date=date(2025, 5, 1))
+
+
+    def test_single_add_that_loses_a_race_shows_the_form_error(self):
+        from zonal_manager.views import ZMDailyTargetForm
+
+        validate = ZMDailyTargetForm.is_valid
+
+        def another_request_wins(form):
+            valid = validate(form)
+            ZMDailyTarget.objects.create(zonal_manager=self.zm, asm=self.asms[0], date=date(2025, 5, 1))
+            return valid
+
+        payload = {"asm": self.asms[0].pk, "date": "2025-05-01", **{name: "1" for name in TARGET_FIELDS}}
+        with patch.object(ZMDailyTargetForm, "is_valid", another_request_wins), \
+                patch("zonal_manager.views.ZMDailyTarget.objects.filter") as pre_check:
+            pre_check.return_value.exists.return_value = False
+            response = self.client.post(reverse("daily_target_add"), payload)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("already exists", response.context["form"].errors["asm"][0])
+        self.assertEqual(ZMDailyTarget.objects.count(), 1)
+
+class TargetImportTests(TestCase):
+    HEADERS = ["zonal_manager", "asm", "date", "calls_target", "calls_achieve"]
+
+    def setUp(self):
+        self.zm_user = User.objects.create_user(username="zm3", password="pass", role="Zone Manager", email="zm3@example.com")
+        self.zm = ZonalManager.objects.create(user=self.zm_user)
+        self.asms = [
+            User.objects.create_user(username=f"asm3{i}", password="pass", role="Area Sales Manager", email=f"asm3{i}@example.com")
+            for i in range(4)
+        ]
+        self.existing = ZMDailyTarget.objects.create(zonal_manager=self.zm, asm=self.asms[0], date=date(2025, 6, 1), calls_target=5)
+
+    def _dataset(self, rows):
+        return tablib.Dataset(*rows, headers=self.HEADERS)
+
+    def _rows(self, days):
+        return [("zm3", asm.username, f"2025-06-{day:02d}", 10, 4) for asm in self.asms for day in range(1, days + 1)]
+
+    def test_imports_new_and_changed_rows_in_bulk(self):
+        result = ZMDailyTargetResource().import_data(self._dataset(self._rows(3)))
+        self.assertFalse(result.has_errors() or result.has_validation_errors())
+        self.assertEqual((result.totals["new"], result.totals["update"]), (11, 1))
+
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.calls_target, self.existing.achievement_percent), (10, 40))
+        self.assertEqual(ZMDailyTarget.objects.filter(zonal_manager=self.zm, total_target=10).count(), 12)
+        self.assertEqual(rollups.check(), [])
+
+    def test_dry_run_query_count_does_not_grow_with_rows(self):
+        def dry_run_queries(days):
+            with CaptureQueriesContext(connection) as queries:
+                result = ZMDailyTargetResource().import_data(self._dataset(self._rows(days)), dry_run=True)
+            self.assertEqual(len(result.rows), 4 * days)
+            # SQLite splits big INSERTs by its variable limit, so count the lookups
+            return sum(query["sql"].startswith("SELECT") for query in queries.captured_queries)
+
+        # ZM map, ASM map, existing targets
+        self.assertEqual(dry_run_queries(2), 3)
+        self.assertEqual(dry_run_queries(20), 3)
+        self.assertEqual(ZMDailyTarget.objects.count(), 1)
+
+    def test_reports_unknown_users_and_duplicates(self):
+        rows = [
+            ("zm3", "nobody", "2025-06-02", 1, 1),
+            ("zm3", "asm31", "2025-06-02", 1, 1),
+            ("zm3", "asm31", "2025-06-02", 2, 1),
+        ]
+        result = ZMDailyTargetResource().import_data(self._dataset(rows), dry_run=True)
+        self.assertEqual([number for number, _ in result.row_errors()] + [row.number for row in result.invalid_rows], [1, 3])
+
+    def test_export_round_trip_is_unchanged(self):
+        exported = ZMDailyTargetResource().export()
+        self.assertEqual(exported.dict[0]["asm"], "asm30")
+        result = ZMDailyTargetResource().import_data(exported, dry_run=True)
+        self.assertEqual(result.totals["skip"], 1)
+
+    def test_admin_offers_import_and_export(self):
+        admin_user = User.objects.create_superuser(username="root3", password="pass", email="root3@example.com")
+        self.client.force_login(admin_user)
+        self.assertEqual(self.client.get(reverse("admin:zonal_manager_zmdailytarget_import")).status_code, 200)
+        self.assertEqual(self.client.get(reverse("admin:zonal_manager_zmdailytarget_export")).status_code, 200)
+
+    def test_rows_without_a_zonal_manager_are_rejected(self):
+        blank = ZMDailyTargetResource().import_data(self._dataset([("", "asm31", "2025-06-02", 1, 1)]))
+        headers = [name for name in self.HEADERS if name != "zonal_manager"]
+        missing = ZMDailyTargetResource().import_data(tablib.Dataset(("asm32", "2025-06-02", 1, 1), headers=headers))
+        for result in (blank, missing):
+            self.assertEqual([row.number for row in result.invalid_rows], [1])
+            self.assertIn("zonal_manager", result.invalid_rows[0].field_specific_errors)
+        self.assertEqual(ZMDailyTarget.objects.count(), 1)
+
+    @override_settings(MEDIA_ROOT=tempfile.mkdtemp(), MASTER_JOB_BACKEND="sync")
+    def test_background_import_runs_as_a_master_job(self):
+        admin_user = User.objects.create_superuser(username="root4", password="pass", email="root4@example.com")
+        self.client.force_login(admin_user)
+        url = reverse("admin:zonal_manager_zmdailytarget_import_background")
+        self.assertContains(self.client.get(reverse("admin:zonal_manager_zmdailytarget_changelist")), url)
+
+        upload = SimpleUploadedFile("targets.csv", self._dataset(self._rows(2)).export("csv").encode())
+        response = self.client.post(url, {"import_file": upload})
+        job = MasterJob.objects.get()
+        self.assertRedirects(response, reverse("admin:master_job_status", args=[job.pk]))
+        self.assertEqual((job.kind, job.status), ("import_targets", "completed"))
+        self.assertEqual((job.result["new"], job.result["updated"], job.processed_rows), (7, 1, 8))
+        self.assertEqual(rollups.check(), [])
+
+        # One bad row and nothing is written
+        rows = self._rows(3) + [("", "asm30", "2025-06-09", 1, 1)]
+        upload = SimpleUploadedFile("targets.csv", self._dataset(rows).export("csv").encode())
+        self.client.post(url, {"import_file": upload})
+        progress = self.client.get(reverse("admin:master_job_progress", args=[MasterJob.objects.first().pk])).json()
+        self.assertIn("Rolled Back", progress["summary"])
+        self.assertEqual(progress["details"], ["Line 13: A zonal manager username is required."])
+        self.assertEqual(ZMDailyTarget.objects.count(), 8)
+
+
+class TargetSearchTests(TestCase):
+    TODAY = date(2025, 3, 20)
+
+    def test_parser_turns_terms_into_ranges_and_exact_matches(self):
+        cases = {
+            "2025-03-05": (date(2025, 3, 5), date(2025, 3, 5), []),
+            "05/03/2025": (date(2025, 3, 5), date(2025, 3, 5), []),
+            "01-03-2025 to 15-03-2025 ravi": (date(2025, 3, 1), date(2025, 3, 15), ["ravi"]),
+            "2025-01..2025-02": (date(2025, 1, 1), date(2025, 2, 28), []),
+            "March 2024": (date(2024, 3, 1), date(2024, 3, 31), []),
+            "dec kumar": (date(2024, 12, 1), date(2024, 12, 31), ["kumar"]),  # latest December
+            "2024": (date(2024, 1, 1), date(2024, 12, 31), []),
+            "ravi kumar": (None, None, ["ravi", "kumar"]),
+            "ravi to 2025-03-05": (date(2025, 3, 5), date(2025, 3, 5), ["ravi"]),  # not a range: "to" is dropped
+            "2025-13-01..kumar": (None, None, ["2025-13-01", "kumar"]),
+        }
+        for query, (start, end, text) in cases.items():
+            parsed = search.parse(query, today=self.TODAY)
+            self.assertEqual((parsed.date_from, parsed.date_to, parsed.text), (start, end, text), query)
+
+        parsed = search.parse("asm:ravi9 Ravi@Example.com", today=self.TODAY)
+        self.assertEqual((parsed.usernames, parsed.emails, parsed.text), (["ravi9"], ["Ravi@Example.com"], []))
+
+    def test_daily_target_list_uses_the_parsed_predicates(self):
+        zm_user = User.objects.create_user(username="zm6", password="pass", role="Zone Manager", email="zm6@example.com")
+        ravi = User.objects.create_user(username="ravi6", password="pass", role="Area Sales Manager",
+                                        email="ravi6@example.com", first_name="Ravi", last_name="Kumar")
+        anu = User.objects.create_user(username="anu6", password="pass", role="Area Sales Manager", email="anu6@example.com")
+        zm = ZonalManager.objects.create(user=zm_user)
+        for asm in (ravi, anu):
+            for day in (date(2025, 2, 27), date(2025, 3, 3)):
+                ZMDailyTarget.objects.create(zonal_manager=zm, asm=asm, date=day, calls_target=1)
+        self.client.force_login(zm_user)
+
+        def found(query):
+            response = self.client.get(reverse("daily_target"), {"search": query})
+            return sorted((t["asm"].username, t["date"].day) for t in response.context["targets"])
+
+        self.assertEqual(found("kumar march 2025"), [("ravi6", 3)])
+        self.assertEqual(found("asm:anu6"), [("anu6", 3), ("anu6", 27)])
+        self.assertEqual(found("RAVI6@example.com 27-02-2025"), [("ravi6", 27)])
+        self.assertEqual(found("2025-02-27..2025-03-03 nobody"), [])
+
+
+class SDCollectionListTests(TestCase):
+    """zm_sd_collections_view: one summary aggregate and a keyset-paginated page."""
+
+    def setUp(self):
+        self.zm_user = User.objects.create_user(username="zm10", password="pass", role="Zone Manager", email="zm10@example.com")
+        self.asm_user = User.objects.create_user(username="asm10", role="Area Sales Manager", email="asm10@example.com")
+        self.partner = User.objects.create_user(username="partner10", role="Partner", email="partner10@example.com")
+        other_asm = User.objects.create_user(username="asm11", role="Area Sales Manager", email="asm11@example.com")
+        self.zm = ZonalManager.objects.create(user=self.zm_user)
+        self.zm.asms.add(self.asm_user)
+        start = date(2025, 3, 1)
+        for i in range(7):
+            SDCollection.objects.create(
+                zone_manager=self.zm if i % 2 else None, asm=self.asm_user, partner=self.partner,
+                date=start + timezone.timedelta(days=i // 2), amount=Decimal(10 + i),
+                status="completed" if i % 3 == 0 else "pending",
+            )
+        SDCollection.objects.create(asm=other_asm, partner=self.partner, date=start, amount=999)  # another zone
+        self.client.login(username="zm10", password="pass")
+
+    def _pages(self, params=None):
+        response = self.client.get(reverse("sd_collection_list_zm"), params or {})
+        pages = [response]
+        while response.context["page"].has_next:
+            response = self.client.get(
+                reverse("sd_collection_list_zm"), {**(params or {}), "after": response.context["page"].next_cursor}
+            )
+            pages.append(response)
+        return pages
+
+    def test_summary_matches_the_rows(self):
+        context = self.client.get(reverse("sd_collection_list_zm")).context
+        self.assertEqual((context["total_amount"], context["total_count"]), (Decimal(91), 7))
+        self.assertEqual((context["completed_amount"], context["completed_count"]), (Decimal(10 + 13 + 16), 3))
+        self.assertEqual((context["pending_amount"], context["pending_count"]), (Decimal(91 - 39), 4))
+
+        context = self.client.get(reverse("sd_collection_list_zm"), {"status": "completed"}).context
+        self.assertEqual((context["total_amount"], context["pending_amount"], context["pending_count"]), (Decimal(39), 0, 0))
+
+    def test_soft_deleted_rows_are_left_out_like_the_hierarchy_totals(self):
+        from zonal_manager.admin import hierarchy_overview
+
+        deleted = SDCollection.objects.create(zone_manager=self.zm, asm=self.asm_user, partner=self.partner,
+                                              date=date(2025, 3, 9), amount=500, is_deleted=True)
+        context = self.client.get(reverse("sd_collection_list_zm")).context
+        self.assertNotIn(deleted.pk, [c.pk for c in context["collections"]])
+        node = hierarchy_overview().get(pk=self.zm.pk)
+        self.assertEqual((context["total_amount"], context["total_count"]), (node.sd_amount, node.sd_count))
+
+    def test_pages_walk_every_row_newest_first(self):
+        with patch("zonal_manager.views.SD_COLLECTIONS_PER_PAGE", 3):
+            pages = self._pages()
+            rows = [c.id for response in pages for c in response.context["collections"]]
+            self.assertEqual(
+                rows,
+                list(SDCollection.objects.filter(asm=self.asm_user).order_by("-date", "-id").values_list("id", flat=True)),
+            )
+            self.assertEqual(len(pages), 3)
+
+            back = self.client.get(reverse("sd_collection_list_zm"), {"before": pages[1].context["page"].prev_cursor})
+            self.assertEqual(
+                [c.id for c in back.context["collections"]], [c.id for c in pages[0].context["collections"]]
+            )
+
+    def test_query_count_does_not_grow_with_the_page(self):
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(reverse("sd_collection_list_zm"))
+        for i in range(20):
+            SDCollection.objects.create(zone_manager=self.zm, asm=self.asm_user, partner=self.partner, amount=i)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(reverse("sd_collection_list_zm"))
+        self.assertEqual(len(response.context["collections"]), 27)
+        self.assertEqual(len(large), len(small))
+
+
+class ZonalManagerAdminTests(TestCase):
+    """Changelist counts as annotations, and the hierarchy overview in one query."""
+
+    def setUp(self):
+        from asm.models import ASM
+
+        self.admin = User.objects.create_superuser(username="root", password="pass", email="root@example.com")
+        self.zms = []
+        for z in range(3):
+            zm = ZonalManager.objects.create(
+                user=User.objects.create_user(username=f"zm2{z}", role="Zone Manager", email=f"zm2{z}@example.com")
+            )
+            for a in range(z + 1):
+                asm_user = User.objects.create_user(
+                    username=f"asm2{z}{a}", role="Area Sales Manager", email=f"asm2{z}{a}@example.com"
+                )
+                zm.asms.add(asm_user)
+                partner = User.objects.create_user(
+                    username=f"p2{z}{a}", role="Partner", email=f"p2{z}{a}@example.com"
+                )
+                ASM.objects.create(user=asm_user).partners.add(partner)
+                SDCollection.objects.create(asm=asm_user, partner=partner, amount=100, status="completed")
+                SDCollection.objects.create(asm=asm_user, partner=partner, amount=5)
+            self.zms.append(zm)
+        SDCollection.objects.create(zone_manager=self.zms[0], amount=7)
+        SDCollection.objects.create(zone_manager=self.zms[0], amount=1000, is_deleted=True)
+        self.client.force_login(self.admin)
+
+    def test_changelist_counts_are_annotated_and_sortable(self):
+        url = reverse("admin:zonal_manager_zonalmanager_changelist")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"o": "-2"})
+        self.assertEqual([zm.asms_total for zm in response.context["cl"].result_list], [3, 2, 1])
+
+        ZonalManager.objects.create(
+            user=User.objects.create_user(username="zm29", role="Zone Manager", email="zm29@example.com")
+        )
+        with CaptureQueriesContext(connection) as more:
+            self.client.get(url, {"o": "-2"})
+        self.assertEqual(len(more), len(queries))
+
+    def test_hierarchy_overview(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("admin:zonal_manager_hierarchy"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len([q for q in queries if "zonal_manager_zonalmanager" in q["sql"]]), 1)
+
+        rows = {zm.user.username: zm for zm in response.context["zms"]}
+        first, last = rows["zm20"], rows["zm22"]
+        self.assertEqual((first.asms_total, first.partners_total, first.sd_count), (1, 1, 3))
+        self.assertEqual((first.sd_amount, first.sd_pending_amount, first.sd_completed_amount), (112, 12, 100))
+        self.assertEqual((last.asms_total, last.partners_total, last.sd_count, last.sd_amount), (3, 3, 6, 315))
+        self.assertEqual(response.context["totals"]["sd_amount"], 112 + 210 + 315)
+
+    def test_hierarchy_overview_needs_view_permission(self):
+        from django.contrib.auth.models import Permission
+
+        staff = User.objects.create_user(username="staff2", password="pass", email="staff2@example.com", is_staff=True)
+        self.client.force_login(staff)
+        url = reverse("admin:zonal_manager_hierarchy")
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        staff.user_permissions.add(Permission.objects.get(codename="view_zonalmanager"))
+        self.assertEqual(self.client.get(url).status_code, 200)
@@ -7,6 +7,7 @@ urlpatterns = [
     path('daily_target/<int:pk>/', views.daily_target_detail, name='daily_target_detail'),
     path("daily_target/<int:pk>/edit/", views.daily_target_edit, name="daily_target_edit"),
 path("daily_target/add/", views.daily_target_add, name="daily_target_add"),
+path("daily_target/bulk/", views.daily_target_bulk_add, name="daily_target_bulk"),
       path("assign_task/", views.assign_task_to_asm, name="zm_assign_task"),
       path("tasks/", views.zm_task_list, name="zm_task_list"),
     path("tasks/<int:task_id>/", views.zm_task_detail, name="zm_task_detail"),
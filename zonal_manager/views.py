@@ -1,8 +1,9 @@
 from datetime import datetime
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
+from django.db import IntegrityError, transaction
 from django.db.models import Q
-from .models import ZonalManager, ZMDailyTarget
+from .models import ZonalManager, ZMDailyTarget, TARGET_FIELDS
 from django.contrib import messages
 from django import forms
 from account.models import CustomUser as User
@@ -20,11 +21,51 @@ from django.db.models import Sum
 
 from partner.models import SDCollection
 from partner.forms import SDCollectionForm
+from partner import ledger
+from account import closure, hierarchy
 from asm.models import ASM
 
 from partner.models import SDCollection
 from zonal_manager.models import ZonalManager
 from django.http import JsonResponse
+from .pagination import keyset_paginate
+from . import bulk, search
+
+DAILY_TARGETS_PER_PAGE = 50
+SD_COLLECTIONS_PER_PAGE = 50
+
+# ↕️ Sort options of the daily target lists (stored, indexed total/percent columns)
+TARGET_SORTS = {
+    "newest": ("-date", "-id"),
+    "oldest": ("date", "id"),
+    "percent_low": ("achievement_percent", "-date", "-id"),
+    "percent_high": ("-achievement_percent", "-date", "-id"),
+    "target_high": ("-total_target", "-date", "-id"),
+}
+TARGET_SORT_LABELS = [
+    ("newest", "Newest first"),
+    ("oldest", "Oldest first"),
+    ("percent_low", "Lowest achievement %"),
+    ("percent_high", "Highest achievement %"),
+    ("target_high", "Highest target"),
+]
+
+
+def filter_by_achievement(targets, params):
+    """Apply ?sort=, ?min_percent= and ?max_percent= → (queryset, ordering, sort, min, max)."""
+    sort = params.get("sort", "newest")
+    if sort not in TARGET_SORTS:
+        sort = "newest"
+    bounds = []
+    for name, lookup in (("min_percent", "gte"), ("max_percent", "lt")):
+        try:
+            value = float(params.get(name, ""))
+        except ValueError:
+            value = None
+        if value is not None:
+            targets = targets.filter(**{f"achievement_percent__{lookup}": value})
+        bounds.append(params.get(name, "") if value is not None else "")
+    return targets, TARGET_SORTS[sort], sort, bounds[0], bounds[1]
 
 User = get_user_model()
 @login_required
@@ -63,58 +104,41 @@ def daily_target(request):
             pass
 
     if search_query:
-        targets = targets.filter(
-            Q(asm__first_name__icontains=search_query)
-            | Q(asm__last_name__icontains=search_query)
-            | Q(asm__username__icontains=search_query)
-            | Q(asm__email__icontains=search_query)
-            | Q(date__icontains=search_query)
-        )
+        # Dates, months, usernames and emails become indexable predicates
+        targets = search.apply(targets, search_query)
 
-    targets = targets.order_by("-date")
-
-    # --- Prepare summarized data ---
-    target_data = []
-    total_target = total_achieve = 0
-
-    for t in targets:
-        t_target = (
-            t.application_target
-            + t.pop_target
-            + t.esign_target
-            + t.new_taluk_target
-            + t.new_live_partners_target
-            + t.activations_target
-            + t.calls_target
-            + t.sd_collection_target
-        )
-
-        t_achieve = (
-            t.application_achieve
-            + t.pop_achieve
-            + t.esign_achieve
-            + t.new_taluk_achieve
-            + t.new_live_partners_achieve
-            + t.activations_achieve
-            + t.calls_achieve
-            + t.sd_collection_achieve
-        )
+    # --- Achievement filter + sort (e.g. ?max_percent=50&sort=percent_low) ---
+    targets, ordering, sort, min_percent, max_percent = filter_by_achievement(targets, request.GET)
 
-        percent = round((t_achieve / t_target * 100), 1) if t_target > 0 else 0
+    # --- Overall totals: one aggregate over the filtered rows ---
+    totals = targets.totals()
+    total_target, total_achieve = totals["total_target"], totals["total_achieve"]
+    overall_percent = round((total_achieve / total_target * 100), 1) if total_target > 0 else 0
 
-        target_data.append({
+    # --- One page of rows in the chosen order ---
+    page = keyset_paginate(
+        targets,
+        ordering=ordering,
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+        per_page=DAILY_TARGETS_PER_PAGE,
+    )
+    target_data = [
+        {
             "id": t.id,
             "date": t.date,
             "asm": t.asm,
-            "total_target": t_target,
-            "total_achieve": t_achieve,
-            "percent": percent,
-        })
+            "total_target": t.total_target,
+            "total_achieve": t.total_achieve,
+            "percent": round(t.achievement_percent, 1),
+        }
+        for t in page.rows
+    ]
 
-        total_target += t_target
-        total_achieve += t_achieve
-
-    overall_percent = round((total_achieve / total_target * 100), 1) if total_target > 0 else 0
+    # Filters to carry over in the page links
+    page_query = request.GET.copy()
+    for name in ("after", "before"):
+        page_query.pop(name, None)
 
     # --- Fetch ASMs under this ZM ---
     all_asms = zm.asms.all() if zm and hasattr(zm, "asms") else []
@@ -122,6 +146,9 @@ def daily_target(request):
     context = {
         "zm": zm,
         "targets": target_data,
+        "page": page,
+        "page_query": page_query.urlencode(),
+        "record_count": totals["records"],
         "total_target": total_target,
         "total_achieve": total_achieve,
         "overall_percent": overall_percent,
@@ -130,6 +157,10 @@ def daily_target(request):
         "from_date": from_date,
         "to_date": to_date,
         "search_query": search_query,
+        "sort": sort,
+        "sort_choices": TARGET_SORT_LABELS,
+        "min_percent": min_percent,
+        "max_percent": max_percent,
     }
 
     return render(request, "zonal_manager/zm_daily_target.html", context)
@@ -313,9 +344,11 @@ def daily_target_add(request):
             asm = form.cleaned_data['asm']
             date = form.cleaned_data['date']
 
+            duplicate_error = f"⚠️ Target for {asm.username} on {date} already exists."
+
             # 🚫 Prevent duplicate ASM + Date entry
             if ZMDailyTarget.objects.filter(asm=asm, date=date).exists():
-                form.add_error('asm', f"⚠️ Target for {asm.username} on {date} already exists.")
+                form.add_error('asm', duplicate_error)
             else:
                 targets = {
                     'application_target': form.cleaned_data['application_target'],
@@ -328,16 +361,20 @@ def daily_target_add(request):
                     'sd_collection_target': form.cleaned_data['sd_collection_target'],
                 }
 
-                # ✅ Create the daily target record
-                ZMDailyTarget.objects.create(
-                    zonal_manager=zonal_manager,
-                    asm=asm,
-                    date=date,
-                    **targets
-                )
-
-                messages.success(request, "✅ Daily target added successfully.")
-                return redirect('daily_target')
+                # ✅ Create the daily target record (a double submit loses on the unique constraint)
+                try:
+                    with transaction.atomic():
+                        ZMDailyTarget.objects.create(
+                            zonal_manager=zonal_manager,
+                            asm=asm,
+                            date=date,
+                            **targets
+                        )
+                except IntegrityError:
+                    form.add_error('asm', duplicate_error)
+                else:
+                    messages.success(request, "✅ Daily target added successfully.")
+                    return redirect('daily_target')
     else:
         form = ZMDailyTargetForm(initial={'date': timezone.now().date()})
         # ✅ Restrict ASM dropdown for GET as well
@@ -345,6 +382,92 @@ def daily_target_add(request):
 
     return render(request, 'zonal_manager/daily_target_add.html', {'form': form})
 
+# 📆 Bulk assignment: many ASMs × a date range
+
+BULK_INPUT_CLASS = 'border border-gray-300 rounded-lg px-3 py-2 w-full focus:ring-2 focus:ring-yellow-400'
+
+
+class ZMBulkTargetForm(forms.Form):
+    asms = forms.ModelMultipleChoiceField(
+        queryset=User.objects.none(),
+        widget=forms.CheckboxSelectMultiple,
+        label="Select ASMs"
+    )
+    start_date = forms.DateField(
+        widget=forms.DateInput(attrs={'type': 'text', 'class': 'datepicker ' + BULK_INPUT_CLASS, 'placeholder': 'From'}),
+        label="From"
+    )
+    end_date = forms.DateField(
+        widget=forms.DateInput(attrs={'type': 'text', 'class': 'datepicker ' + BULK_INPUT_CLASS, 'placeholder': 'To'}),
+        label="To"
+    )
+    copy_from = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={'type': 'text', 'class': 'datepicker ' + BULK_INPUT_CLASS, 'placeholder': 'Start of the period to copy'}),
+        label="Copy from previous period (optional)",
+        help_text="Each ASM gets the targets of the same day in the period starting here; the values below are ignored."
+    )
+
+    def __init__(self, *args, asms=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if asms is not None:
+            self.fields['asms'].queryset = asms
+        for name in TARGET_FIELDS:
+            self.fields[name] = forms.FloatField(
+                min_value=0, initial=0, required=False,
+                label=ZMDailyTarget._meta.get_field(name).verbose_name.capitalize(),
+                widget=forms.NumberInput(attrs={'class': BULK_INPUT_CLASS, 'step': 'any'}),
+            )
+
+    def clean(self):
+        cleaned = super().clean()
+        start, end, copy_from = cleaned.get('start_date'), cleaned.get('end_date'), cleaned.get('copy_from')
+        if start and end:
+            if end < start:
+                self.add_error('end_date', "⚠️ End date is before the start date.")
+            elif (end - start).days + 1 > bulk.MAX_BULK_DAYS:
+                self.add_error('end_date', f"⚠️ At most {bulk.MAX_BULK_DAYS} days at a time.")
+            elif copy_from and copy_from >= start:
+                self.add_error('copy_from', "⚠️ The source period must start before the new one.")
+        return cleaned
+
+    def target_values(self):
+        return {name: self.cleaned_data.get(name) or 0 for name in TARGET_FIELDS}
+
+
+@login_required
+def daily_target_bulk_add(request):
+    zonal_manager = get_object_or_404(ZonalManager, user=request.user)
+    asms = zonal_manager.asms.filter(is_active=True).order_by('username')
+    result = None
+
+    if request.method == "POST":
+        form = ZMBulkTargetForm(request.POST, asms=asms)
+        if form.is_valid():
+            data = form.cleaned_data
+            result = bulk.assign_targets(
+                zonal_manager,
+                data['asms'],
+                data['start_date'],
+                data['end_date'],
+                values=form.target_values(),
+                copy_from=data['copy_from'],
+            )
+            if result.created:
+                messages.success(request, f"✅ {result.created} daily targets added.")
+            if not result.conflicts and not result.missing_source:
+                return redirect('daily_target')
+            # Stay on the page and show what was skipped
+            messages.warning(
+                request,
+                f"⚠️ {len(result.conflicts)} already existed, {len(result.missing_source)} had nothing to copy."
+            )
+    else:
+        today = timezone.now().date()
+        form = ZMBulkTargetForm(asms=asms, initial={'start_date': today, 'end_date': today})
+
+    return render(request, 'zonal_manager/daily_target_bulk.html', {'form': form, 'result': result})
+
 @login_required
 def assign_task_to_asm(request):
     """🎯 Zone Manager: Assign Task to ASM"""
@@ -510,9 +633,10 @@ def zm_sd_collections_view(request):
     # 🔹 ASMs under this ZM
     asms = zm.asms.all()
 
-    # 🔹 Filter collections: ZM's own + ASMs under ZM
+    # 🔹 Filter collections: ZM's own + anyone under the ZM (closure table), soft-deleted rows left out
     collections = SDCollection.objects.filter(
-        Q(zone_manager=zm) | Q(asm__in=asms)
+        Q(zone_manager=zm) | Q(asm_id__in=closure.descendants(zm.user_id, min_depth=1)),
+        is_deleted=False,
     )
 
     # 🔹 Optional Filters
@@ -530,22 +654,46 @@ def zm_sd_collections_view(request):
     if asm_id:
         collections = collections.filter(asm__id=asm_id)
 
-    # 🔹 Summary
-    total_amount = collections.aggregate(total=Sum("amount"))["total"] or 0
-    pending_amount = collections.filter(status="pending").aggregate(total=Sum("amount"))["total"] or 0
-    completed_amount = collections.filter(status="completed").aggregate(total=Sum("amount"))["total"] or 0
+    # 🔹 Summary: one aggregate with per-status sums and counts
+    summary = collections.aggregate(
+        total_amount=Sum("amount"),
+        pending_amount=Sum("amount", filter=Q(status="pending")),
+        completed_amount=Sum("amount", filter=Q(status="completed")),
+        total_count=Count("id"),
+        pending_count=Count("id", filter=Q(status="pending")),
+        completed_count=Count("id", filter=Q(status="completed")),
+    )
+
+    # 🔹 One page, newest first; a list, so the table and the cards share it
+    page = keyset_paginate(
+        collections.select_related("partner", "asm", "zone_manager__user"),
+        ordering=["-date", "-id"],
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+        per_page=SD_COLLECTIONS_PER_PAGE,
+    )
+
+    # Filters to carry over in the page links
+    page_query = request.GET.copy()
+    for name in ("after", "before"):
+        page_query.pop(name, None)
 
     return render(request, "zonal_manager/sd_collections_list.html", {
         "zm": zm,
-        "collections": collections,
+        "collections": page.rows,
+        "page": page,
+        "page_query": page_query.urlencode(),
         "asms": asms,
         "start_date": start_date or "",
         "end_date": end_date or "",
         "status": status or "",
         "asm_id": asm_id or "",
-        "total_amount": total_amount,
-        "pending_amount": pending_amount,
-        "completed_amount": completed_amount,
+        "total_amount": summary["total_amount"] or 0,
+        "pending_amount": summary["pending_amount"] or 0,
+        "completed_amount": summary["completed_amount"] or 0,
+        "total_count": summary["total_count"],
+        "pending_count": summary["pending_count"],
+        "completed_count": summary["completed_count"],
     })
 
 
@@ -585,19 +733,15 @@ def get_partner_details(request, partner_id):
     try:
         partner = CustomUser.objects.get(id=partner_id)
 
-        # Find ASM linked to this partner
-        asm_obj = ASM.objects.filter(partners=partner).first()
-
-        # Find ZM linked to that ASM
-        zm_obj = None
-        if asm_obj:
-            zm_obj = ZonalManager.objects.filter(asms=asm_obj.user).first()
+        # ASM and ZM linked to this partner, from the in-memory hierarchy
+        owners = hierarchy.current().owners_of_partner(partner.id)
 
         data = {
-            "asm": asm_obj.user.username if asm_obj and asm_obj.user else "N/A",
-            "zm": zm_obj.user.username if zm_obj and zm_obj.user else "N/A",
-            "asm_id": asm_obj.user.id if asm_obj and asm_obj.user else "",
-            "zm_id": zm_obj.id if zm_obj else "",
+            "asm": owners.asm.username if owners.asm else "N/A",
+            "zm": owners.zm.username if owners.zm else "N/A",
+            "asm_id": owners.asm.id if owners.asm else "",
+            "zm_id": owners.zm_id or "",
+            **ledger.summary(partner),
         }
 
         return JsonResponse(data)